@@ -0,0 +1,78 @@
+# assetcache.py — baked (decoded + scaled) images under data/baked: one read instead of PNG decode + smoothscale
+import os, struct, hashlib
+import pygame
+
+_MAGIC = b"TRBAKE1\0"
+_HEAD = struct.Struct("<8sqII4s")  # magic, source mtime_ns, w, h, pixel format ("RGBA"/"RGB")
+
+
+class AssetCache:
+    """
+    Images as they are after loading and scaling, keyed by (source path, layout key, pixel format);
+    the layout key carries the target size (and strip columns). Game.baked, used by SpriteAtlas.
+    - load(path, key, build, fmt): the baked entry while the source mtime still matches it,
+      else build() (decode + scale) and write the result back for the next start.
+    - One file per entry: _HEAD + pygame.image.tobytes blob, read with a single read().
+    - hits / builds / stale: counters (bench.py boot).
+    """
+
+    def __init__(self, root, enabled=True):
+        self.root = root
+        self.enabled = enabled
+        self.hits = self.builds = self.stale = 0
+
+    def load(self, path, key, build, fmt="RGBA"):
+        if not self.enabled:
+            return build()
+        mtime = os.stat(path).st_mtime_ns  # missing source: fail like image.load would
+        file = self._file(path, key, fmt)
+        try:
+            with open(file, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = None
+        if data:
+            surf = self._decode(data, mtime, fmt)
+            if surf is not None:
+                self.hits += 1
+                return surf
+            self.stale += 1
+        surf = build()
+        self.builds += 1
+        self._write(file, mtime, surf, fmt)
+        return surf
+
+    def clear(self):
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if name.endswith(".bin"):
+                    os.remove(os.path.join(self.root, name))
+
+    # ---------- internal ----------
+    def _file(self, path, key, fmt):
+        digest = hashlib.sha1(repr((os.path.abspath(path), key, fmt)).encode()).hexdigest()[:20]
+        return os.path.join(self.root, digest + ".bin")
+
+    def _decode(self, data, mtime, fmt):
+        if len(data) < _HEAD.size:
+            return None
+        magic, src_mtime, w, h, f = _HEAD.unpack_from(data)
+        if (magic != _MAGIC or src_mtime != mtime or f.rstrip(b"\0") != fmt.encode()
+                or len(data) != _HEAD.size + w * h * len(fmt)):
+            return None
+        surf = pygame.image.frombuffer(memoryview(data)[_HEAD.size:], (w, h), fmt)
+        if pygame.display.get_surface() is None:
+            return surf.copy()  # no display to convert for; copy so the blob can go
+        return surf.convert_alpha() if fmt == "RGBA" else surf.convert()
+
+    def _write(self, file, mtime, surf, fmt):
+        w, h = surf.get_size()
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp = file + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(_HEAD.pack(_MAGIC, mtime, w, h, fmt.encode()))
+                f.write(pygame.image.tobytes(surf, fmt))
+            os.replace(tmp, file)  # readers never see a half-written entry
+        except OSError as e:
+            print("[WARN] baked asset yazılamadı:", e)
@@ -1,5 +1,14 @@
-import os, pygame
-from config import AUDIO_DIR
+import os, threading, pygame
+from config import AUDIO_DIR, MUSIC_STREAM, MUSIC_BUDGET
+
+# stream mode: the track most likely to follow each track, held decoded so the switch crossfades
+NEXT_LIKELY = {
+    "menu": ("explore_outdoor",),
+    "explore_outdoor": ("chase_outdoor",),
+    "chase_outdoor": ("explore_outdoor",),
+    "explore_indoor": ("chase_indoor",),
+    "chase_indoor": ("explore_indoor",),
+}
 
 
 class Audio:
@@ -23,18 +32,38 @@ class Audio:
             "the_end": os.path.join(AUDIO_DIR, "the_end.ogg"),
         }
 
-        # Pre-load music as Sound objects for instant playback
+        # Music/SFX are decoded by load_music / load_sfx (Game.loader runs them during State.BOOT)
         self.preloaded_music = {}
-        if self.ready:
-            for key, path in self.music_map.items():
-                if os.path.exists(path):
-                    try:
-                        self.preloaded_music[key] = pygame.mixer.Sound(path)
-                    except Exception as e:
-                        print(f"Failed to pre-load {key}: {e}")
-                        self.preloaded_music[key] = None
-
         self.sfx = {}
+
+        # Stream mode (config.MUSIC_STREAM): music plays from disk via pygame.mixer.music, only
+        # warm tracks are decoded Sounds in preloaded_music (see warm); current_channel is None
+        # while the stream is the playing voice.
+        self.stream = settings.get("music_stream", MUSIC_STREAM)
+        self.budget = settings.get("music_budget", MUSIC_BUDGET)
+        self._want = ()             # keys the warm thread should hold decoded
+        self._over = set()          # keys that did not fit the budget (not retried)
+        self._cv = threading.Condition()
+        self._warm_thread = None
+        self._stream_fading_until = 0  # SDL_mixer blocks load/play until a fading stream is silent
+
+    def load_music(self, keys=None):
+        """Pre-load music as Sound objects for instant playback (keys: subset of music_map, default all not loaded yet).
+        Stream mode decodes nothing up front."""
+        if not self.ready or self.stream:
+            return
+        for key in keys or [k for k in self.music_map if k not in self.preloaded_music]:
+            path = self.music_map[key]
+            if os.path.exists(path):
+                try:
+                    sound = pygame.mixer.Sound(path)
+                except Exception as e:
+                    print(f"Failed to pre-load {key}: {e}")
+                    sound = None
+                with self._cv:  # runs on the boot loader thread
+                    self.preloaded_music[key] = sound
+
+    def load_sfx(self):
         for key, fname in [
             ("rescue", "rescue.ogg"),
             ("bushes", "bushes.ogg"),  # << saklanma sesi
@@ -56,11 +85,15 @@ class Audio:
                     print(f"[SFX ERR] {key} -> {path}: {e}")
             else:
                 print(f"[SFX MISS] {key} -> {path}")
+
     def play_music(self, key, fade_ms=400):
         if not self.ready or not self.enabled_music:
             return
         if self.current == key:
             return
+        if self.stream:
+            self._play_stream(key, fade_ms)
+            return
 
         sound = self.preloaded_music.get(key)
         if not sound:
@@ -77,6 +110,89 @@ class Audio:
         except Exception as e:
             print(f"Error playing music {key}: {e}")
 
+    def _play_stream(self, key, fade_ms):
+        path = self.music_map.get(key)
+        if not path or not os.path.exists(path):
+            return
+        with self._cv:
+            warm = self.preloaded_music.get(key)
+        try:
+            if warm is not None and self.current_channel is None:
+                # stream -> decoded: both voices sound while they cross
+                pygame.mixer.music.fadeout(fade_ms)
+                self._stream_fading_until = pygame.time.get_ticks() + fade_ms
+                self.current_channel = warm.play(-1, fade_ms=fade_ms)
+                self.warm((key,))  # the way back goes to the stream, nothing else to hold
+            else:
+                # decoded -> stream crossfades too; stream -> stream (track not warm) restarts the stream
+                if self.current_channel is not None:
+                    self.current_channel.fadeout(fade_ms)
+                    self.current_channel = None
+                if pygame.time.get_ticks() < self._stream_fading_until:
+                    pygame.mixer.music.stop()  # cut the fade tail rather than stall the frame on it
+                pygame.mixer.music.load(path)
+                pygame.mixer.music.play(-1, fade_ms=fade_ms)
+                self.warm(NEXT_LIKELY.get(key, ()))
+            self.current = key
+        except Exception as e:
+            print(f"Error playing music {key}: {e}")
+
+    def warm(self, keys):
+        """Stream mode: hold exactly `keys` decoded (tracks still fading out are kept until silent).
+        Decoding runs on a background thread; preloaded_music only changes under self._cv. Fading
+        tracks count against self.budget: a track waits until they are dropped, and one that would
+        take the wanted set alone past the budget stays streamed."""
+        if not self.ready or not self.stream:
+            return
+        with self._cv:
+            self._want = tuple(k for k in keys if k in self.music_map)
+            self._cv.notify()
+        if self._warm_thread is None:
+            self._warm_thread = threading.Thread(target=self._warm_loop, name="music-warm", daemon=True)
+            self._warm_thread.start()
+
+    def resident(self):
+        """Decoded audio held in memory, in bytes: {"music", "sfx", "total"} (the stream's decoder buffers not counted)."""
+        with self._cv:
+            music = sum(self._pcm_bytes(s) for s in self.preloaded_music.values() if s is not None)
+        sfx = sum(self._pcm_bytes(s) for s in self.sfx.values())
+        return {"music": music, "sfx": sfx, "total": music + sfx}
+
+    def _pcm_bytes(self, sound):
+        freq, size, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * freq) * (abs(size) // 8) * channels
+
+    def _warm_loop(self):
+        while True:
+            with self._cv:
+                self._cv.wait(timeout=1.0)  # also wakes up to drop tracks that finished fading
+                want = self._want
+                for key, sound in list(self.preloaded_music.items()):
+                    if key not in want and (sound is None or sound.get_num_channels() == 0):
+                        del self.preloaded_music[key]
+                todo = [k for k in want if k not in self.preloaded_music and k not in self._over]
+            for key in todo:
+                try:
+                    sound = pygame.mixer.Sound(self.music_map[key])  # decoded outside the lock (slow)
+                except Exception as e:
+                    print(f"Failed to warm {key}: {e}")
+                    self._over.add(key)
+                    continue
+                size = self._pcm_bytes(sound)
+                with self._cv:
+                    if key not in self._want:
+                        continue  # wanted set moved on while decoding
+                    # everything resident counts, tracks still fading out included
+                    held = sum(self._pcm_bytes(s) for s in self.preloaded_music.values() if s is not None)
+                    wanted = sum(self._pcm_bytes(s) for k, s in self.preloaded_music.items()
+                                 if k in self._want and s is not None)
+                    if wanted + size > self.budget:
+                        print(f"[music] {key} stays streamed ({size / 2**20:.1f} MB over budget)")
+                        self._over.add(key)
+                    elif held + size <= self.budget:
+                        self.preloaded_music[key] = sound
+                    # else: fits once the fading tracks are dropped; retried on the next wake-up
+
     def play_sfx(self, key):
         if not self.ready or not self.enabled_sfx:
             return
@@ -0,0 +1,1065 @@
+# bench.py — headless checks/benchmarks: python bench.py <name> [args...] (see BENCHES)
+import os, sys, time, random
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from config import THEMES
+from tilemap import TileMap
+from entities import a_star, is_passable
+from pathfinding import jps
+
+
+def _random_cells(tmap, n, rng):
+    cells = [(x, y) for y in range(tmap.h_tiles) for x in range(tmap.w_tiles)
+             if is_passable(tmap.grid, x, y)]
+    return [(rng.choice(cells), rng.choice(cells)) for _ in range(n)]
+
+
+def _valid(grid, path, start, goal):
+    if path[0] != start or path[-1] != goal:
+        return False
+    for (ax, ay), (bx, by) in zip(path, path[1:]):
+        if abs(ax-bx) + abs(ay-by) != 1 or not is_passable(grid, bx, by):
+            return False
+    return True
+
+
+def bench_paths(maps=8, queries=200, seed=1):
+    """JPS vs A* on generated overworlds: equal path lengths, fewer expansions."""
+    rng = random.Random(seed)
+    theme = THEMES["Classic Jungle"]
+    totals = {"astar": [0, 0.0, 0], "jps": [0, 0.0, 0]}  # expanded, seconds, hit max_expand
+    mismatches = 0
+    for i in range(maps):
+        tmap = TileMap(80, 60, theme, kind="overworld", seed=seed * 1000 + i)
+        pairs = _random_cells(tmap, queries, rng)
+        for s, g in pairs + [(s, s) for s, _ in pairs[:4]]:  # start == goal: the early return sets stats too
+            lengths = {}
+            for name, fn in (("astar", a_star), ("jps", jps)):
+                st = {}
+                t0 = time.perf_counter()
+                p = fn(tmap.grid, s, g, max_expand=10**9, stats=st)
+                totals[name][1] += time.perf_counter() - t0
+                totals[name][0] += st["expanded"]
+                if p and not _valid(tmap.grid, p, s, g):
+                    raise AssertionError(f"{name}: invalid path {s}->{g}")
+                lengths[name] = len(p) if p else None
+                if fn(tmap.grid, s, g) is None and p is not None:
+                    totals[name][2] += 1
+            if lengths["astar"] != lengths["jps"]:
+                mismatches += 1
+    n = maps * (queries + 4)
+    print(f"paths: {maps} overworld maps x {queries} queries (+4 start == goal), length mismatches: {mismatches}")
+    for name, (exp, secs, capped) in totals.items():
+        print(f"  {name:5s} expanded/query {exp / n:8.1f}   ms/query {secs * 1000 / n:6.3f}"
+              f"   unsolved at max_expand=2500: {capped}")
+    return mismatches == 0
+
+
+def bench_maze(maps=8, queries=200, seed=1):
+    """MazeTree queries vs A* on generated warehouses: identical lengths, no search."""
+    rng = random.Random(seed)
+    theme = THEMES["Classic Jungle"]
+    secs = {"astar": 0.0, "tree": 0.0}
+    mismatches = 0
+    for i in range(maps):
+        tmap = TileMap(41, 31, theme, kind="warehouse", seed=seed * 1000 + i)
+        for s, g in _random_cells(tmap, queries, rng):
+            t0 = time.perf_counter()
+            a = a_star(tmap.grid, s, g, max_expand=10**9)
+            secs["astar"] += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            p = tmap.maze.path(tmap.grid, s, g) if s != g else [s]
+            secs["tree"] += time.perf_counter() - t0
+            if not p or not _valid(tmap.grid, p, s, g) or len(p) != len(a):
+                mismatches += 1
+    n = maps * queries
+    print(f"maze: {maps} warehouses x {queries} queries, mismatches: {mismatches}")
+    for name, t in secs.items():
+        print(f"  {name:5s} ms/query {t * 1000 / n:6.3f}")
+    return mismatches == 0
+
+
+def bench_grid(maps=1, lookups=200000, seed=1, repeat=5):
+    """List-of-lists + tuple membership vs packed tiles + flag masks: inline probe and is_passable (best of `repeat`)."""
+    from config import WALL, CRATE, FLOOR, HIDE, TIGER_SPAWN, SPAWN, F_SOLID_HUNTER
+    rng = random.Random(seed)
+    tmap = TileMap(80 * maps, 60 * maps, THEMES["Classic Jungle"], kind="overworld", seed=seed)
+    rows = [list(r) for r in tmap.grid]
+    w, h = tmap.w_tiles, tmap.h_tiles
+    cells = [(rng.randrange(w), rng.randrange(h)) for _ in range(lookups)]
+    edge = [(rng.randrange(-2, w + 2), rng.randrange(-2, h + 2)) for _ in range(lookups)]
+    passable = {FLOOR, HIDE, TIGER_SPAWN, SPAWN}
+
+    def old_is_passable(grid, gx, gy):  # before the packed grid
+        if gy < 0 or gy >= len(grid) or gx < 0 or gx >= len(grid[0]):
+            return False
+        return grid[gy][gx] in passable
+
+    def best(fn):
+        secs, n = [], None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            n = fn()
+            secs.append(time.perf_counter() - t0)
+        return min(secs), n
+
+    flags = tmap.flags
+    grid = tmap.grid
+    t_old, n_old = best(lambda: sum(1 for x, y in cells if rows[y][x] in (WALL, CRATE)))
+    t_new, n_new = best(lambda: sum(1 for x, y in cells if flags[y*w + x] & F_SOLID_HUNTER))
+    t_pold, p_old = best(lambda: sum(1 for x, y in edge if old_is_passable(rows, x, y)))
+    t_pnew, p_new = best(lambda: sum(1 for x, y in edge if is_passable(grid, x, y)))
+    mem_old = sys.getsizeof(rows) + sum(sys.getsizeof(r) for r in rows)
+    mem_new = sys.getsizeof(tmap.tiles) + sys.getsizeof(tmap.flags)
+    print(f"grid: {w}x{h}, {lookups} probes, best of {repeat}")
+    print(f"  lists+tuple  {t_old * 1000:7.2f} ms   is_passable {t_pold * 1000:7.2f} ms   {mem_old:8d} bytes")
+    print(f"  bytes+flags  {t_new * 1000:7.2f} ms   is_passable {t_pnew * 1000:7.2f} ms   {mem_new:8d} bytes")
+    return n_old == n_new and p_old == p_new
+
+def bench_sched(hunters=96, frames=300, seed=1):
+    """Queued searches per PathService mode: main-thread frame time with many hunters; pump stays in its time cap."""
+    import gc
+    from config import PATH_BUDGET, PATH_BUDGET_MS, FPS
+    from entities import Hunter, Player
+    from utils import grid_to_px
+    from pathfinding import shutdown_workers
+    ok = True
+    print(f"sched: {hunters} hunters x {frames} frames, budget {PATH_BUDGET} nodes / {PATH_BUDGET_MS} ms per frame")
+    # a burst of 200 queued overworld searches, drained one pump per frame
+    rng = random.Random(seed)
+    for engine in ("jps", "astar"):
+        tmap = TileMap(80, 60, THEMES["Classic Jungle"], kind="overworld", seed=seed, path_engine=engine)
+        tmap.paths.mode = "budget"
+        reqs = [tmap.paths.request(a, b) for a, b in _random_cells(tmap, 200, rng)]
+        worst, pumps = 0.0, 0
+        while not all(r.done() for r in reqs):
+            t0 = time.perf_counter()
+            tmap.paths.pump(PATH_BUDGET, PATH_BUDGET_MS)
+            worst = max(worst, time.perf_counter() - t0)
+            pumps += 1
+        print(f"  burst {engine:5s} 200 searches in {pumps} frames, worst pump {worst * 1000:5.2f} ms")
+        ok = ok and worst * 1000 < 1000 / FPS
+    del tmap, reqs
+    gc.collect()  # the burst's garbage would otherwise land as a gen-2 pause in the runs below
+    for mode in ("budget", "thread", "process"):
+        random.seed(seed)  # spawn picks and patrol goals (entities draws from the module RNG)
+        tmap = TileMap(80, 60, THEMES["Classic Jungle"], kind="overworld", seed=seed)
+        tmap.paths.mode = mode
+        hs = [Hunter(*grid_to_px(*random.choice(tmap.spawn_points))) for _ in range(hunters)]
+        player = Player(*grid_to_px(2, 2))
+        start = [h.pos.copy() for h in hs]
+        worst = total = 0.0
+        depth = 0
+        for f in range(frames):
+            t0 = time.perf_counter()
+            tmap.paths.pump(PATH_BUDGET, PATH_BUDGET_MS)
+            for h in hs:
+                h.update(1/60, tmap, player, 0.0)
+            dt = time.perf_counter() - t0
+            if f >= 30:  # skip warm-up (pool start, first wave of requests)
+                worst = max(worst, dt)
+            total += dt
+            depth = max(depth, tmap.paths.queue_depth)
+            time.sleep(max(0.0, 1/60 - dt))  # leave the workers a real frame's worth of time
+        moved = sum((h.pos - s).length() > 32 for h, s in zip(hs, start))
+        st = tmap.paths.stats()
+        print(f"  {mode:7s} worst frame {worst * 1000:6.2f} ms   mean {total * 1000 / frames:5.2f} ms"
+              f"   max queue {depth:3d}   moved {moved}/{hunters}"
+              f"   cache hits {st['hits']}/{st['hits'] + st['misses']} ({st['hit_rate']:.0%})")
+        ok = ok and moved == hunters and st["hits"] > 0
+        if mode == "budget":  # the pump's own cap; worker modes add OS scheduling / IPC jitter
+            ok = ok and worst * 1000 < 1000 / FPS
+    shutdown_workers()
+    return ok
+
+
+def bench_modes(queries=150, seed=1):
+    """PathService budget / thread / process modes give the direct search's paths (or equally short ones); worker failures are survived."""
+    import pathfinding
+    from pathfinding import PathService, ENGINES, ITER_ENGINES, shutdown_workers
+
+    def drain(svc, pairs):
+        reqs = [svc.request(a, b) for a, b in pairs]
+        while not all(r.done() for r in reqs):
+            svc.pump(10**9)
+            time.sleep(0.001)
+        return [r.result() for r in reqs]
+
+    rng = random.Random(seed)
+    mismatches = 0
+    for kind, size in (("overworld", (80, 60)), ("warehouse", (41, 31))):
+        for engine in ("jps", "astar"):
+            tmap = TileMap(*size, THEMES["Classic Jungle"], kind=kind, seed=seed, path_engine=engine)
+            pairs = list(dict.fromkeys(_random_cells(tmap, queries, rng)))
+            want = [tuple(p) if p else None for p in (ENGINES[engine](tmap.grid, a, b, 2500) for a, b in pairs)]
+            for mode in ("budget", "thread", "process"):
+                got = drain(PathService(tmap, mode=mode), pairs)
+                # same path, or one as short (a cache hit on the tail of another path to that goal)
+                bad = sum(not (g == w or (g and w and len(g) == len(w) and _valid(tmap.grid, g, a, b)))
+                          for g, w, (a, b) in zip(got, want, pairs))
+                mismatches += bad
+                print(f"modes: {kind:9s} {engine:5s} {mode:7s} {len(pairs)} searches, differing from direct: {bad}")
+
+    # a search that raises resolves to None instead of escaping pump()
+    tmap = TileMap(80, 60, THEMES["Classic Jungle"], kind="overworld", seed=seed)
+
+    def boom(*args):
+        raise ValueError("boom")
+    ENGINES["boom"], ITER_ENGINES["boom"] = boom, boom
+    try:
+        tmap.path_engine = "boom"
+        raised = drain(PathService(tmap, mode="thread"), _random_cells(tmap, 5, rng))
+    finally:
+        del ENGINES["boom"], ITER_ENGINES["boom"]
+        tmap.path_engine = "jps"
+    # killed worker processes: the service falls back to budget mode and still answers
+    pairs = _random_cells(tmap, 20, rng)
+    svc = PathService(tmap, mode="process")
+    reqs = [svc.request(a, b) for a, b in pairs]
+    for proc in list(pathfinding._pool("process")._processes.values()):
+        proc.kill()
+    while not all(r.done() for r in reqs):
+        svc.pump(10**9)
+        time.sleep(0.001)
+    broken_ok = svc.mode == "budget" and [r.result() for r in reqs] == [
+        tuple(p) if p else None for p in (ENGINES["jps"](tmap.grid, a, b, 2500) for a, b in pairs)]
+    shutdown_workers()
+    print(f"  raising search -> {raised}   killed process pool -> mode {svc.mode}, answers correct: {broken_ok}")
+    return mismatches == 0 and raised == [None] * len(raised) and broken_ok
+
+
+def bench_vision(hunters=48, rounds=300, seed=1):
+    """
+    perception.perceive (batched cone + shadowcast set) vs the old per-hunter look
+    + Bresenham, on the overworld and on a warehouse (CRATE blocks sight, HIDE blinds).
+    """
+    import pygame, perception
+    from config import TILE, HIDE
+    from entities import Hunter, Player
+    from utils import grid_to_px, px_to_grid, line_of_sight
+    rng = random.Random(seed)
+    player = Player(0, 0)
+    ok = True
+
+    for tmap in (TileMap(80, 60, THEMES["Classic Jungle"], kind="overworld", seed=seed),
+                 TileMap(41, 31, THEMES["Classic Jungle"], kind="warehouse", seed=seed, tigers=2)):
+        cells = sorted({c for c, _ in _random_cells(tmap, 4000, rng)})
+        hides = [c for c in cells if tmap.grid[c[1]][c[0]] == HIDE]
+        hs = [Hunter(*grid_to_px(*rng.choice(cells))) for _ in range(hunters)]
+
+        def old_look(h, stealth, on_hide):  # the look Hunter.update did before perception.py
+            if on_hide:
+                return False
+            to_p = player.pos - h.pos
+            dist = to_p.length()
+            if dist < h.view_dist:
+                fwd = (h.dir if h.dir.length_squared() > 0 else pygame.Vector2(1, 0)).normalize()
+                u = to_p.normalize() if dist > 0 else pygame.Vector2()
+                if fwd.dot(u) > h.cos_fov:
+                    return dist < h.view_dist * (1.0 - 0.55*stealth) and line_of_sight(tmap.grid, h.pos, player.pos)
+            return False
+
+        secs = dict.fromkeys(["old", "new", "cast"], 0.0)
+        mismatches = asymmetric = seen = hidden = 0
+        for _ in range(rounds):
+            pcell = rng.choice(hides if hides and rng.random() < 0.2 else cells)
+            player.pos.update(*grid_to_px(*pcell))
+            pgx, pgy = pcell
+            on_hide = tmap.grid[pgy][pgx] == HIDE
+            hidden += on_hide
+            near = [c for c in cells if abs(c[0] - pgx) <= 6 and abs(c[1] - pgy) <= 6]
+            for h in hs:  # half of them near the player so the cone and sight tests matter
+                x, y = rng.choice(near if rng.random() < 0.5 else cells)
+                h.pos.update(x*TILE + rng.uniform(1, TILE - 1), y*TILE + rng.uniform(1, TILE - 1))
+            stealth = rng.choice((0.0, 0.5, 1.0))
+            t0 = time.perf_counter()
+            tmap.visible_from((pgx, pgy))  # once per player tile in the game
+            secs["cast"] += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            ref = [old_look(h, stealth, on_hide) for h in hs]
+            secs["old"] += time.perf_counter() - t0
+            seen += sum(ref)
+            for h in hs:
+                h.vision_tick = 0.0  # everyone due this round
+            t0 = time.perf_counter()
+            got = perception.perceive(hs, tmap, player, stealth, 0.0)
+            secs["new"] += time.perf_counter() - t0
+            for h, a, b in zip(hs, got, ref):
+                if a != b:  # the cast is symmetric; fine where Bresenham depends on direction too
+                    if line_of_sight(tmap.grid, player.pos, h.pos) != b:
+                        asymmetric += 1
+                    else:
+                        mismatches += 1
+        casts = tmap.fov_casts
+
+        # walking: the player paces a route back and forth; only new tiles are cast
+        start, goal = rng.choice(cells), rng.choice(cells)
+        route = (tmap.paths.find(start, goal) or (start,))[:40]
+        tmap._fov.clear()  # forget the casts above
+        before, steps = tmap.fov_casts, 0
+        t0 = time.perf_counter()
+        for leg in range(6):
+            for cell in (route if leg % 2 == 0 else route[::-1]):
+                tmap.visible_from(cell)
+                steps += 1
+        t_walk = time.perf_counter() - t0
+        walk_casts = tmap.fov_casts - before
+
+        print(f"vision {tmap.kind}: {hunters} hunters x {rounds} looks ({hidden} with the player on HIDE,"
+              f" {seen} sightings), answers differing from Bresenham: {mismatches}"
+              f" (+{asymmetric} where hunter->player and player->hunter Bresenham disagree)")
+        for name, t in secs.items():
+            print(f"  {name:6s} us/look {t * 1e6 / rounds:8.1f}" + (f"   ({casts} casts, a new tile each look)" if name == "cast" else ""))
+        print(f"  walk: {steps} tile steps over a {len(route)}-tile route, {walk_casts} casts,"
+              f" {t_walk * 1e6 / steps:.1f} us/step")
+        ok = ok and mismatches == 0 and walk_casts == len(set(route))
+    return ok
+
+
+def bench_crowd(hunters=400, frames=60, seed=1):
+    """Catch test + culling + separation: brute-force pairs vs spatial.SpatialHash; same answers."""
+    import pygame
+    from config import TILE
+    from entities import Hunter, separate
+    from spatial import SpatialHash
+    from utils import grid_to_px
+    rng = random.Random(seed)
+    tmap = TileMap(80, 60, THEMES["Classic Jungle"], kind="overworld", seed=seed)
+    cells = sorted({c for c, _ in _random_cells(tmap, 4000, rng)})
+    hs = [Hunter(*grid_to_px(*rng.choice(cells))) for _ in range(hunters)]
+    player_pos, player_r = pygame.Vector2(grid_to_px(*rng.choice(cells))), 12
+    view = pygame.Rect(player_pos.x - 640, player_pos.y - 360, 1280, 720)
+    index = SpatialHash()
+    secs = {"brute": 0.0, "hash": 0.0}
+    mismatches = 0
+    for _ in range(frames):
+        for h in hs:  # jitter everyone a little, like a frame of movement
+            h.pos.x = min(max(h.pos.x + rng.uniform(-4, 4), TILE), 79 * TILE)
+            h.pos.y = min(max(h.pos.y + rng.uniform(-4, 4), TILE), 59 * TILE)
+        t0 = time.perf_counter()
+        caught_b = {id(h) for h in hs if (player_pos - h.pos).length() < player_r + h.radius}
+        shown_b = {id(h) for h in hs if view.collidepoint(h.pos)}
+        pairs_b = sum(1 for a in hs for b in hs if a is not b and (a.pos - b.pos).length() <= 2 * a.radius)
+        secs["brute"] += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        index.sync(hs)
+        caught_h = {id(h) for h in index.query_radius(player_pos, player_r + TILE)
+                    if (player_pos - h.pos).length() < player_r + h.radius}
+        shown_h = {id(h) for h in index.query_rect(view)}
+        pairs_h = sum(len(index.neighbors(a, 2 * a.radius)) for a in hs)
+        secs["hash"] += time.perf_counter() - t0
+        mismatches += (caught_b != caught_h) + (shown_b != shown_h) + (pairs_b != pairs_h)
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        separate(hs, index, tmap.grid, 1/60)
+        index.sync(hs)
+    t_sep = time.perf_counter() - t0
+    print(f"crowd: {hunters} hunters x {frames} frames, mismatches: {mismatches}")
+    for name, t in secs.items():
+        print(f"  {name:5s} ms/frame {t * 1000 / frames:7.2f}")
+    print(f"  separate+sync ms/frame {t_sep * 1000 / frames:7.2f}")
+    return mismatches == 0
+
+
+def bench_collide(moves=100000, seed=1):
+    """collision.move vs the old 5x5 Rect scans (Player._move_axis / Hunter._solve_axis)."""
+    import pygame, collision
+    from config import TILE, F_SOLID_PLAYER, F_SOLID_HUNTER
+
+    def old_player(grid, x, y, dx, dy):
+        for ax, ay in ((dx, 0), (0, dy)):
+            nx, ny = x + ax, y + ay
+            gx, gy = int(nx // TILE), int(ny // TILE)
+            for oy in range(-2, 3):
+                for ox in range(-2, 3):
+                    tx, ty = gx + ox, gy + oy
+                    if 0 <= ty < grid.h and 0 <= tx < grid.w and grid.flags[ty*grid.w + tx] & F_SOLID_PLAYER:
+                        r = pygame.Rect(tx*TILE, ty*TILE, TILE, TILE)
+                        if r.collidepoint(nx, y):
+                            if ax > 0: nx = r.left - 0.1
+                            elif ax < 0: nx = r.right + 0.1
+                        if r.collidepoint(x, ny):
+                            if ay > 0: ny = r.top - 0.1
+                            elif ay < 0: ny = r.bottom + 0.1
+            x, y = nx, ny
+        return x, y
+
+    def old_hunter(grid, x0, y0, dx, dy):
+        def solve(x, y, sx, sy):
+            gx, gy = int(x // TILE), int(y // TILE)
+            for oy in range(-2, 3):
+                for ox in range(-2, 3):
+                    tx, ty = gx + ox, gy + oy
+                    if 0 <= ty < grid.h and 0 <= tx < grid.w and grid.flags[ty*grid.w + tx] & F_SOLID_HUNTER:
+                        r = pygame.Rect(tx*TILE, ty*TILE, TILE, TILE)
+                        if r.collidepoint(x, y0):
+                            if sx > 0: x = min(x, r.left - 0.1)
+                            elif sx < 0: x = max(x, r.right + 0.1)
+                        if r.collidepoint(x0, y):
+                            if sy > 0: y = min(y, r.top - 0.1)
+                            elif sy < 0: y = max(y, r.bottom + 0.1)
+            return x, y
+        x, y = solve(x0 + dx, y0, dx, 0)
+        return solve(x, y + dy, 0, dy)
+
+    rng = random.Random(seed)
+    tmap = TileMap(80, 60, THEMES["Classic Jungle"], kind="overworld", seed=seed)
+    grid = tmap.grid
+    cells = sorted({c for c, _ in _random_cells(tmap, 4000, rng)})
+    cases = []
+    for _ in range(moves):
+        gx, gy = rng.choice(cells)
+        x, y = gx*TILE + rng.uniform(0.5, TILE - 0.5), gy*TILE + rng.uniform(0.5, TILE - 0.5)
+        ax, ay = rng.choice(((1, 0), (-1, 0), (0, 1), (0, -1)))  # hunters step along one axis
+        step = rng.uniform(1, TILE - 1)
+        cases.append((x, y, ax*step, ay*step, rng.uniform(-7, 7), rng.uniform(-7, 7)))
+    secs = {"old": 0.0, "swept": 0.0}
+    mismatches = 0
+    t0 = time.perf_counter()
+    ref = [(old_player(grid, x, y, pdx, pdy), old_hunter(grid, x, y, hdx, hdy)) for x, y, hdx, hdy, pdx, pdy in cases]
+    secs["old"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = [(collision.move(grid, F_SOLID_PLAYER, x, y, pdx, pdy), collision.move(grid, F_SOLID_HUNTER, x, y, hdx, hdy))
+           for x, y, hdx, hdy, pdx, pdy in cases]
+    secs["swept"] = time.perf_counter() - t0
+    for (rp, rh), (gp, gh) in zip(ref, got):
+        mismatches += max(abs(rp[0] - gp[0]), abs(rp[1] - gp[1]), abs(rh[0] - gh[0]), abs(rh[1] - gh[1])) > 1e-9
+    print(f"collide: {moves} player + {moves} hunter moves on an overworld, mismatches: {mismatches}")
+    for name, t in secs.items():
+        print(f"  {name:5s} us/move {t * 1e6 / (2 * moves):6.2f}")
+    return mismatches == 0
+
+
+def bench_tiles(frames=300, seed=1):
+    """TileMap.draw ("chunks" / "indexed") vs the old per-tile rects; pixel-identical where no sprite overhangs."""
+    import pygame
+    from config import TILE, SCREEN_W, SCREEN_H, FLOOR, WALL, BUSH, DOOR, EXIT, HIDE, TIGER_SPAWN, SPAWN, TREE, ROCK
+    from camera import Camera
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    def old_draw(tmap, surf, cam, colors):
+        left, top = int(cam.offset.x//TILE) - 2, int(cam.offset.y//TILE) - 2
+        for gy in range(max(0, top), min(tmap.h_tiles, top + SCREEN_H//TILE + 4)):
+            for gx in range(max(0, left), min(tmap.w_tiles, left + SCREEN_W//TILE + 4)):
+                tid = tmap.grid[gy][gx]
+                rr = pygame.Rect(gx*TILE, gy*TILE, TILE, TILE).move(-cam.offset.x, -cam.offset.y)
+                if tid in (FLOOR, TIGER_SPAWN, SPAWN): pygame.draw.rect(surf, colors["floor"], rr)
+                elif tid == WALL: pygame.draw.rect(surf, colors["wall"], rr)
+                elif tid == BUSH: pygame.draw.rect(surf, colors["bush"], rr)
+                elif tid == DOOR: pygame.draw.rect(surf, colors["door"], rr)
+                elif tid == EXIT: pygame.draw.rect(surf, colors["exit"], rr)
+                elif tid == HIDE: pygame.draw.rect(surf, colors.get("hide", colors["floor"]), rr)
+                elif tid in (TREE, ROCK):
+                    img = tmap.tree_img if tid == TREE else tmap.rock_img
+                    if img:
+                        surf.blit(img, img.get_rect(center=rr.center))
+                    else:
+                        pygame.draw.rect(surf, tmap.theme.get("tree" if tid == TREE else "rock"), rr)
+
+    rng = random.Random(seed)
+    colors = THEMES["Classic Jungle"]
+    view_w, view_h = int(SCREEN_W / 1.3), int(SCREEN_H / 1.3)
+    ok = True
+    for kind, (w, h) in (("overworld", (80, 60)), ("warehouse", (41, 31))):
+        tmap = TileMap(w, h, colors, kind=kind, seed=seed)
+        cam = Camera(w * TILE, h * TILE, view_w, view_h, smooth=0)
+        surfs = {name: pygame.Surface((view_w, view_h)) for name in ("old", "chunks", "indexed")}
+        secs = dict.fromkeys(surfs, 0.0)
+        diff = dict.fromkeys(surfs, 0)
+        for f in range(frames):
+            cam.follow(pygame.Vector2(rng.uniform(0, w * TILE), rng.uniform(0, h * TILE)))
+            cam.offset.x += rng.random()  # sub-pixel offsets like the smoothed camera
+            for name, surf in surfs.items():
+                surf.fill(colors["bg"])
+                tmap.renderer = name
+                t0 = time.perf_counter()
+                (old_draw if name == "old" else TileMap.draw)(tmap, surf, cam, colors)
+                secs[name] += time.perf_counter() - t0
+            if f % 10 == 0:
+                a = surfs["old"]
+                for name, b in surfs.items():
+                    diff[name] += sum(a.get_at((x, y)) != b.get_at((x, y))
+                                      for y in range(0, view_h, 7) for x in range(0, view_w, 7))
+        print(f"tiles: {kind} {w}x{h}, {frames} frames, chunk renders: {tmap.chunk_renders}")
+        for name, t in secs.items():
+            print(f"  {name:7s} ms/frame {t * 1000 / frames:6.2f}   sampled pixels differing: {diff[name]}")
+        ok = ok and not any(diff.values())
+    return ok
+
+
+def bench_fog(frames=300, seed=1):
+    """Cached FOG_RINGS stamp + edge fills vs the old full-view copy + circles (same pixels); shadow fog cost."""
+    import pygame
+    from config import TILE, SCREEN_W, SCREEN_H, FOG_RINGS
+    from game import Game
+    rng = random.Random(seed)
+    view_w, view_h = int(SCREEN_W / 1.3), int(SCREEN_H / 1.3)
+    g = Game.__new__(Game)  # just the fog state, no window
+    g.view = pygame.Surface((view_w, view_h), pygame.SRCALPHA)
+    g._fog_stamp = g._fog_stamp_key = None
+    g.fog_mode = "rings"
+    g.player = type("P", (), {})()
+    g.cam = type("C", (), {})()
+    g.cam.scale = 1.0
+    base = pygame.Surface((view_w, view_h), pygame.SRCALPHA)
+    base.fill((0, 0, 0, 255))
+
+    def old_fog(view, px, py):
+        darkness = base.copy()
+        for radius_tiles, ratio in sorted(FOG_RINGS, reverse=True):
+            pygame.draw.circle(darkness, (0, 0, 0, int(ratio * 255)), (px, py), int(radius_tiles * TILE))
+        view.blit(darkness, (0, 0))
+
+    scene = pygame.Surface((view_w, view_h), pygame.SRCALPHA)
+    for y in range(0, view_h, 16):
+        scene.fill((rng.randrange(256), rng.randrange(256), rng.randrange(256), 255), (0, y, view_w, 16))
+    ref = pygame.Surface((view_w, view_h), pygame.SRCALPHA)
+    secs = {"old": 0.0, "stamp": 0.0}
+    diff = 0
+    for f in range(frames):
+        g.player.pos = pygame.Vector2(rng.uniform(-200, view_w + 200), rng.uniform(-200, view_h + 200))
+        g.cam.offset = pygame.Vector2(0, 0)
+        px, py = int(g.player.pos.x + TILE // 2), int(g.player.pos.y + TILE // 2)
+        ref.blit(scene, (0, 0))
+        t0 = time.perf_counter()
+        old_fog(ref, px, py)
+        secs["old"] += time.perf_counter() - t0
+        g.view.blit(scene, (0, 0))
+        t0 = time.perf_counter()
+        g.draw_fog_of_war()
+        secs["stamp"] += time.perf_counter() - t0
+        if f % 20 == 0:
+            diff += sum(ref.get_at((x, y)) != g.view.get_at((x, y))
+                        for y in range(0, view_h, 5) for x in range(0, view_w, 5))
+    # "shadow" mode: TileFog on a warehouse and the overworld, player changing tile every 6th frame (~walking speed)
+    from camera import Camera
+    from entities import a_star
+    from config import F_PASSABLE
+
+    def shadow(tmap):
+        w, h = tmap.w_tiles, tmap.h_tiles
+        cam = Camera(w * TILE, h * TILE, view_w, view_h)
+        cells = [(x, y) for y in range(h) for x in range(w) if tmap.flags[y*w + x] & F_PASSABLE]
+        walk, c = [], rng.choice(cells)
+        while len(walk) < frames // 6 + 1:
+            goal = rng.choice(cells)
+            walk += a_star(tmap.grid, c, goal, 10**9) or [c]
+            c = goal
+        t, differ = 0.0, 0
+        for f in range(frames):
+            cell = walk[f // 6]
+            cam.follow(pygame.Vector2(cell[0] * TILE, cell[1] * TILE))
+            g.view.fill((0, 0, 0, 0))
+            t0 = time.perf_counter()
+            tmap.fog.update(cell)
+            tmap.fog.draw(g.view, cam)
+            t += time.perf_counter() - t0
+            if f % 20 == 0:  # the whole mask upscaled to a map-sized layer (the old TileFog) must match
+                full = pygame.transform.scale(tmap.fog._mask, (w * TILE, h * TILE))
+                ref.fill((0, 0, 0, 0))
+                ref.blit(full, (0, 0), (*cam.screen_offset(), view_w, view_h))
+                differ += sum(ref.get_at((x, y)) != g.view.get_at((x, y))
+                              for y in range(0, view_h, 5) for x in range(0, view_w, 5))
+        return t, differ, tmap.fog.memory(), w * h * TILE**2 * 4
+
+    mb = 2**20
+    shadows = {kind: shadow(TileMap(w, h, THEMES["Classic Jungle"], kind=kind, seed=seed))
+               for kind, w, h in (("warehouse", 41, 31), ("overworld", 80, 60))}
+    shadow_diff = sum(r[1] for r in shadows.values())
+    print(f"fog: {view_w}x{view_h} view, {frames} frames, sampled pixels differing (stamp vs old): {diff}"
+          f"  (shadow window vs full-map layer): {shadow_diff}")
+    for name, t in secs.items():
+        print(f"  {name:6s} ms/frame {t * 1000 / frames:6.2f}")
+    for kind, (t, _, mem, full) in shadows.items():
+        print(f"  shadow {kind:9s} ms/frame {t * 1000 / frames:6.2f}   holds {mem / mb:4.1f} MB"
+              f" (mask + upscaled window; a map-sized layer is {full / mb:4.1f} MB)")
+    return diff == 0 and shadow_diff == 0
+
+
+
+def bench_pipeline(frames=120, seed=1):
+    """draw_play + flip per render pipeline (config.RENDER_PIPELINE), same walk; frames compared to "smooth" downsampled."""
+    import pygame
+    from config import TILE
+    from game import Game
+    from states import State
+    if os.environ["SDL_VIDEODRIVER"] == "dummy":
+        # dummy: fullscreen is 1024x768 and no renderer for SCALED; offscreen gives both
+        pygame.display.quit()
+        os.environ["SDL_VIDEODRIVER"] = "offscreen"
+    thumb = (192, 108)
+    secs, shots = {}, {}
+    for name in ("smooth", "nearest", "native", "scaled"):
+        g = Game(pipeline=name)
+        g.loader.wait()
+        random.seed(seed)
+        g.reset_world()
+        g.state = State.PLAY
+        rng = random.Random(seed)
+        start = pygame.Vector2(g.player.pos)
+        t = [0.0, 0.0]
+        for f in range(frames):
+            g.player.pos = start + pygame.Vector2(rng.uniform(-6, 6), rng.uniform(-6, 6)) * TILE
+            g.cam.follow(g.player.pos, snap=True)
+            t0 = time.perf_counter()
+            g.draw_play()
+            t1 = time.perf_counter()
+            pygame.display.flip()  # "scaled" upscales here (SDL renderer; the software one headless)
+            t[0] += t1 - t0
+            t[1] += time.perf_counter() - t1
+        secs[name] = [x * 1000 / frames for x in t]
+        shots[name] = pygame.transform.smoothscale(g.screen, thumb)
+        assert g.pipeline == name, f"{name} fell back to {g.pipeline}"
+    ref = shots["smooth"]
+    ok = True
+    print(f"pipeline: {frames} frames, mean |diff| vs smooth on a {thumb[0]}x{thumb[1]} thumbnail")
+    for name, (draw_ms, flip_ms) in secs.items():
+        d = sum(abs(a - b) for y in range(0, thumb[1], 2) for x in range(0, thumb[0], 2)
+                for a, b in zip(ref.get_at((x, y))[:3], shots[name].get_at((x, y))[:3]))
+        d /= 3 * (thumb[0] // 2) * (thumb[1] // 2)
+        ok &= d < 8
+        print(f"  {name:8s} ms/frame draw {draw_ms:6.2f}  flip {flip_ms:6.2f}  diff {d:5.2f}")
+    return ok
+
+
+
+def bench_dynres(frames=600, load_ms=8, seed=1):
+    """DynamicResolution under draw_play + a fixed simulated update load: where it settles, no ping-pong, same framing."""
+    import pygame
+    from config import TILE, RES_SCALES, RES_BUDGET_MS
+    from game import Game
+    from states import State
+    g = Game(pipeline="smooth")
+    g.loader.wait()
+    random.seed(seed)
+    g.reset_world()
+    g.state = State.PLAY
+    rng = random.Random(seed)
+    start = pygame.Vector2(g.player.pos)
+    steps = []
+    for f in range(frames):
+        g.player.pos = start + pygame.Vector2(rng.uniform(-6, 6), rng.uniform(-6, 6)) * TILE
+        g.cam.follow(g.player.pos, snap=True)
+        t0 = time.perf_counter()
+        g.draw_play()
+        work = (time.perf_counter() - t0) * 1000 + load_ms
+        r = g.res.feed(work, 1 / 60)
+        if r is not None:
+            g.set_render_scale(r)
+            steps.append((f, r))
+    scales = [1.0] + [r for _, r in steps]
+    moves = [b > a for a, b in zip(scales, scales[1:])]
+    flips = sum(a != b for a, b in zip(moves, moves[1:]))  # down-then-up or up-then-down
+    print(f"dynres: {frames} frames, budget {RES_BUDGET_MS:.1f} ms, +{load_ms} ms simulated update")
+    print(f"  steps (frame, scale) {steps}  -> {g.res.scale}x, view {g.view.get_size()}, direction flips: {flips}")
+    # framing: every scale shows the same world rect (thumbnail vs full size)
+    thumb = (192, 108)
+    g.player.pos = pygame.Vector2(start)
+    g.cam.follow(g.player.pos, snap=True)
+    shots = {}
+    for r in sorted(RES_SCALES, reverse=True):
+        g.set_render_scale(r)
+        g.draw_play()
+        shots[r] = pygame.transform.smoothscale(g.screen, thumb)
+        t0 = time.perf_counter()
+        for _ in range(20):
+            g.draw_play()
+        ms = (time.perf_counter() - t0) * 1000 / 20
+        d = sum(abs(a - b) for y in range(0, thumb[1], 2) for x in range(0, thumb[0], 2)
+                for a, b in zip(shots[1.0].get_at((x, y))[:3], shots[r].get_at((x, y))[:3]))
+        d /= 3 * (thumb[0] // 2) * (thumb[1] // 2)
+        print(f"  scale {r:.1f}  view {g.view.get_width():4d}x{g.view.get_height():<4d} draw_play ms {ms:6.2f}"
+              f"  diff vs 1.0x {d:5.2f}")
+    return flips <= 1 and d < 8
+
+
+
+def bench_drawlist(visible=24, frames=60, seed=1):
+    """RenderQueue (cull + (layer, y) sort + one blits per layer) vs every entity drawing itself; same pixels."""
+    import pygame
+    from config import TILE
+    from camera import Camera
+    from entities import Player, Hunter
+    from footprints import Footprints
+    from render import RenderQueue
+    from game import Game
+    g = Game(pipeline="smooth")
+    g.loader.wait()
+    random.seed(seed)
+    g.reset_world()
+    rng = random.Random(seed)
+    tmap, colors = g.overworld, g.colors
+    W, H = tmap.w_tiles * TILE, tmap.h_tiles * TILE
+    cam = Camera(W, H, g.view_w, g.view_h, smooth=0)
+    cam.follow(pygame.Vector2(W // 2, H // 2))  # integer offset: both paths round alike
+    view = cam.view_rect()
+    fp = Footprints(colors["footprint"], atlas=g.atlas)
+    fp.points = [(x, tmap.h_tiles // 2) for x in range(tmap.w_tiles)] + [(tmap.w_tiles // 3, y) for y in range(tmap.h_tiles)]
+    player = Player(W // 2, H // 2, atlas=g.atlas)
+    surf_a = pygame.Surface(g.view.get_size()).convert()
+    surf_b = surf_a.copy()
+    q = RenderQueue()
+    print(f"drawlist: {view.w}x{view.h} view, {visible} hunters on screen, {frames} frames")
+    ok = True
+    for total in (visible, 200, 800, 3200):
+        hunters = []
+        for i in range(total):
+            if i < visible:
+                x, y = rng.uniform(view.left, view.right), rng.uniform(view.top, view.bottom)
+            else:
+                while True:
+                    x, y = rng.uniform(0, W), rng.uniform(0, H)
+                    if not view.inflate(4 * TILE, 4 * TILE).collidepoint(x, y):
+                        break
+            h = Hunter(x, y, atlas=g.atlas)
+            h.frame_i, h.facing_left = rng.randrange(h.n_frames), rng.random() < 0.5
+            hunters.append(h)
+        tmap.spatial.clear()
+        tmap.spatial.sync(hunters)
+        t_old = t_new = 0.0
+        for f in range(frames):
+            surf_a.fill(colors["bg"])
+            t0 = time.perf_counter()
+            fp.draw(surf_a, cam)
+            for e in sorted(hunters + [player], key=lambda e: e.pos.y):
+                if e is player:
+                    e.draw(surf_a, cam, colors["player"])
+                else:
+                    e.draw(surf_a, cam, colors)
+            t_old += time.perf_counter() - t0
+            surf_b.fill(colors["bg"])
+            t0 = time.perf_counter()
+            q.begin(cam)
+            fp.enqueue(q, cam)
+            pad = 2 * TILE
+            for h in tmap.spatial.query_rect((view.x - pad, view.y - pad, view.w + 2*pad, view.h + 2*pad)):
+                h.enqueue(q, colors)
+            player.enqueue(q, colors["player"])
+            q.flush(surf_b)
+            t_new += time.perf_counter() - t0
+        diff = sum(surf_a.get_at((x, y)) != surf_b.get_at((x, y))
+                   for y in range(0, view.h - 1, 4) for x in range(0, view.w - 1, 4))
+        ok &= diff == 0
+        print(f"  {total:5d} hunters  self-draw ms/frame {t_old * 1000 / frames:6.2f}"
+              f"  queue ms/frame {t_new * 1000 / frames:6.2f}  drawn {q.drawn}  sampled pixels differing: {diff}")
+    tmap.spatial.clear()
+    return ok
+
+
+
+def bench_atlas(sprites=400, frames=60, seed=1):
+    """SpriteAtlas variants vs per-draw flip / rotate-cache + set_alpha; same pixels, atlas memory."""
+    import math
+    import pygame
+    from config import TILE
+    from footprints import PAW_ALPHA
+    from game import Game
+    g = Game(pipeline="smooth")
+    g.loader.wait()
+    atlas = g.atlas
+    rng = random.Random(seed)
+    view = g.view.get_size()
+    # (sprite, frame, flip, angle, pos): hunters/player facing either way, paws at any heading
+    items = []
+    for _ in range(sprites):
+        name = rng.choice(("hunter", "hunter", "hunter", "player_run", "paw", "paw"))
+        angle = math.degrees(rng.uniform(-math.pi, math.pi)) if name == "paw" else 0
+        items.append((name, rng.randrange(atlas.count(name)), name != "paw" and rng.random() < 0.5, angle,
+                      (rng.randrange(view[0]), rng.randrange(view[1]))))
+    rot_cache = {}
+
+    def old_img(name, frame, flip, angle):
+        img = atlas.base(name, frame)
+        if name != "paw":
+            return pygame.transform.flip(img, True, False) if flip else img
+        key = (int(round(angle / 15)) * 15) % 360
+        if key not in rot_cache:
+            rot_cache[key] = pygame.transform.rotate(img, -key)
+        img = rot_cache[key]
+        img.set_alpha(PAW_ALPHA)
+        return img
+
+    surf_a = pygame.Surface(view).convert()
+    surf_b = surf_a.copy()
+    secs = {"old": 0.0, "atlas": 0.0}
+    for f in range(frames):
+        for surf, name in ((surf_a, "old"), (surf_b, "atlas")):
+            surf.fill((30, 60, 30))
+            t0 = time.perf_counter()
+            for sprite, frame, flip, angle, pos in items:
+                if name == "old":
+                    img = old_img(sprite, frame, flip, angle)
+                else:
+                    img = atlas.get(sprite, frame, flip, angle, PAW_ALPHA if sprite == "paw" else 255)
+                surf.blit(img, img.get_rect(center=pos))
+            secs[name] += time.perf_counter() - t0
+    diff = sum(surf_a.get_at((x, y)) != surf_b.get_at((x, y)) for y in range(0, view[1], 4) for x in range(0, view[0], 4))
+    print(f"atlas: {sprites} sprites x {frames} frames, sampled pixels differing: {diff}")
+    for name, t in secs.items():
+        print(f"  {name:6s} ms/frame {t * 1000 / frames:6.2f}")
+    mem = atlas.memory()
+    print(f"  {atlas.variant_count()} variants, " + ", ".join(f"{k} {v / 1024:.0f} KiB" for k, v in mem.items()))
+    return diff == 0
+
+
+
+_BOOT = """
+import os, sys, time
+t0 = time.perf_counter()
+import config
+config.BAKED_DIR = sys.argv[1]
+import pygame, assetcache
+from game import Game
+spent = [0.0]  # inside AssetCache.load: decode + scale (off / bake) or the baked read (warm)
+_load = assetcache.AssetCache.load
+def timed(self, *args, **kw):
+    t = time.perf_counter()
+    try:
+        return _load(self, *args, **kw)
+    finally:
+        spent[0] += time.perf_counter() - t
+assetcache.AssetCache.load = timed
+t1 = time.perf_counter()
+g = Game(pipeline="smooth")
+t2 = time.perf_counter()
+g.loader.wait("menu")
+t3 = time.perf_counter()
+g.loader.wait()
+t4 = time.perf_counter()
+b = g.baked
+print("BOOT", t1 - t0, t2 - t1, t3 - t1, t4 - t1, spent[0], b.hits, b.builds, b.stale)
+"""
+
+
+def bench_boot(runs=5):
+    """Cold-start Game() in fresh processes (window up / menu ready / all loaded): asset cache off / empty (bake) / warm; same pixels; stale rebuild."""
+    import subprocess, tempfile, shutil
+    import pygame
+    from assetcache import AssetCache
+    from sprites import SpriteAtlas
+    tmp = tempfile.mkdtemp(prefix="baked-")
+    env = dict(os.environ)
+
+    def boot(root, enabled):
+        code = _BOOT if enabled else _BOOT.replace("config.BAKED_DIR = sys.argv[1]",
+                                                   "config.BAKED_DIR = sys.argv[1]; config.ASSET_CACHE = False")
+        out = subprocess.run([sys.executable, "-c", code, root], capture_output=True, text=True, env=env,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        line = [l for l in out.stdout.splitlines() if l.startswith("BOOT")]
+        if not line:
+            print(out.stdout, out.stderr)
+            raise SystemExit("boot failed")
+        _, imp, init, menu, full, images, hits, builds, stale = line[0].split()
+        return float(imp), float(init), float(menu), float(full), float(images), int(hits), int(builds), int(stale)
+
+    try:
+        rows = {"off": [], "bake": [], "warm": []}
+        for _ in range(runs):
+            rows["off"].append(boot(tmp, False))
+            AssetCache(tmp).clear()
+            rows["bake"].append(boot(tmp, True))
+            rows["warm"].append(boot(tmp, True))
+        print(f"boot: Game() in a fresh process, median of {runs}")
+        for name, r in rows.items():
+            r.sort(key=lambda x: x[3])
+            imp, init, menu, full, images, hits, builds, stale = r[len(r) // 2]
+            print(f"  {name:5s} import {imp * 1000:6.1f} ms  window {init * 1000:6.1f} ms  menu {menu * 1000:6.1f} ms"
+                  f"  all loaded {full * 1000:7.1f} ms  images {images * 1000:6.1f} ms  (cache hits {hits} builds {builds} stale {stale})")
+        # same pixels from the cache as from decode + scale, and a touched source is rebuilt
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+        src = os.path.join(tmp, "hunter_run.png")
+        shutil.copy("assets/images/hunter_run.png", src)
+        cache = AssetCache(tmp)
+        plain, baked, again = SpriteAtlas(), SpriteAtlas(cache), SpriteAtlas(cache)
+        for a in (plain, baked, again):
+            a.load_strip("hunter", src, (56, 56), cols=7)
+        diff = sum(pygame.image.tobytes(plain.base("hunter", i), "RGBA") != pygame.image.tobytes(again.base("hunter", i), "RGBA")
+                   for i in range(plain.count("hunter")))
+        st = os.stat(src)
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        SpriteAtlas(cache).load_strip("hunter", src, (56, 56), cols=7)
+        print(f"  cached vs decoded frames differing: {diff}; after touching the source: "
+              f"hits {cache.hits} builds {cache.builds} stale {cache.stale}")
+        return diff == 0 and cache.stale == 1
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_music():
+    """Preloaded vs streamed music: startup decode, resident bytes, main-thread cost of each switch."""
+    import pygame
+    from audio import Audio
+    from config import MUSIC_BUDGET, FPS
+    pygame.init()
+    pre = Audio({"music_stream": False})
+    t = time.perf_counter()
+    pre.load_music()
+    t_pre = time.perf_counter() - t
+    a = Audio({})
+    t = time.perf_counter()
+    a.load_music()
+    t_stream = time.perf_counter() - t
+    mb = 2**20
+    print(f"music: startup decode  preloaded {t_pre * 1000:7.1f} ms {pre.resident()['music'] / mb:6.1f} MB"
+          f"   streamed {t_stream * 1000:5.1f} ms {a.resident()['music'] / mb:4.1f} MB  (budget {MUSIC_BUDGET / mb:.0f} MB)")
+
+    peak = 0
+
+    def settle():
+        nonlocal peak
+        for _ in range(150):  # warm thread: decode the wanted track / drop the faded one
+            time.sleep(0.02)
+            peak = max(peak, a.resident()["music"])  # crossfades: the fading track is still resident
+            if set(a.preloaded_music) == set(a._want) - a._over:
+                break
+
+    worst = 0.0
+    for fade in (0, 400):
+        for key in ("menu", "explore_outdoor", "chase_outdoor", "explore_outdoor", "chase_outdoor",
+                    "explore_outdoor", "explore_indoor", "chase_indoor", "explore_indoor", "menu"):
+            settle()
+            t = time.perf_counter()
+            a.play_music(key, fade_ms=fade)
+            ms = (time.perf_counter() - t) * 1000
+            worst = max(worst, ms)
+            settle()
+            res = a.resident()["music"]
+            voice = "stream" if a.current_channel is None else "decoded"
+            print(f"  -> {key:16s} {voice:8s} fade {fade:3d} switch {ms:5.1f} ms  warm {sorted(a.preloaded_music)}"
+                  f"  resident {res / mb:4.1f} MB")
+    print(f"  peak resident {peak / mb:.1f} MB (sampled through the crossfades) vs preloaded "
+          f"{pre.resident()['music'] / mb:.1f} MB; slowest switch {worst:.1f} ms")
+    return peak <= MUSIC_BUDGET and worst < 1000 / FPS
+
+
+def bench_restart(restarts=20, seed=1):
+    """reset_world: eager warehouses vs lazy (+ background pre-generation); exact tiger counts, same maps."""
+    import threading
+    from game import Game
+    from tilemap import TileMap
+    g = Game(pipeline="smooth")
+    g.loader.wait()
+    g.maps.enabled = False  # generate every map, never load one from MAP_DIR
+    random.seed(seed)
+
+    def restart(pregen, eager=False, world=None):
+        g.settings["warehouse_pregen"] = pregen
+        g.settings["world_seed"] = world
+        t = time.perf_counter()
+        g.reset_world()
+        if eager:  # what reset_world did before: every warehouse up front
+            for i in range(len(g.warehouses)):
+                g.warehouses[i]
+        return time.perf_counter() - t
+
+    # the same worlds in every column, each timed as a whole reset_world
+    worlds = [seed * 1000 + r for r in range(restarts)]
+    t_eager = sum(restart(False, eager=True, world=ws) for ws in worlds)
+    t_lazy = sum(restart(False, world=ws) for ws in worlds)
+    t_pre = sum(restart(True, world=ws) for ws in worlds)
+    # the parts of a lazy reset_world: overworld generation and the footprint goal field
+    t_over = t_field = 0.0
+    for ws in worlds:
+        t = time.perf_counter()
+        TileMap(80, 60, g.colors, kind="overworld", images={"tree": g.tree_img, "rock": g.rock_img}, seed=ws)
+        t_over += time.perf_counter() - t
+        restart(False, world=ws)
+        g.overworld._goal_fields.clear()
+        t = time.perf_counter()
+        g.update_outdoor_footprints()
+        t_field += time.perf_counter() - t
+    g.settings["world_seed"] = None
+    ms = lambda t: t * 1000 / restarts
+    print(f"restart: {restarts}x reset_world  eager {ms(t_eager):5.2f} ms  lazy {ms(t_lazy):5.2f} ms"
+          f"  lazy+pregen {ms(t_pre):5.2f} ms")
+    print(f"  of which overworld generation {ms(t_over):5.2f} ms, footprint goal field (full-map BFS) {ms(t_field):5.2f} ms")
+
+    # promised tiger counts hold, and a map is the same built by the worker or at the door
+    wrong = differ = 0
+    for _ in range(restarts):
+        restart(False)
+        w = g.warehouses
+        promised = [w.tigers(i) for i in range(len(w))]
+        door = [bytes(w[i].tiles) for i in range(len(w))]
+        wrong += sum(w.tigers(i) != promised[i] for i in range(len(w)))
+        again = [bytes(g.make_warehouse(w.seeds[i], w.tiger_goals[i]).tiles) for i in range(len(w))]
+        differ += sum(a != b for a, b in zip(door, again))
+    restart(True)
+    for t in threading.enumerate():
+        if t.name == "warehouses":
+            t.join()
+    print(f"  tiger counts off: {wrong}  maps differing (door vs rebuilt from seed): {differ}"
+          f"  after pre-generation: {len(g.warehouses.built())}/{len(g.warehouses)} built, {g.warehouses.on_demand} at the door")
+    return wrong == 0 and differ == 0
+
+
+def bench_corpus(worlds=20, seed=1):
+    """Fill config.MAP_DIR with seeded worlds; seeds reproduce maps, files round-trip, load vs generate."""
+    import pygame
+    from config import MAP_DIR
+    from mapfile import MapCorpus, load, dumps
+    from tilemap import TileMap
+    from warehouses import Warehouses
+    pygame.display.init()
+    theme = THEMES["Classic Jungle"]
+    corpus = MapCorpus(MAP_DIR)
+    rng = random.Random(seed)
+    maps, t_gen, t_load, size, bad = 0, 0.0, 0.0, 0, 0
+
+    def same(a, b):
+        return (bytes(a.tiles) == bytes(b.tiles) and a.doors == b.doors and a.exit_pos == b.exit_pos
+                and a.spawn_points == b.spawn_points and a.tiger_positions == b.tiger_positions
+                and (a.maze is None) == (b.maze is None)
+                and (a.maze is None or (a.maze.parent, a.maze.depth) == (b.maze.parent, b.maze.depth)))
+
+    for _ in range(worlds):
+        ws = rng.getrandbits(32)
+        over = TileMap(80, 60, theme, kind="overworld", seed=ws)
+        wh = Warehouses(over.doors, lambda s, t: TileMap(41, 31, theme, kind="warehouse", seed=s, tigers=t),
+                        rng=random.Random(f"{ws}/warehouses"))
+        for tmap, tigers in [(over, 0)] + [(wh[i], wh.tiger_goals[i]) for i in range(len(wh))]:
+            t = time.perf_counter()
+            again = TileMap(tmap.w_tiles, tmap.h_tiles, theme, kind=tmap.kind, seed=tmap.seed, tigers=tigers or None)
+            t_gen += time.perf_counter() - t
+            corpus.put(tmap, tigers)
+            path = corpus._file(tmap.kind, tmap.w_tiles, tmap.h_tiles, tmap.seed, tigers)
+            t = time.perf_counter()
+            back = load(path, theme)
+            t_load += time.perf_counter() - t
+            bad += not same(tmap, again) or not same(tmap, back) or dumps(back) != dumps(tmap)
+            size += os.path.getsize(path)
+            maps += 1
+    print(f"corpus: {worlds} worlds, {maps} maps in {MAP_DIR} ({size / maps:.0f} B/map)"
+          f"  generate {t_gen * 1000 / maps:5.2f} ms/map  load {t_load * 1000 / maps:5.2f} ms/map  mismatches {bad}")
+    return bad == 0
+
+
+BENCHES = {
+    "paths": bench_paths,
+    "maze": bench_maze,
+    "grid": bench_grid,
+    "sched": bench_sched,
+    "modes": bench_modes,
+    "vision": bench_vision,
+    "crowd": bench_crowd,
+    "collide": bench_collide,
+    "tiles": bench_tiles,
+    "fog": bench_fog,
+    "pipeline": bench_pipeline,
+    "dynres": bench_dynres,
+    "drawlist": bench_drawlist,
+    "atlas": bench_atlas,
+    "boot": bench_boot,
+    "music": bench_music,
+    "restart": bench_restart,
+    "corpus": bench_corpus,
+}
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "paths"
+    args = [int(a) for a in sys.argv[2:]]
+    ok = BENCHES[name](*args)
+    sys.exit(0 if ok is not False else 1)
@@ -0,0 +1,74 @@
+# boot.py — background asset loading behind State.BOOT (Game.loader)
+import threading, time
+
+
+class Loader:
+    """
+    Load steps run one by one on a background thread; the main loop keeps drawing meanwhile.
+    - add(name, group, fn, after=()): a step; `after` names steps it needs. Steps run in
+      declaration order, except that a step waits for its `after` steps (so declare the
+      menu's steps first: they are ready early and the rest keeps streaming in).
+    - start(), progress() -> (done, total, running step), ready(group), wait(group=None).
+    - A step that raises is printed and counted as done; the game falls back like the
+      old inline try/excepts did. times[name]: seconds the step took.
+    """
+
+    def __init__(self):
+        self._steps = []            # (name, group, fn, after)
+        self._done = set()
+        self._lock = threading.Lock()
+        self._cv = threading.Condition(self._lock)
+        self._thread = None
+        self.current = None
+        self.times = {}
+        self.errors = {}
+
+    def add(self, name, group, fn, after=()):
+        self._steps.append((name, group, fn, tuple(after)))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="boot-loader", daemon=True)
+        self._thread.start()
+
+    def progress(self):
+        with self._lock:
+            return len(self._done), len(self._steps), self.current
+
+    def ready(self, group):
+        with self._lock:
+            return all(name in self._done for name, g, _, _ in self._steps if g == group)
+
+    def wait(self, group=None):
+        """Block until `group` (None: every step) is loaded."""
+        with self._cv:
+            self._cv.wait_for(lambda: all(name in self._done for name, g, _, _ in self._steps
+                                          if group is None or g == group))
+
+    # ---------- internal ----------
+    def _order(self):
+        order, placed, pending = [], set(), list(self._steps)
+        while pending:
+            for i, step in enumerate(pending):
+                if all(a in placed for a in step[3]):
+                    order.append(pending.pop(i))
+                    placed.add(step[0])
+                    break
+            else:
+                raise ValueError(f"unresolvable load order: {[s[0] for s in pending]}")
+        return order
+
+    def _run(self):
+        for name, _, fn, _ in self._order():
+            with self._lock:
+                self.current = name
+            t0 = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                print(f"[WARN] yükleme adımı {name}: {e}")
+                self.errors[name] = e
+            self.times[name] = time.perf_counter() - t0
+            with self._cv:
+                self._done.add(name)
+                self.current = None
+                self._cv.notify_all()
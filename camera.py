@@ -9,16 +9,18 @@ class Camera:
     - world_w/world_h: dünya boyutu (piksel)
     - view_w/view_h: ekranda görünen mantıksal viewport boyutu (piksel)
     - smooth: takip yumuşatma katsayısı (0 = anında, 0.1–0.2 önerilir)
+    - scale: dünya pikseli başına ekran pikseli (render pipeline "native": zoom, diğerleri 1)
     """
     def __init__(self, world_w: int, world_h: int,
                  view_w: int | None = None, view_h: int | None = None,
-                 smooth: float = 0.15):
+                 smooth: float = 0.15, scale: float = 1.0):
         self.world_w = int(world_w)
         self.world_h = int(world_h)
         self.view_w  = int(view_w if view_w is not None else SCREEN_W)
         self.view_h  = int(view_h if view_h is not None else SCREEN_H)
         self.offset = pygame.Vector2(0, 0)
         self.smooth = float(smooth)
+        self.scale = float(scale)
 
     # ---- public API ----
     def set_view_size(self, w: int, h: int) -> None:
@@ -45,11 +47,21 @@ class Camera:
 
     def to_screen(self, world_pos: pygame.Vector2) -> pygame.Vector2:
         """Dünya -> ekran koordinatı."""
-        return world_pos - self.offset
+        if self.scale == 1.0:
+            return world_pos - self.offset
+        return (world_pos - self.offset) * self.scale
 
     def to_world(self, screen_pos: pygame.Vector2) -> pygame.Vector2:
         """Ekran -> dünya koordinatı (gerekirse)."""
-        return screen_pos + self.offset
+        return screen_pos / self.scale + self.offset
+
+    def view_rect(self) -> pygame.Rect:
+        """Görünen dünya dikdörtgeni (piksel), culling için; kesirli ofset yüzünden +1."""
+        return pygame.Rect(int(self.offset.x), int(self.offset.y), self.view_w + 1, self.view_h + 1)
+
+    def screen_offset(self) -> tuple[int, int]:
+        """Kamera ofseti ekran pikselinde (tile/fog katmanları bununla hizalanır)."""
+        return int(self.offset.x * self.scale), int(self.offset.y * self.scale)
 
     # ---- internal ----
     def _clamp_offset(self) -> None:
@@ -0,0 +1,51 @@
+# collision.py — swept point-vs-tile resolve on a map's flag buffer (TileMap.flags)
+# Entities collide by their centre point; `mask` picks the solid set
+# (F_SOLID_PLAYER: walls, crates, trees, rocks / F_SOLID_HUNTER: walls, crates).
+from config import TILE
+
+SKIN = 0.1  # px kept between the point and the tile edge it stopped at
+
+
+def sweep_x(flags, w, h, mask, x, y, nx):
+    """New x after moving from x to nx along row y: stops before the first solid tile crossed."""
+    ty = int(y // TILE)
+    if nx == x or not 0 <= ty < h:
+        return nx
+    row = ty * w
+    c0, c1 = int(x // TILE), int(nx // TILE)
+    if nx > x:
+        for c in range(c0 + (c1 != c0), c1 + 1):  # the start tile only if we stay in it
+            if 0 <= c < w and flags[row + c] & mask:
+                return c * TILE - SKIN
+    else:
+        for c in range(c0 - (c1 != c0), c1 - 1, -1):
+            if 0 <= c < w and flags[row + c] & mask:
+                return (c + 1) * TILE + SKIN
+    return nx
+
+
+def sweep_y(flags, w, h, mask, x, y, ny):
+    """New y after moving from y to ny along column x: stops before the first solid tile crossed."""
+    tx = int(x // TILE)
+    if ny == y or not 0 <= tx < w:
+        return ny
+    r0, r1 = int(y // TILE), int(ny // TILE)
+    if ny > y:
+        for r in range(r0 + (r1 != r0), r1 + 1):
+            if 0 <= r < h and flags[r * w + tx] & mask:
+                return r * TILE - SKIN
+    else:
+        for r in range(r0 - (r1 != r0), r1 - 1, -1):
+            if 0 <= r < h and flags[r * w + tx] & mask:
+                return (r + 1) * TILE + SKIN
+    return ny
+
+
+def move(grid, mask, x, y, dx, dy):
+    """x axis then y axis, like the old per-axis solvers; returns the new (x, y)."""
+    flags, w, h = grid.flags, grid.w, grid.h
+    if dx:
+        x = sweep_x(flags, w, h, mask, x, y, x + dx)
+    if dy:
+        y = sweep_y(flags, w, h, mask, x, y, y + dy)
+    return x, y
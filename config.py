@@ -10,6 +10,14 @@ HUNTER_SCALE = 1.75
 TREE_SCALE   = 1.50
 ROCK_SCALE   = 1.50
 
+# Map drawing: static tiles are pre-rendered in CHUNK_TILES x CHUNK_TILES chunks,
+# at most CHUNK_CACHE of them kept per map (LRU)
+CHUNK_TILES = 16
+CHUNK_CACHE = 24
+# "chunks" (above) or "indexed": an 8-bit surface with one pixel per tile, palette = theme,
+# scaled up to the view each frame. settings.json "tile_renderer" overrides it.
+TILE_RENDERER = "chunks"
+
 # Fog visibility rings: (radius in tiles, darkness 0..1)
 FOG_RINGS = [
     (5, 0.00),  # fully visible
@@ -18,6 +26,33 @@ FOG_RINGS = [
     (8, 0.95),
 ]
 # visibility radius in tiles
+# Fog mode: "rings" (FOG_RINGS around the player) or "shadow" (walls block sight,
+# fov.TileFog; tiles seen once stay dimmed by FOG_EXPLORED). settings.json "fog_mode" overrides it.
+# "shadow" keeps a w*h*4-byte tile mask per map plus an upscaled window the size of the view
+# (+ fov.FOG_MARGIN tiles): ~7 MB on the overworld at scale 1 instead of a ~20 MB map-sized
+# layer; a dynamic-resolution step re-upscales only that window. It stays opt-in.
+FOG_MODE = "rings"
+FOG_EXPLORED = 0.65
+
+# Frame presentation: "smooth" (scene drawn on the zoomed view, smoothscaled to the screen),
+# "nearest" (same, nearest-neighbour scale), "native" (scene drawn at screen resolution with
+# assets pre-scaled by the zoom), "scaled" (SDL SCALED display: the view is the display and
+# SDL upscales it). settings.json "render_pipeline" overrides it.
+RENDER_PIPELINE = "smooth"
+
+# Dynamic resolution ("smooth"/"nearest"): the scene is rendered at one of RES_SCALES of the view
+# size (same camera framing, fewer pixels), one step down when the frame work time averaged over
+# RES_WINDOW frames exceeds RES_BUDGET_MS*RES_DOWN, one step up when under RES_BUDGET_MS*RES_UP,
+# at most one step per RES_HOLD s. RES_DOWN/RES_UP (1.57x) is above the pixel ratio of any
+# step (<= 1.44x), so a step up cannot land straight over the step-down line.
+# settings.json "dynamic_resolution" (true/false) overrides RES_DYNAMIC.
+RES_DYNAMIC = True
+RES_SCALES = (0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+RES_BUDGET_MS = 1000 / FPS
+RES_WINDOW = 30
+RES_DOWN = 1.10
+RES_UP = 0.70
+RES_HOLD = 1.0
 
 # Paths
 DATA_DIR = "data"
@@ -25,6 +60,25 @@ ASSETS_DIR = "assets"
 AUDIO_DIR = os.path.join(ASSETS_DIR, "audio")
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(AUDIO_DIR, exist_ok=True)
+# Baked assets: images as loaded + scaled, cached under BAKED_DIR (assetcache.AssetCache) and
+# rebuilt when the source file changes. settings.json "asset_cache" overrides ASSET_CACHE.
+ASSET_CACHE = True
+BAKED_DIR = os.path.join(DATA_DIR, "baked")
+# Music: streamed from disk through pygame.mixer.music (audio.Audio); only the playing track and
+# the next likely one (explore <-> chase of the same scene) are held decoded, for crossfades,
+# within MUSIC_BUDGET bytes of PCM. settings.json "music_stream" overrides MUSIC_STREAM
+# (false: every track decoded up front, as before).
+MUSIC_STREAM = True
+MUSIC_BUDGET = 8 * 2**20
+# Warehouses (warehouses.Warehouses) are built when the player reaches their door; with
+# WAREHOUSE_PREGEN a background thread builds them right after the overworld. settings.json
+# "warehouse_pregen" overrides it.
+WAREHOUSE_PREGEN = True
+# Worlds are generated from a seed (settings.json "world_seed" replays one). Maps stored under
+# MAP_DIR (mapfile.MapCorpus, filled by `python bench.py corpus`) load instead of generating,
+# and restarts pick among their worlds. settings.json "map_corpus" overrides MAP_CORPUS.
+MAP_CORPUS = True
+MAP_DIR = os.path.join(DATA_DIR, "maps")
 
 # Settings
 DEFAULT_SETTINGS = {
@@ -94,9 +148,45 @@ THEMES = {
 # Tile IDs
 FLOOR=0; WALL=1; BUSH=2; DOOR=3; EXIT=4; CRATE=5; TIGER_SPAWN=6; SPAWN=7; HIDE=8; TREE=9; ROCK=10
 
+# Per-tile flag bits (TileMap.flags); TILE_FLAGS maps tile id -> bits, usable with bytes.translate
+F_SOLID_PLAYER = 1   # player collides (WALL, CRATE, TREE, ROCK)
+F_SOLID_HUNTER = 2   # hunter collides (WALL, CRATE)
+F_PASSABLE     = 4   # AI pathfinding walks on it
+F_BLOCKS_LOS   = 8   # stops line of sight
+F_HIDE         = 16  # HIDE shelter
+
+def _tile_flags():
+    t = bytearray(256)
+    for tid in (WALL, CRATE, TREE, ROCK): t[tid] |= F_SOLID_PLAYER
+    for tid in (WALL, CRATE):             t[tid] |= F_SOLID_HUNTER | F_BLOCKS_LOS
+    for tid in (FLOOR, HIDE, TIGER_SPAWN, SPAWN): t[tid] |= F_PASSABLE
+    t[HIDE] |= F_HIDE
+    return bytes(t)
+TILE_FLAGS = _tile_flags()
+
+# Player FOV (fov.shadowcast) reach in tiles; covers the longest hunter view_dist (9 tiles)
+FOV_RADIUS = 10
+# visible_from bitsets kept per map (LRU by player tile): a cast is ~260 us, a bitset
+# w*h/8 bytes (600 B overworld), so pacing back and forth stops recasting
+FOV_CACHE = 64
+
 # AI caps
 MAX_HUNTERS_OUT = 48
 MAX_HUNTERS_IN  = 12
+HUNTER_SEPARATION = 60  # px/s overlapping hunters drift apart (entities.separate)
+# Path searches: node expansions allowed per frame on the active map (PathService.pump), and a
+# wall-clock cap on the same pump: one JPS expansion scans whole rows/columns (~15 us vs ~4 us
+# for an A* one), so 1500 expansions alone can take 30+ ms on the overworld.
+PATH_BUDGET = 1500
+PATH_BUDGET_MS = 2.0
+# Patrol goals snap to one cell per WAYPOINT_STEP x WAYPOINT_STEP block (TileMap.waypoints), so
+# hunters share goals and PathService's cache (tails of cached paths to a goal) gets hits.
+WAYPOINT_STEP = 6
+# Where queued searches run: "budget" (PATH_BUDGET on the main thread), "thread" or
+# "process" (worker pool of PATH_WORKERS; results land on a later frame).
+# settings.json "path_mode" overrides it.
+PATH_MODE = "thread"
+PATH_WORKERS = 2
 
 # Score files
 SETTINGS_PATH = os.path.join(DATA_DIR, "settings.json")
@@ -1,29 +1,51 @@
 import math, random, heapq, pygame
-from utils import clamp, px_to_grid, grid_to_px, line_of_sight
-from config import TILE, FLOOR, WALL, CRATE, BUSH, HIDE, TIGER_SPAWN, SPAWN, TREE, ROCK
+import collision
+from utils import clamp, px_to_grid
+from perception import perceive
+from render import ACTORS
+from config import TILE, FLOOR, HIDE, TIGER_SPAWN, SPAWN
+from config import F_SOLID_PLAYER, F_SOLID_HUNTER, F_PASSABLE, F_HIDE, HUNTER_SEPARATION
+
+# Path request priorities (pathfinding.PathService.request); lower runs first
+PRIO_CHASE, PRIO_SEARCH, PRIO_PATROL = 0, 1, 2
 
 # ---------------- Grid helpers ----------------
-PASSABLE = {FLOOR, HIDE, TIGER_SPAWN, SPAWN}
+PASSABLE = {FLOOR, HIDE, TIGER_SPAWN, SPAWN}  # tiles carrying F_PASSABLE
 
 
 def is_passable(grid, gx, gy):
-    if gy < 0 or gy >= len(grid) or gx < 0 or gx >= len(grid[0]):
-        return False
-    return grid[gy][gx] in PASSABLE
+    w = grid.w
+    return 0 <= gx < w and 0 <= gy < grid.h and bool(grid.flags[gy*w + gx] & F_PASSABLE)
 
 def neighbors4(grid, node):
     x,y = node
+    flags, w, h = grid.flags, grid.w, grid.h
     for dx,dy in ((1,0),(-1,0),(0,1),(0,-1)):
         nx,ny = x+dx, y+dy
-        if is_passable(grid, nx, ny):
+        if 0 <= nx < w and 0 <= ny < h and flags[ny*w + nx] & F_PASSABLE:
             yield (nx,ny)
 
 def manhattan(a,b):
     return abs(a[0]-b[0]) + abs(a[1]-a[1] + b[1]-b[1]) if False else abs(a[0]-b[0]) + abs(a[1]-b[1])
 
-def a_star(grid, start, goal, max_expand=2500):
+def run_search(it):
+    """Drive a resumable search (a_star_iter/jps_iter) to completion; returns its path."""
+    try:
+        while True:
+            next(it)
+    except StopIteration as done:
+        return done.value
+
+def a_star(grid, start, goal, max_expand=2500, stats=None):
+    return run_search(a_star_iter(grid, start, goal, max_expand, stats))
+
+def a_star_iter(grid, start, goal, max_expand=2500, stats=None):
+    # Resumable A*: yields once per expanded node so callers can spread it over frames
     if start == goal:
+        if stats is not None:
+            stats["expanded"] = 0
         return [start]
+    flags, w, h = grid.flags, grid.w, grid.h
     openh=[]; heapq.heappush(openh, (manhattan(start,goal), 0, start, None))
     came={}; gscore={start:0}
     expanded=0
@@ -34,12 +56,19 @@ def a_star(grid, start, goal, max_expand=2500):
         came[node]=parent
         if node==goal: break
         expanded+=1
-        for nb in neighbors4(grid, node):
+        yield
+        x,y = node
+        for nb in ((x+1,y),(x-1,y),(x,y+1),(x,y-1)):
+            nx,ny = nb
+            if not (0 <= nx < w and 0 <= ny < h and flags[ny*w + nx] & F_PASSABLE):
+                continue
             ng=g+1
             if nb not in gscore or ng<gscore[nb]:
                 gscore[nb]=ng
                 f=ng+manhattan(nb,goal)
                 heapq.heappush(openh,(f,ng,nb,node))
+    if stats is not None:
+        stats["expanded"] = expanded
     if goal not in came:
         return None
     path=[]; cur=goal
@@ -59,14 +88,15 @@ def vec_to_card(v):
 
 # ---------------- Player ----------------
 class Player:
-    def __init__(self, x, y, speed=210, frames_run=None, frames_idle=None):
+    def __init__(self, x, y, speed=210, atlas=None):
         self.pos = pygame.Vector2(x,y)
         self.radius = 12
         self.speed = speed
         self.hiding = False
-        # anim
-        self.frames_run = frames_run or []
-        self.frames_idle = frames_idle or []
+        # anim: "player_run" / "player_idle" in the sprite atlas (sprites.SpriteAtlas)
+        self.atlas = atlas
+        self.n_run = atlas.count("player_run") if atlas else 0
+        self.n_idle = atlas.count("player_idle") if atlas else 0
         self.anim_fps_run = 12
         self.anim_fps_idle = 6
         self.anim_t = 0.0
@@ -95,67 +125,58 @@ class Player:
         if v.x != 0:
             self.facing_left = (v.x < 0)
 
-        self._move_axis(v.x, 0, grid)
-        self._move_axis(0, v.y, grid)
+        self.pos.x, self.pos.y = collision.move(grid, F_SOLID_PLAYER, self.pos.x, self.pos.y, v.x, v.y)
         self._clamp_to_grid(grid)
 
         self._animate(dt)
         self._last_pos.update(self.pos)
 
-    def _move_axis(self, dx, dy, grid):
-        nx = self.pos.x + dx
-        ny = self.pos.y + dy
-        gx,gy = px_to_grid(nx, ny)
-        rng = range(-2,3)
-        for oy in rng:
-            for ox in rng:
-                tx,ty = gx+ox, gy+oy
-                if 0 <= ty < len(grid) and 0 <= tx < len(grid[0]) and grid[ty][tx] in (WALL, CRATE, TREE, ROCK):
-                    r = pygame.Rect(tx*TILE, ty*TILE, TILE, TILE)
-                    if r.collidepoint(nx, self.pos.y):
-                        if dx>0: nx = r.left - 0.1
-                        elif dx<0: nx = r.right + 0.1
-                    if r.collidepoint(self.pos.x, ny):
-                        if dy>0: ny = r.top - 0.1
-                        elif dy<0: ny = r.bottom + 0.1
-        self.pos.x, self.pos.y = nx, ny
-
     def _clamp_to_grid(self, grid):
         self.pos.x = clamp(self.pos.x, TILE, (len(grid[0])-1)*TILE)
         self.pos.y = clamp(self.pos.y, TILE, (len(grid)-1)*TILE)
 
     def _animate(self, dt):
-        want = "run" if (self._moving and self.frames_run) else "idle"
+        want = "run" if (self._moving and self.n_run) else "idle"
         if want != self._sequence:
             self._sequence = want
             self.anim_t = 0.0
             self.frame_i = 0
 
-        frames = self.frames_run if self._sequence == "run" else self.frames_idle
-        if frames:
+        n = self.n_run if self._sequence == "run" else self.n_idle
+        if n:
             fps = self.anim_fps_run if self._sequence == "run" else self.anim_fps_idle
             self.anim_t += dt * fps
-            self.frame_i = int(self.anim_t) % len(frames)
+            self.frame_i = int(self.anim_t) % n
+
+    def sprite(self, scale=1.0):
+        """Current animation frame from the atlas (mirrored when facing left); None without frames."""
+        if self._sequence == "run" and self.n_run:
+            return self.atlas.get("player_run", self.frame_i, self.facing_left, scale=scale)
+        if self.n_idle:
+            return self.atlas.get("player_idle", self.frame_i, self.facing_left, scale=scale)
+        return None
+
+    def enqueue(self, queue, color):
+        """render.RenderQueue counterpart of draw()."""
+        queue.push(self.sprite(queue.scale) or queue.disc(color, self.radius), self.pos, ACTORS)
 
     def draw(self, surf, cam, color):
         p = cam.to_screen(self.pos)
-        frames = self.frames_run if (self._sequence == "run" and self.frames_run) else self.frames_idle
-        if frames:
-            img = frames[self.frame_i]
-            if self.facing_left:
-                img = pygame.transform.flip(img, True, False)
+        img = self.sprite(cam.scale)
+        if img:
             rect = img.get_rect(center=(int(p.x), int(p.y)))
             surf.blit(img, rect)
         else:
-            pygame.draw.circle(surf, color, (int(p.x), int(p.y)), self.radius)
+            pygame.draw.circle(surf, color, (int(p.x), int(p.y)), int(self.radius * cam.scale))
 # ---------------- Hunter (A* Patrol & Chase) ----------------
 class Hunter:
-    def __init__(self, x, y, outdoor=True, frames=None):
+    def __init__(self, x, y, outdoor=True, atlas=None):
         self.pos = pygame.Vector2(x,y)
         self.radius = 12
         self.outdoor = outdoor
 
-        self.frames = frames or []
+        self.atlas = atlas
+        self.n_frames = atlas.count("hunter") if atlas else 0
         self.anim_fps = 10
         self.anim_t = 0.0
         self.frame_i = 0
@@ -179,37 +200,29 @@ class Hunter:
         self.patrol_i = 0
         self.patrol_repath_cd = 0.0
         self.patrol_pick_cd = 0.0
+        self._patrol_req = None  # pathfinding.PathRequest in flight
 
         # CHASE A*
         self.path = None
         self.path_i = 0
         self.repath_cd = 0.0
+        self._chase_req = None
+        self._flow_cell = None  # next cell when following tmap.flow
 
         # anti-stuck
         self._last_pos = self.pos.copy()
         self._stuck_t = 0.0
 
-    def update(self, dt, grid, player, stealth_factor):
+    def update(self, dt, tmap, player, stealth_factor, seen=None):
+        """seen: this frame's result from perception.perceive (None: look on our own)."""
+        grid = tmap.grid
         # --- player on HIDE? hard blind & chase drop ---
         pgx, pgy = px_to_grid(player.pos.x, player.pos.y)
-        player_on_hide = (0 <= pgy < len(grid) and 0 <= pgx < len(grid[0]) and grid[pgy][pgx] == HIDE)
+        player_on_hide = (0 <= pgy < grid.h and 0 <= pgx < grid.w and grid.flags[pgy*grid.w + pgx] & F_HIDE)
 
         # vision (blocked if on HIDE)
-        seen = False
-        self.vision_tick -= dt
-        if self.vision_tick <= 0:
-            self.vision_tick = 0.08
-            if not player_on_hide:
-                to_p = player.pos - self.pos
-                dist = to_p.length()
-                if dist < self.view_dist:
-                    fwd = self.dir if self.dir.length_squared()>0 else pygame.Vector2(1,0)
-                    fwd = fwd.normalize()
-                    u = to_p.normalize() if dist>0 else pygame.Vector2()
-                    if fwd.dot(u) > self.cos_fov:
-                        eff_view = self.view_dist * (1.0 - 0.55*stealth_factor)
-                        if dist < eff_view and line_of_sight(grid, self.pos, player.pos):
-                            seen = True
+        if seen is None:
+            seen = perceive((self,), tmap, player, stealth_factor, dt)[0]
 
         # state transitions
         if seen:
@@ -231,16 +244,20 @@ class Hunter:
             self.search_timer = 1.0
             self.path = None
 
+        if self.state != "chase" and self._chase_req is not None:
+            tmap.paths.release(self._chase_req)  # out of chase: nobody follows that answer
+            self._chase_req = None
+
         # update by state
         if self.state == "chase":
-            self._update_chase(dt, grid, player, player_on_hide)
+            self._update_chase(dt, tmap, player, player_on_hide)
         elif self.state == "search":
-            self._update_patrol(dt, grid, speed_scale=0.9, range_cells=10)
+            self._update_patrol(dt, tmap, speed_scale=0.9, range_cells=10)
             self.search_timer -= dt
             if self.search_timer <= 0:
                 self.state = "patrol"
         else:
-            self._update_patrol(dt, grid, speed_scale=1.0, range_cells=14)
+            self._update_patrol(dt, tmap, speed_scale=1.0, range_cells=14)
 
         # --- HIDE soft repel in all states ---
         if player_on_hide:
@@ -255,9 +272,9 @@ class Hunter:
         self._clamp_to_grid(grid)
 
         moving = (self.pos - self._last_pos).length() > 0.1
-        if moving and self.frames:
+        if moving and self.n_frames:
             self.anim_t += dt * self.anim_fps
-            self.frame_i = int(self.anim_t) % len(self.frames)
+            self.frame_i = int(self.anim_t) % self.n_frames
         else:
             self.anim_t = 0.0
             self.frame_i = 0
@@ -271,29 +288,44 @@ class Hunter:
             self._stuck_t = 0.0
             if self.state == "chase":
                 self.path = None
+                self._flow_cell = None
             else:
                 self.patrol_path = None
                 self.patrol_pick_cd = 0.0
                 self.patrol_repath_cd = 0.0
 
+    def release_requests(self, tmap):
+        """Give back queued searches on tmap (scene change / world reset) so they are skipped."""
+        tmap.paths.release(self._patrol_req)
+        tmap.paths.release(self._chase_req)
+        self._patrol_req = self._chase_req = None
+
     # ---------- PATROL ----------
-    def _update_patrol(self, dt, grid, speed_scale=1.0, range_cells=12):
+    def _update_patrol(self, dt, tmap, speed_scale=1.0, range_cells=12):
+        grid = tmap.grid
         self.patrol_repath_cd -= dt
         self.patrol_pick_cd   -= dt
         s = px_to_grid(self.pos.x, self.pos.y)
 
         if (self.patrol_goal is None or self.patrol_path is None or self.patrol_i >= len(self.patrol_path)) and self.patrol_pick_cd <= 0:
-            self.patrol_goal = self._pick_patrol_goal(grid, s, range_cells)
+            self.patrol_goal = self._pick_patrol_goal(tmap, s, range_cells)
             self.patrol_path = None
             self.patrol_i = 0
             self.patrol_pick_cd = 0.3
-
-        if self.patrol_goal and (self.patrol_path is None or self.patrol_repath_cd <= 0):
-            p = a_star(grid, s, self.patrol_goal)
-            if p and len(p) >= 2:
+            tmap.paths.release(self._patrol_req)  # answer for the old goal is useless now
+            self._patrol_req = None
+
+        # queued on the map's scheduler; keep walking the old path until the answer lands
+        if self.patrol_goal and self._patrol_req is None and (self.patrol_path is None or self.patrol_repath_cd <= 0):
+            prio = PRIO_SEARCH if self.state == "search" else PRIO_PATROL
+            self._patrol_req = tmap.paths.request(s, self.patrol_goal, prio)
+            self.patrol_repath_cd = 0.6
+        if self._patrol_req is not None and self._patrol_req.done():
+            p, i = self._take_path(self._patrol_req, s)
+            self._patrol_req = None
+            if p:
                 self.patrol_path = p
-                self.patrol_i = 1
-                self.patrol_repath_cd = 0.6
+                self.patrol_i = i
             else:
                 self.patrol_goal = None
                 self.patrol_path = None
@@ -320,9 +352,15 @@ class Hunter:
                 self.dir = vec_to_card(to_t)
                 self._step_axis(speed, grid, self.dir)
 
-    def _pick_patrol_goal(self, grid, s, R):
+    def _pick_patrol_goal(self, tmap, s, R):
+        grid = tmap.grid
         W = len(grid[0]); H = len(grid)
         sx, sy = s
+        # shared waypoints first: same goals across hunters -> PathService cache hits
+        near = [c for c in tmap.waypoints()
+                if abs(c[0] - sx) <= R and abs(c[1] - sy) <= R and manhattan(s, c) >= 4]
+        if near:
+            return random.choice(near)
         for _ in range(60):
             gx = max(1, min(W-2, sx + random.randint(-R, R)))
             gy = max(1, min(H-2, sy + random.randint(-R, R)))
@@ -333,7 +371,8 @@ class Hunter:
         return s
 
     # ---------- CHASE ----------
-    def _update_chase(self, dt, grid, player, player_on_hide):
+    def _update_chase(self, dt, tmap, player, player_on_hide):
+        grid = tmap.grid
         d = player.pos - self.pos
         if player_on_hide:
             # immediate back off and drop path (safety)
@@ -344,20 +383,24 @@ class Hunter:
 
         s = px_to_grid(self.pos.x, self.pos.y)
         g = px_to_grid(player.pos.x, player.pos.y)
-
-        self.repath_cd -= dt
-        if self.path is None or self.path_i >= len(self.path) or self.repath_cd <= 0:
-            p = a_star(grid, s, g)
-            if p and len(p) >= 2:
-                self.path = p
-                self.path_i = 1
-                self.repath_cd = 0.35
-            else:
-                self.path = None
-
         speed = self.speed_chase * dt
         moved=False
-        if self.path:
+
+        if tmap.chase_mode == "flow":
+            moved = self._follow_flow(tmap, s, g, speed)
+        else:
+            self.repath_cd -= dt
+            if self._chase_req is None and (self.path is None or self.path_i >= len(self.path) or self.repath_cd <= 0):
+                self._chase_req = tmap.paths.request(s, g, PRIO_CHASE)
+                self.repath_cd = 0.35
+            if self._chase_req is not None and self._chase_req.done():
+                req, self._chase_req = self._chase_req, None
+                if manhattan(req.goal, g) <= 1:
+                    self.path, self.path_i = self._take_path(req, s)
+                else:  # player moved on while the search ran: ask again right away
+                    self.repath_cd = 0.0
+
+        if self.path and tmap.chase_mode != "flow":
             tgt_g = self.path[self.path_i]
             tgt_c = grid_center(*tgt_g)
             to_t = tgt_c - self.pos
@@ -383,53 +426,83 @@ class Hunter:
                     if not self._step_axis(speed, grid, pygame.Vector2(dx,0)):
                         self._step_axis(speed, grid, pygame.Vector2(0,-dy))
 
+    @staticmethod
+    def _take_path(req, s):
+        """(path, next index) from a finished request, or (None, 0) if it is no use from s."""
+        p = req.result()
+        if not p or len(p) < 2:
+            return None, 0
+        for k in range(min(3, len(p) - 1)):  # we may have moved a tile since asking
+            if p[k] == s:
+                return p, k + 1
+        return None, 0
+
+    def _follow_flow(self, tmap, s, g, speed):
+        # shared distance map toward the player; rebuilt only when the player changes tile
+        tmap.flow.update(g)
+        c = self._flow_cell
+        if c is None or manhattan(s, c) > 1 or (grid_center(*c) - self.pos).length() < 2.0:
+            c = self._flow_cell = tmap.flow.next_cell(s)
+        if c is None:
+            return False  # at the player's tile or out of range: steer directly
+        to_t = grid_center(*c) - self.pos
+        if to_t.length() > 0:
+            self.dir = vec_to_card(to_t)
+            return self._step_axis(speed, tmap.grid, self.dir)
+        return False
+
     # ---------- Movement & Collisions ----------
     def _step_axis(self, step_len, grid, dirv):
-        start = self.pos.copy()
-        step = dirv * step_len
-        nx = self.pos.x + step.x
-        ny = self.pos.y
-        nx, ny = self._solve_axis(nx, ny, step.x, 0, grid)
-        ny = ny + step.y
-        nx, ny = self._solve_axis(nx, ny, 0, step.y, grid)
-        self.pos.x, self.pos.y = nx, ny
+        x0, y0 = self.pos.x, self.pos.y
+        self.pos.x, self.pos.y = collision.move(grid, F_SOLID_HUNTER, x0, y0, dirv.x*step_len, dirv.y*step_len)
         self._clamp_to_grid(grid)
-        return (self.pos - start).length() > 0.1
-
-    def _solve_axis(self, newx, newy, dx, dy, grid):
-        x,y = newx, newy
-        gx, gy = px_to_grid(x, y)
-        rng = range(-2,3)
-        for oy in rng:
-            for ox in rng:
-                tx,ty = gx+ox, gy+oy
-                if 0<=ty<len(grid) and 0<=tx<len(grid[0]) and grid[ty][tx] in (WALL, CRATE):
-                    r = pygame.Rect(tx*TILE, ty*TILE, TILE, TILE)
-                    if r.collidepoint(x, self.pos.y):
-                        if dx>0: x = min(x, r.left - 0.1)
-                        elif dx<0: x = max(x, r.right + 0.1)
-                    if r.collidepoint(self.pos.x, y):
-                        if dy>0: y = min(y, r.top - 0.1)
-                        elif dy<0: y = max(y, r.bottom + 0.1)
-        return x,y
+        return math.hypot(self.pos.x - x0, self.pos.y - y0) > 0.1
 
     def _clamp_to_grid(self, grid):
         self.pos.x = clamp(self.pos.x, TILE, (len(grid[0])-1)*TILE)
         self.pos.y = clamp(self.pos.y, TILE, (len(grid)-1)*TILE)
 
 
+    def sprite(self, scale=1.0):
+        """Current run frame from the atlas (mirrored when facing left); None without frames."""
+        if not self.n_frames:
+            return None
+        return self.atlas.get("hunter", self.frame_i, self.facing_left, scale=scale)
+
+    def enqueue(self, queue, colors):
+        """render.RenderQueue counterpart of draw() (no FOV circle)."""
+        queue.push(self.sprite(queue.scale) or queue.disc(colors["hunter"], self.radius), self.pos, ACTORS)
+
     def draw(self, surf, cam, colors, show_fov=False):
         p = cam.to_screen(self.pos)
 
-        if self.frames:
-            img = self.frames[self.frame_i]
-            if self.facing_left:
-                img = pygame.transform.flip(img, True, False)
+        img = self.sprite(cam.scale)
+        if img:
             rect = img.get_rect(center=(int(p.x), int(p.y)))
             surf.blit(img, rect)
         else:
             # Fallback (eski daire)
-            pygame.draw.circle(surf, colors["hunter"], (int(p.x), int(p.y)), self.radius)
+            pygame.draw.circle(surf, colors["hunter"], (int(p.x), int(p.y)), int(self.radius * cam.scale))
 
         if show_fov:
-            pygame.draw.circle(surf, colors["fov"], (int(p.x), int(p.y)), int(self.view_dist), 1)
\ No newline at end of file
+            pygame.draw.circle(surf, colors["fov"], (int(p.x), int(p.y)), int(self.view_dist * cam.scale), 1)
+
+
+def separate(hunters, index, grid, dt, speed=HUNTER_SEPARATION):
+    """
+    Crowd separation: each hunter steps away from the ones overlapping it (index: the
+    scene's spatial.SpatialHash, synced), at most speed*dt px per frame, wall-aware.
+    """
+    for h in hunters:
+        push = pygame.Vector2()
+        for o in index.neighbors(h, 2 * h.radius):  # hunters share one radius
+            d = h.pos - o.pos
+            gap = h.radius + o.radius - d.length()
+            if gap <= 0:
+                continue
+            if d.length_squared() == 0:  # exactly stacked (same spawn): split by identity
+                d = pygame.Vector2(1 if id(h) < id(o) else -1, 0)
+            push += d.normalize() * gap
+        if push.length_squared() > 0:
+            step = min(push.length() * 0.5, speed * dt)
+            h._step_axis(step, grid, push.normalize())
@@ -1,97 +1,60 @@
 # footprints.py
 import pygame
 import math
-from collections import deque
-from config import TILE, FLOOR
+from config import TILE
+from render import GROUND
+from sprites import SpriteAtlas
+
+PAW_ALPHA = 190
 
 
 class Footprints:
     """
     Mevcut oyun mimarisiyle uyumlu ayak izi yönlendirmesi.
-    - compute_from_to(grid, start_g, goal_g, passables): BFS ile grid üstünde yol hesaplar.
+    - follow_field(field, start_g): hedef kökenli mesafe alanında yokuş aşağı yürür.
     - draw(surf, cam): yolu kaplan patisi simgesiyle çizer (PNG varsa onu, yoksa prosedürel).
+    - enqueue(queue, cam): aynı patiler, render.RenderQueue'ya (GROUND katmanı).
     """
 
-    def __init__(self, color=(200, 160, 120)):
+    def __init__(self, color=(200, 160, 120), atlas=None):
         self.color = color
         self.step_tiles = 7
         self.points: list[tuple[int, int]] = []  # grid noktaları (gx, gy)
-        self._rot_cache: dict[int, pygame.Surface] = {}
-        self._paw_base: pygame.Surface | None = None
-        self._load_or_build_paw()
+        # pati "paw" olarak atlasta; döndürülmüş/saydam halleri atlas önbelleğinden gelir
+        self.atlas = atlas if atlas is not None else SpriteAtlas()
+        self.load_paw(self.atlas)
 
     # ---------- public API ----------
-    def compute_from_to(self, grid, start_g, goal_g, passables):
-        """
-        grid: 2D list (grid[y][x])
-        start_g, goal_g: (gx, gy)
-        passables: geçilebilir tile id'leri (örn: (FLOOR, BUSH, ...))
-        """
-        if not goal_g or not start_g:
-            self.points = []
-            return
-
-        sx, sy = start_g
-        gx, gy = goal_g
-        h = len(grid)
-        w = len(grid[0]) if h > 0 else 0
-
-        def in_bounds(x, y):
-            return 0 <= x < w and 0 <= y < h
-
-        def is_passable(x, y):
-            return in_bounds(x, y) and (grid[y][x] in passables or (x, y) == (gx, gy))
-
-        # Klasik BFS
-        came_from = {(sx, sy): None}
-        q = deque([(sx, sy)])
-        found = False
-
-        while q:
-            x, y = q.popleft()
-            if (x, y) == (gx, gy):
-                found = True
-                break
-            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
-                nx, ny = x + dx, y + dy
-                if (nx, ny) not in came_from and is_passable(nx, ny):
-                    came_from[(nx, ny)] = (x, y)
-                    q.append((nx, ny))
-
-        if not found:
-            self.points = []
-            return
-
-        # Yol rekonstrüksiyonu
-        path = []
-        cur = (gx, gy)
-        while cur is not None:
-            path.append(cur)
-            cur = came_from[cur]
-        path.reverse()
-
-        # Başlangıç karesini çizmek istemiyorsan ilkini atabilirsin:
-        # if path and path[0] == (sx, sy): path = path[1:]
-
-        self.points = path
+    def follow_field(self, field, start_g):
+        """Trail = downhill walk on a goal-rooted DistanceField; O(path length), no search."""
+        self.points = field.walk(start_g) if start_g else []
 
     def draw(self, surf: pygame.Surface, cam):
         """İzleri her 7 karede bir (self.step_tiles) çizer."""
-        if not self.points or self._paw_base is None:
+        s = cam.scale
+        sox, soy = cam.screen_offset()
+        for img, (wx, wy) in self._paws(cam):
+            rect = img.get_rect(center=(int(wx * s) - sox, int(wy * s) - soy))
+            surf.blit(img, rect)
+
+    def enqueue(self, queue, cam):
+        """draw() yerine: patiler kuyrukta kamera dışındaysa hemen elenir."""
+        for img, pos in self._paws(cam):
+            queue.push(img, pos, GROUND)
+
+    # ---------- internal helpers ----------
+    def _paws(self, cam):
+        """(döndürülmüş pati, dünya merkezi) her step_tiles'ıncı iz noktası için."""
+        if not self.points:
             return
 
-        paw = self._paw_base
-        alpha = 190
+        atlas, scale = self.atlas, cam.scale
         step = getattr(self, "step_tiles", 7)
         n = len(self.points)
 
         for i in range(0, n, step):
             gx, gy = self.points[i]
 
-            # ekran merkezi
-            px = gx * TILE + TILE // 2 - int(cam.offset.x)
-            py = gy * TILE + TILE // 2 - int(cam.offset.y)
-
             # yön: bir SONRAKİ hedefe bak (mümkünse i+step), yoksa yakın komşu
             if i + step < n:
                 nx, ny = self.points[i + step]
@@ -108,31 +71,25 @@ class Footprints:
             else:
                 angle_deg = math.degrees(math.atan2(-dy, dx))  # sağa 0°
 
-            img = self._get_rotated_cached(paw, angle_deg)
-            img.set_alpha(alpha)
-            rect = img.get_rect(center=(px, py))
-            surf.blit(img, rect)
+            img = atlas.get("paw", angle=angle_deg, alpha=PAW_ALPHA, scale=scale)
+            yield img, (gx * TILE + TILE // 2, gy * TILE + TILE // 2)
 
-    # ---------- internal helpers ----------
-    def _load_or_build_paw(self):
-        """assets/paw.png varsa kullan; yoksa prosedürel patik yap."""
+    @staticmethod
+    def load_paw(atlas):
+        """
+        "paw"ı atlasa kaydeder (yoksa): assets/paw.png (baked cache'li), yoksa prosedürel pati.
+        Game.load_sprites bunu boot sırasında çağırır, böylece "prewarm" adımı patileri de hazırlar.
+        """
+        if "paw" in atlas:
+            return
         size = int(TILE * 0.7)
         try:
-            img = pygame.image.load("assets/images/paw.png").convert_alpha()
-            self._paw_base = pygame.transform.smoothscale(img, (size, size))
+            atlas.load_image("paw", "assets/images/paw.png", (size, size))
         except Exception:
-            self._paw_base = self._make_procedural_paw(size)
-
-    def _get_rotated_cached(self, base: pygame.Surface, angle_deg: float) -> pygame.Surface:
-        """15° adımlarına yuvarlayıp cache’ten döndür."""
-        step = 15
-        key = (int(round(angle_deg / step)) * step) % 360
-        if key not in self._rot_cache:
-            # Saat yönü pozitif olsun diye eksi veriyoruz (pygame rotate CCW)
-            self._rot_cache[key] = pygame.transform.rotate(base, -key)
-        return self._rot_cache[key]
-
-    def _make_procedural_paw(self, size: int) -> pygame.Surface:
+            atlas.add("paw", [Footprints._make_procedural_paw(size)])
+
+    @staticmethod
+    def _make_procedural_paw(size: int) -> pygame.Surface:
         """
         Şeffaf arkaplanlı basit bir kaplan patisi: ana yastık + 4 parmak.
         Renk: koyu gri; alfa: hafif saydam.
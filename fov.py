@@ -0,0 +1,192 @@
+# fov.py — symmetric shadowcasting over F_BLOCKS_LOS tiles (Albert Ford's variant)
+# Symmetric: b is visible from a exactly when a is visible from b (for non-blocking tiles),
+# so one cast from the player answers "can this hunter see the player" for every hunter.
+import pygame
+from config import F_BLOCKS_LOS, TILE, FOG_RINGS, FOG_EXPLORED, FOV_RADIUS
+
+# fog window: tiles upscaled beyond the camera's, so small camera moves reuse it
+FOG_MARGIN = 4
+
+# quadrant transforms: (depth, col) -> (dx, dy) = (col*cx + depth*dx, col*cy + depth*dy)
+_QUADRANTS = ((0, -1, 1, 0), (1, 0, 0, 1), (0, 1, -1, 0), (-1, 0, 0, -1))  # N, E, S, W: (dx, dy, cx, cy)
+
+
+def shadowcast(flags, w, h, origin, radius):
+    """
+    Tiles visible from origin, at most `radius` rows out in each quadrant.
+    Returns a bitset: bytearray with bit (y*w + x) set for every visible tile.
+    Blocking tiles are visible themselves (you see the wall); off-map counts as blocking.
+    Slopes are kept as exact integer fractions (num, den), den > 0.
+    """
+    bits = bytearray((w*h + 7) >> 3)
+    ox, oy = origin
+    if not (0 <= ox < w and 0 <= oy < h):
+        return bits
+    i = oy*w + ox
+    bits[i >> 3] |= 1 << (i & 7)
+
+    for dx, dy, cx, cy in _QUADRANTS:
+        rows = [(1, -1, 1, 1, 1)]  # depth, start slope sn/sd, end slope en/ed
+        while rows:
+            depth, sn, sd, en, ed = rows.pop()
+            if depth > radius:
+                continue
+            bx = ox + depth*dx
+            by = oy + depth*dy
+            prev = None  # None / True (blocking) / False (open)
+            lo = (2*depth*sn + sd) // (2*sd)          # round half up of depth*start
+            hi = -((ed - 2*depth*en) // (2*ed))       # round half down of depth*end
+            for col in range(lo, hi + 1):
+                x = bx + col*cx
+                y = by + col*cy
+                inside = 0 <= x < w and 0 <= y < h
+                wall = not inside or bool(flags[y*w + x] & F_BLOCKS_LOS)
+                if inside and (wall or (depth*sn <= col*sd and col*ed <= depth*en)):
+                    j = y*w + x
+                    bits[j >> 3] |= 1 << (j & 7)
+                if prev is True and not wall:
+                    sn, sd = 2*col - 1, 2*depth
+                if prev is False and wall:
+                    rows.append((depth + 1, sn, sd, 2*col - 1, 2*depth))
+                prev = wall
+            if prev is False:
+                rows.append((depth + 1, sn, sd, en, ed))
+    return bits
+
+
+def is_visible(bits, w, x, y):
+    i = y*w + x
+    return bits[i >> 3] >> (i & 7) & 1
+
+
+class TileFog:
+    """
+    Occlusion-aware fog for one map (TileMap.fog, Game fog_mode "shadow").
+    - Visible tiles come from TileMap.visible_from (the player's shadowcast), darkened by
+      FOG_RINGS distance; tiles seen before stay in `explored` (bitset) and are only dimmed.
+    - The fog is a tile-resolution alpha mask (one pixel per tile, w*h*4 bytes), repainted
+      only around the tiles that changed, when the player's tile or the grid changes.
+    - draw() keeps only the camera's tile window (plus FOG_MARGIN tiles) of that mask upscaled:
+      a mask change re-upscales the changed tiles inside it, the camera leaving it re-upscales
+      the window once; other frames are one blit. The window is view-sized, so memory does not
+      grow with the map.
+    - scale: screen px per map px (Camera.scale; the "native" pipeline draws at zoom). A new scale
+      only re-upscales the window; the mask is kept.
+    """
+
+    def __init__(self, tmap):
+        self.tmap = tmap
+        self.explored = bytearray((tmap.w_tiles * tmap.h_tiles + 7) >> 3)
+        self._key = None     # (cell, version) last painted
+        self._box = None     # tile rect (x0, y0, x1, y1) the last visible set could touch
+        self._rgba = None    # mask pixels: BGRA (0, 0, 0, alpha) per tile, row-major
+        self._mask = None    # w x h SRCALPHA surface over _rgba (frombuffer: shares the bytes)
+        self._window = None  # upscaled part of _mask: (tile rect, Surface)
+        self._dirty = None   # tile rect painted since the window was last brought up to date
+        self._ring_alpha = None
+        self._scale = 1.0
+
+    def update(self, cell, scale=1.0):
+        t = self.tmap
+        if scale != self._scale:
+            self._scale, self._window = scale, None
+        key = (cell, t.version)
+        if key == self._key:
+            return
+        bits = t.visible_from(cell)
+        n = len(bits)
+        self.explored = bytearray((int.from_bytes(self.explored, "little") |
+                                   int.from_bytes(bits, "little")).to_bytes(n, "little"))
+        if self._mask is None:
+            w, h = t.w_tiles, t.h_tiles
+            self._rgba = bytearray(4 * w * h)
+            self._rgba[3::4] = b"\xff" * (w * h)
+            self._mask = pygame.image.frombuffer(self._rgba, (w, h), "BGRA")  # native ARGB: fast blits
+            self._ring_alpha = _ring_alphas(FOV_RADIUS)
+        box = self._around(cell)
+        if self._key is None or self._key[1] != t.version:
+            dirty = (0, 0, t.w_tiles, t.h_tiles)  # grid changed: explored/visible anywhere may differ
+        else:
+            old = self._box
+            dirty = (min(old[0], box[0]), min(old[1], box[1]), max(old[2], box[2]), max(old[3], box[3]))
+        self._paint(dirty, bits, cell)
+        d = self._dirty
+        self._dirty = dirty if d is None else (min(d[0], dirty[0]), min(d[1], dirty[1]),
+                                               max(d[2], dirty[2]), max(d[3], dirty[3]))
+        self._key, self._box = key, box
+
+    def draw(self, surf, cam):
+        if self._mask is None:
+            return
+        s = TILE * self._scale
+        sox, soy = cam.screen_offset()
+        sw, sh = surf.get_size()
+        w, h = self.tmap.w_tiles, self.tmap.h_tiles
+        need = (max(0, int(sox // s)), max(0, int(soy // s)),
+                min(w, int((sox + sw) // s) + 1), min(h, int((soy + sh) // s) + 1))
+        win = self._window
+        if win is None or not (win[0][0] <= need[0] and win[0][1] <= need[1] and
+                               need[2] <= win[0][2] and need[3] <= win[0][3]):
+            win = self._window = self._upscale(need, s)
+        elif self._dirty is not None:
+            self._refresh(win, s)
+        self._dirty = None
+        (x0, y0, _, _), layer = win
+        surf.blit(layer, (int(x0 * s) - sox, int(y0 * s) - soy))
+
+    def memory(self):
+        """Bytes held: the tile mask plus the upscaled window."""
+        win = 0 if self._window is None else self._window[1].get_width() * self._window[1].get_height() * 4
+        return (len(self._rgba) if self._rgba is not None else 0) + win
+
+    # ---------- internal ----------
+    def _around(self, cell):
+        r, (cx, cy) = FOV_RADIUS, cell
+        return (max(0, cx - r), max(0, cy - r), min(self.tmap.w_tiles, cx + r + 1), min(self.tmap.h_tiles, cy + r + 1))
+
+    def _upscale(self, need, s):
+        w, h, m = self.tmap.w_tiles, self.tmap.h_tiles, FOG_MARGIN
+        x0, y0 = max(0, need[0] - m), max(0, need[1] - m)
+        x1, y1 = min(w, max(x0 + 1, need[2] + m)), min(h, max(y0 + 1, need[3] + m))
+        size = (int(x1 * s) - int(x0 * s), int(y1 * s) - int(y0 * s))
+        return (x0, y0, x1, y1), pygame.transform.scale(self._mask.subsurface((x0, y0, x1 - x0, y1 - y0)), size)
+
+    def _refresh(self, win, s):
+        """Re-upscale the dirty tiles that fall inside the window, in place."""
+        (wx0, wy0, wx1, wy1), layer = win
+        x0, y0 = max(wx0, self._dirty[0]), max(wy0, self._dirty[1])
+        x1, y1 = min(wx1, self._dirty[2]), min(wy1, self._dirty[3])
+        if x1 <= x0 or y1 <= y0:
+            return
+        ox, oy = int(wx0 * s), int(wy0 * s)
+        lx, ly = int(x0 * s), int(y0 * s)
+        size = (int(x1 * s) - lx, int(y1 * s) - ly)
+        pygame.transform.scale(self._mask.subsurface((x0, y0, x1 - x0, y1 - y0)), size,
+                               layer.subsurface((lx - ox, ly - oy, *size)))
+
+    def _paint(self, dirty, bits, cell):
+        x0, y0, x1, y1 = dirty
+        w, explored, rgba, rings = self.tmap.w_tiles, self.explored, self._rgba, self._ring_alpha
+        cx, cy = cell
+        dim = int(FOG_EXPLORED * 255)
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                i = y*w + x
+                if bits[i >> 3] >> (i & 7) & 1:
+                    a = min(dim, rings.get((abs(x - cx), abs(y - cy)), 255))
+                elif explored[i >> 3] >> (i & 7) & 1:
+                    a = dim
+                else:
+                    a = 255
+                rgba[4*i + 3] = a
+
+
+def _ring_alphas(radius):
+    """(|dx|, |dy|) in tiles -> fog alpha from FOG_RINGS (innermost ring reaching the tile centre)."""
+    rings = sorted(FOG_RINGS)
+    out = {}
+    for dy in range(radius + 1):
+        for dx in range(radius + 1):
+            d = (dx*dx + dy*dy) ** 0.5
+            out[(dx, dy)] = next((int(ratio * 255) for r, ratio in rings if d <= r), 255)
+    return out
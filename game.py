@@ -4,41 +4,76 @@ from utils import load_json, save_json, grid_to_px, px_to_grid
 from audio import Audio
 from camera import *
 from tilemap import TileMap
-from entities import Player, Hunter
-from footprints import Footprints
+from warehouses import Warehouses
+from mapfile import MapCorpus, SEED_MASK
+from pathfinding import shutdown_workers
+from entities import Player, Hunter, separate
+from perception import perceive
+from resolution import DynamicResolution
+from render import RenderQueue, ACTORS
+from sprites import SpriteAtlas, ROT_STEP
+from assetcache import AssetCache
+from footprints import Footprints, PAW_ALPHA
+from boot import Loader
 from states import State
-from ui import draw_menu, draw_themes, draw_scores
+from ui import draw_menu, draw_themes, draw_scores, draw_boot
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, pipeline=None):
         pygame.init()
         pygame.display.set_caption("Tiger Rescue – The Footprint Maze")
-        # 1080p tam ekran
-        self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H), pygame.FULLSCREEN)
+        self.settings = load_json(SETTINGS_PATH, DEFAULT_SETTINGS.copy())
 
         # Biraz yakınlaştır (ör. 1.30). İstersen 1.20–1.50 arası denersin
         self.zoom = 1.30
         self.view_w = int(SCREEN_W / self.zoom)
         self.view_h = int(SCREEN_H / self.zoom)
 
-        # Oyun sahnesini çizeceğimiz küçük yüzey
-        self.view = pygame.Surface((self.view_w, self.view_h), pygame.SRCALPHA)
-
-        # Fog, view boyutunda olmalı
-        self.darkness_base = pygame.Surface((self.view_w, self.view_h), pygame.SRCALPHA)
-        self.darkness_base.fill((0, 0, 0, 255))
+        # Render pipeline (config.RENDER_PIPELINE): sahne nereye çizilir, ekrana nasıl büyütülür
+        self.pipeline = pipeline or self.settings.get("render_pipeline", RENDER_PIPELINE)
+        self.screen = None
+        if self.pipeline == "scaled":
+            # mantıksal çözünürlük = view; SDL tam ekrana kendisi büyütür
+            try:
+                self.screen = pygame.display.set_mode((self.view_w, self.view_h), pygame.FULLSCREEN | pygame.SCALED)
+            except pygame.error as e:
+                print("[WARN] SCALED ekran açılamadı, smooth pipeline:", e)
+                self.pipeline = "smooth"
+        if self.screen is None:
+            # 1080p tam ekran
+            self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H), pygame.FULLSCREEN)
+
+        # ekran px / dünya px: "native" dünyayı doğrudan ekran çözünürlüğünde çizer (~zoom)
+        self.px_scale = self.screen.get_width() / self.view_w if self.pipeline == "native" else 1.0
+
+        # Oyun sahnesini çizeceğimiz yüzey: "smooth"/"nearest" için küçük, opak (convert) ara yüzey;
+        # "native"/"scaled" doğrudan ekrana çizer
+        if self.pipeline in ("native", "scaled"):
+            self.view = self.screen
+        else:
+            self.view = pygame.Surface((self.view_w, self.view_h)).convert()
+        # Dinamik çözünürlük: yalnız ara yüzeyli pipeline'larda (bkz. set_render_scale)
+        self.res = None
+        if self.view is not self.screen and self.settings.get("dynamic_resolution", RES_DYNAMIC):
+            self.res = DynamicResolution(RES_SCALES, RES_BUDGET_MS, RES_WINDOW, RES_DOWN, RES_UP, RES_HOLD)
+
+        # Sprite'lar (ayak izi, kaplan, avcı, oyuncu) kareye bir kuyrukla çizilir (render.RenderQueue)
+        self.render_queue = RenderQueue()
+
+        # Fog: "rings" → FOG_RINGS damgası (bkz. fog_stamp), "shadow" → TileMap.fog
+        self._fog_stamp = None
+        self._fog_stamp_key = None
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("arial", 22)
-        self.bigfont = pygame.font.SysFont("arial", 40, bold=True)
+        self.font = self.bigfont = None  # boot loader: "fonts"
 
-        self.settings = load_json(SETTINGS_PATH, DEFAULT_SETTINGS.copy())
+        self.fog_mode = self.settings.get("fog_mode", FOG_MODE)
         self.theme_name = self.settings.get("theme","Classic Jungle")
         self.colors = THEMES.get(self.theme_name, THEMES["Classic Jungle"])
 
         self.audio = Audio(self.settings)
 
-        self.state = State.MENU
+        self.state = State.BOOT
         self.running = True
 
         self.menu_items = ["Games", "Scores", "Themes", "Quit"]
@@ -53,125 +88,140 @@ class Game:
         self.chase_hold_t = 0.0
         self.music_mode = None
 
-        # Footprint timing
-        self.fp_timer = 0.0
-        self.fp_interval_out = 0.8
-        self.fp_interval_in  = 0.6
+        # Footprints: trail is re-walked whenever the player changes tile
+        self.fp_tile = None
+
+        # F3 debug overlay (perf counters)
+        self.show_debug = False
 
         # Scene transition protections (fix flicker)
         self.scene_cooldown = 0.0      # seconds; blocks rapid enter/exit
         self.indoor_exit_tile = (1, 1) # indoor tile to exit from
         self.left_entry_tile = True    # require leaving entry tile before exit allowed
-        # Sprites (tree & rock)
-        self.tree_img = None
-        self.rock_img = None
-        try:
-            img = pygame.image.load("assets/images/tree.png").convert_alpha()
-            size = int(TILE * TREE_SCALE)
-            self.tree_img = pygame.transform.smoothscale(img, (size, size))
-        except Exception:
-            self.tree_img = None
+        # Sprites: her sheet bir kez yüklenip ölçeklenir, çevrilmiş/döndürülmüş halleri atlasta
+        # (sprites.SpriteAtlas); Player/Hunter/Footprints/kaplan hep buradan çizer
+        self.baked = AssetCache(BAKED_DIR, enabled=self.settings.get("asset_cache", ASSET_CACHE))
+        self.atlas = SpriteAtlas(cache=self.baked)
+        self.tree_img = self.rock_img = None
+        self.menu_bg = None
+        # Haritalar seed'den üretilir; MAP_DIR'deki hazır haritalar üretmeden yüklenir
+        self.maps = MapCorpus(MAP_DIR, enabled=self.settings.get("map_corpus", MAP_CORPUS))
+        self.world_seed = None
+        self.overworld = self.warehouses = None  # start_game → reset_world builds them (main thread)
+
+        # Asset'ler arka planda yüklenir (boot.Loader), pencere hemen açılır ve State.BOOT
+        # ilerleme çubuğunu çizer. Önce menünün ihtiyaçları: menü bunlar bitince açılır,
+        # oyun asset'leri (sprite, sfx, dünya, oyun müzikleri) arkada yüklenmeye devam eder.
+        self.loader = Loader()
+        self.loader.add("fonts", "menu", self.load_fonts)
+        self.loader.add("menu_bg", "menu", self.load_menu_bg)
+        self.loader.add("music:menu", "menu", lambda: self.audio.load_music(("menu",)))
+        self.loader.add("sprites", "game", self.load_sprites)
+        self.loader.add("sfx", "game", self.audio.load_sfx)
+        self.loader.add("prewarm", "game", self.prewarm_sprites, after=("sprites",))
+        self.loader.add("music", "game", self.audio.load_music)
+        self.boot_group = "menu"          # BOOT ekranı bu grup hazır olunca boot_then'e geçer
+        self.boot_then = self.enter_menu
+        self.loader.start()
+
+    # ---------------- Loading (boot.Loader steps, background thread) ----------------
+    def load_fonts(self):
+        self.font = pygame.font.SysFont("arial", 22)
+        self.bigfont = pygame.font.SysFont("arial", 40, bold=True)
 
-        # rock
+    def load_menu_bg(self):
         try:
-            img = pygame.image.load("assets/images/rock.png").convert_alpha()
-            size = int(TILE * ROCK_SCALE)
-            self.rock_img = pygame.transform.smoothscale(img, (size, size))
-        except Exception:
-            self.rock_img = None
+            # Ekrana tam oturt (1920x1080, "scaled" pipeline'da view boyutu)
+            size = self.screen.get_size()
+            path = "assets/images/menu.png"
+            self.menu_bg = self.baked.load(path, ("image", size), fmt="RGB",
+                                           build=lambda: pygame.transform.smoothscale(pygame.image.load(path).convert(), size))
+        except Exception as e:
+            print("[WARN] menu.png yüklenemedi:", e)
 
+    def load_sprites(self):
+        # tree & rock
+        for name, scale in (("tree", TREE_SCALE), ("rock", ROCK_SCALE)):
+            try:
+                size = int(TILE * scale)
+                self.atlas.load_image(name, f"assets/images/{name}.png", (size, size))
+            except Exception:
+                pass
+        self.tree_img = self.atlas.base("tree")
+        self.rock_img = self.atlas.base("rock")
 
         # --- Hunter running sprite (7 frames in one row) ---
-        self.hunter_frames = []
-
         try:
-            sheet = pygame.image.load("assets/images/hunter_run.png").convert_alpha()
-            cols = 7
-            fw, fh = sheet.get_width() // cols, sheet.get_height()
-            tw, th = int(TILE * HUNTER_SCALE), int(TILE * HUNTER_SCALE)
-            for i in range(cols):
-                frame = sheet.subsurface(pygame.Rect(i * fw, 0, fw, fh))
-                self.hunter_frames.append(pygame.transform.smoothscale(frame, (tw, th)))
+            size = int(TILE * HUNTER_SCALE)
+            self.atlas.load_strip("hunter", "assets/images/hunter_run.png", (size, size), cols=7)
         except Exception as e:
             print("[WARN] hunter_run yüklenemedi:", e)
 
-        # --- Menu background ---
-        self.menu_bg = None
-        try:
-            img = pygame.image.load("assets/images/menu.png").convert()
-            # Ekrana tam oturt (1920x1080)
-            self.menu_bg = pygame.transform.smoothscale(img, (SCREEN_W, SCREEN_H))
-        except Exception as e:
-            print("[WARN] menu.png yüklenemedi:", e)
-
-        # --- Player idle/run sprite strips ---
-        self.player_frames_run = []
-        self.player_frames_idle = []
-
-        def _load_strip(path, default_cols, scale=1.25):
+        # --- Player idle/run sprite strips (çoğu strip kareleri kare olur: frame_w ~ h) ---
+        size = int(TILE * 6.00)
+        for name, path, cols in (("player_run", "assets/images/player_run.png", 7),
+                                 ("player_idle", "assets/images/player_stay.png", 4)):
             try:
-                img = pygame.image.load(path).convert_alpha()
+                self.atlas.load_strip(name, path, (size, size), default_cols=cols)
             except Exception:
-                return []
-            h = img.get_height()
-            # çoğu strip kareleri kare olur: frame_w ~ h
-            cols = img.get_width() // h if img.get_width() % h == 0 else default_cols
-            cols = max(1, cols)
-            fw = img.get_width() // cols
-            tw, th = int(TILE * scale), int(TILE * scale)
-            frames = []
-            for i in range(cols):
-                sub = img.subsurface(pygame.Rect(i * fw, 0, fw, h))
-                frames.append(pygame.transform.smoothscale(sub, (tw, th)))
-            return frames
-
-        self.player_frames_run = _load_strip("assets/images/player_run.png", default_cols=7, scale=6.00)
-        self.player_frames_idle = _load_strip("assets/images/player_stay.png", default_cols=4, scale=6.00)
-        print(f"[player] run:{len(self.player_frames_run)} idle:{len(self.player_frames_idle)}")
+                pass
+        print(f"[player] run:{self.atlas.count('player_run')} idle:{self.atlas.count('player_idle')}")
 
         # --- Tiger sprite ---
-        self.tiger_img = None
         try:
-            img = pygame.image.load("assets/images/tiger.png").convert_alpha()
             size = int(TILE * 1.35)  # istersen 1.2–1.6 arası oynat
-            self.tiger_img = pygame.transform.smoothscale(img, (size, size))
+            self.atlas.load_image("tiger", "assets/images/tiger.png", (size, size))
         except Exception as e:
             print("[WARN] tiger.png yüklenemedi:", e)
 
+        # --- Footprint paw (Footprints() reuses it; prewarm builds its headings) ---
+        Footprints.load_paw(self.atlas)
+
+    def enter_menu(self):
+        self.state = State.MENU
         self.audio.play_music("menu")
-        self.reset_world()
 
     # ---------------- World/Scenes ----------------
     def reset_world(self):
-        self.overworld = TileMap(80, 60, self.colors, kind="overworld", images={"tree": self.tree_img, "rock": self.rock_img})
-        self.warehouses = [TileMap(41,31,self.colors,kind="warehouse") for _ in self.overworld.doors]
+        if self.overworld is not None:  # old world's queued searches are moot
+            self.release_hunter_requests()
+        seed = self.world_seed = self.pick_world_seed()
+        images = {"tree": self.tree_img, "rock": self.rock_img}
+        self.overworld = self.maps.get(("overworld", 80, 60, seed),
+                                       lambda: TileMap(80, 60, self.colors, kind="overworld", images=images, seed=seed),
+                                       self.colors, images)
+        self.overworld.paths.mode = self.settings.get("path_mode", PATH_MODE)
+        self.overworld.renderer = self.settings.get("tile_renderer", TILE_RENDERER)
+        # Depolar kapıya gelince (ya da arka planda) üretilir; kaplan sayıları şimdiden belli
+        if self.warehouses is not None:
+            self.warehouses.stop()
+        self.warehouses = Warehouses(self.overworld.doors, self.make_warehouse, rng=random.Random(f"{seed}/warehouses"))
 
         self.player = Player(
             *grid_to_px(self.overworld.w_tiles // 2, self.overworld.h_tiles // 2),
-            frames_run=self.player_frames_run,
-            frames_idle=self.player_frames_idle
+            atlas=self.atlas
         )
         self.cam = Camera(self.overworld.w_tiles * TILE, self.overworld.h_tiles * TILE,
-                         self.view_w, self.view_h)
+                         self.view_w, self.view_h, scale=self.px_scale)
         self.indoor_idx = None
         self.indoor_entry_grid = None
 
         self.hunters_out = []
-        self.hunters_in = [ [] for _ in self.warehouses ]
+        self.hunters_in = [ [] for _ in range(len(self.warehouses)) ]
 
         for _ in range(3):
             if self.overworld.spawn_points:
                 gx,gy = random.choice(self.overworld.spawn_points)
                 x,y = grid_to_px(gx,gy)
-                self.hunters_out.append(Hunter(x, y, outdoor=True, frames=self.hunter_frames))
+                self.hunters_out.append(Hunter(x, y, outdoor=True, atlas=self.atlas))
 
         self.timer_total = 9*60
         self.timer = self.timer_total
 
-        self.tigers_remaining = sum(len(w.tiger_positions) for w in self.warehouses)
+        self.tigers_remaining = sum(self.warehouses.tigers(i) for i in range(len(self.warehouses)))
         self.tigers_rescued = 0
 
-        self.footprints = Footprints(self.colors["footprint"])
+        self.footprints = Footprints(self.colors["footprint"], atlas=self.atlas)
         self.update_outdoor_footprints()
 
         self.any_chase = False
@@ -179,26 +229,49 @@ class Game:
         self.scene_cooldown = 0.0
         self.left_entry_tile = True
         self.update_music()
+        if self.settings.get("warehouse_pregen", WAREHOUSE_PREGEN):
+            self.warehouses.pregenerate()
+
+    def release_hunter_requests(self):
+        for h in self.hunters_out:
+            h.release_requests(self.overworld)
+        for i in range(len(self.warehouses)):
+            m = self.warehouses.peek(i)
+            if m is not None:
+                for h in self.hunters_in[i]:
+                    h.release_requests(m)
+
+    def pick_world_seed(self):
+        """settings "world_seed" (replay one world), else one of the corpus worlds, else a new seed."""
+        seed = self.settings.get("world_seed")
+        if seed is None:
+            seeds = self.maps.worlds() if self.maps.enabled else []
+            seed = random.choice(seeds) if seeds else random.getrandbits(32)
+        return int(seed) & SEED_MASK  # any int works; map files store it as uint64
+
+    def make_warehouse(self, seed, tigers):
+        m = self.maps.get(("warehouse", 41, 31, seed, tigers),
+                          lambda: TileMap(41, 31, self.colors, kind="warehouse", seed=seed, tigers=tigers),
+                          self.colors)
+        m.paths.mode = self.settings.get("path_mode", PATH_MODE)
+        m.renderer = self.settings.get("tile_renderer", TILE_RENDERER)
+        return m
 
     def update_outdoor_footprints(self):
+        # one distance field per goal set (doors that still hide tigers), cached on the map
         pg = px_to_grid(self.player.pos.x, self.player.pos.y)
-        target = None; bestd=1e9
-        for i, door in enumerate(self.overworld.doors):
-            if len(self.warehouses[i].tiger_positions)>0:
-                d = abs(pg[0]-door[0]) + abs(pg[1]-door[1])
-                if d<bestd: bestd=d; target=door
+        self.fp_tile = pg
+        goals = [door for i, door in enumerate(self.overworld.doors)
+                 if self.warehouses.tigers(i) > 0]
         passables = (FLOOR, BUSH, DOOR, EXIT, CRATE, SPAWN)
-        self.footprints.compute_from_to(self.overworld.grid, pg, target, passables)
+        self.footprints.follow_field(self.overworld.goal_field(goals, passables), pg)
 
     def update_indoor_footprints(self):
         wmap = self.warehouses[self.indoor_idx]
         pg = px_to_grid(self.player.pos.x, self.player.pos.y)
-        target = None; bestd=1e9
-        for tg in wmap.tiger_positions:
-            d = abs(pg[0]-tg[0]) + abs(pg[1]-tg[1])
-            if d<bestd: bestd=d; target=tg
+        self.fp_tile = pg
         passables = (FLOOR, CRATE, SPAWN, HIDE)
-        self.footprints.compute_from_to(wmap.grid, pg, target, passables)
+        self.footprints.follow_field(wmap.goal_field(wmap.tiger_positions, passables), pg)
 
     def enter_warehouse_if_needed(self):
         """Enter only if cooldown is 0; after entering, set cooldown and require leaving the entry tile once before exit can trigger."""
@@ -206,7 +279,7 @@ class Game:
             return False
         pg = px_to_grid(self.player.pos.x, self.player.pos.y)
         for i, door in enumerate(self.overworld.doors):
-            if pg == door and len(self.warehouses[i].tiger_positions)>0:
+            if pg == door and self.warehouses.tigers(i) > 0:
                 self.in_indoor = True
                 self.indoor_idx = i
                 self.indoor_entry_grid = door
@@ -220,13 +293,16 @@ class Game:
                     else: continue
                     break
                 self.player.pos = pygame.Vector2(*grid_to_px(*entry))
-                self.cam = Camera(wmap.w_tiles * TILE, wmap.h_tiles * TILE, self.view_w, self.view_h)
+                for h in self.hunters_out:  # not updated while we are inside
+                    h.release_requests(self.overworld)
+                self.cam = Camera(wmap.w_tiles * TILE, wmap.h_tiles * TILE, self.view_w, self.view_h,
+                                  scale=self.px_scale)
                 if len(self.hunters_in[i])==0:
                     for _ in range(2):
                         if wmap.spawn_points:
                             gx,gy = random.choice(wmap.spawn_points)
                             x,y = grid_to_px(gx,gy)
-                            self.hunters_in[i].append(Hunter(x, y, outdoor=False, frames=self.hunter_frames))
+                            self.hunters_in[i].append(Hunter(x, y, outdoor=False, atlas=self.atlas))
                 self.update_indoor_footprints()
                 # after entering, start cooldown and reset exit guard
                 self.scene_cooldown = 0.6
@@ -247,11 +323,13 @@ class Game:
             self.left_entry_tile = True
         # allow exit only after player left and re-entered exit tile
         if self.left_entry_tile and pg == self.indoor_exit_tile:
+            for h in self.hunters_in[self.indoor_idx]:
+                h.release_requests(wmap)
             self.in_indoor = False
             door = self.indoor_entry_grid
             self.player.pos = pygame.Vector2(*grid_to_px(*door))
             self.cam = Camera(self.overworld.w_tiles * TILE, self.overworld.h_tiles * TILE,
-                              self.view_w, self.view_h)
+                              self.view_w, self.view_h, scale=self.px_scale)
             self.update_outdoor_footprints()
             self.indoor_idx=None
             # start cooldown after exiting
@@ -279,7 +357,7 @@ class Game:
             if self.overworld.spawn_points:
                 gx,gy = random.choice(self.overworld.spawn_points)
                 x,y = grid_to_px(gx,gy)
-                self.hunters_out.append(Hunter(x, y, outdoor=True, frames=self.hunter_frames))
+                self.hunters_out.append(Hunter(x, y, outdoor=True, atlas=self.atlas))
         # Indoor current
         if self.indoor_idx is not None:
             cur_list = self.hunters_in[self.indoor_idx]
@@ -290,7 +368,7 @@ class Game:
                 if wmap.spawn_points:
                     gx,gy = random.choice(wmap.spawn_points)
                     x,y = grid_to_px(gx,gy)
-                    cur_list.append(Hunter(x, y, outdoor=False, frames=self.hunter_frames))
+                    cur_list.append(Hunter(x, y, outdoor=False, atlas=self.atlas))
     # ---------------- Music debounce ----------------
     def update_music(self):
         if self.state != State.PLAY:
@@ -322,9 +400,16 @@ class Game:
     def run(self):
         while self.running:
             dt = self.clock.tick(FPS)/1000.0
+            if self.res is not None and self.state == State.PLAY:
+                r = self.res.feed(self.clock.get_rawtime(), dt)
+                if r is not None:
+                    self.set_render_scale(r)
             # tick down scene cooldown each frame
             self.scene_cooldown = max(0.0, self.scene_cooldown - dt)
 
+            if self.state == State.BOOT and self.loader.ready(self.boot_group):
+                self.boot_then()
+
             for e in pygame.event.get():
                 if e.type == pygame.QUIT:
                     self.running=False
@@ -353,6 +438,8 @@ class Game:
                     elif self.state==State.PLAY:
                         if e.key==pygame.K_ESCAPE:
                             self.state = State.PAUSE
+                        elif e.key==pygame.K_F3:
+                            self.show_debug = not self.show_debug
                         elif e.key==pygame.K_e:
                             self.rescue_if_possible()
                         elif e.key == pygame.K_SPACE:
@@ -375,7 +462,11 @@ class Game:
                             self.state = State.MENU
                             self.audio.play_music("menu")
 
-            if self.state==State.MENU:
+            if self.state==State.BOOT:
+                # yazı ancak fontlar yüklenince (FreeType'a iki thread'den aynı anda dokunulmasın)
+                font = self.font if self.loader.ready("menu") else None
+                draw_boot(self.screen, font, self.colors, *self.loader.progress())
+            elif self.state==State.MENU:
                 if self.state == State.MENU:
                     if self.menu_bg:
                         self.screen.blit(self.menu_bg, (0, 0))
@@ -395,15 +486,18 @@ class Game:
 
             pygame.display.flip()
 
+        shutdown_workers()
         pygame.quit()
 
     # ---------------- State handlers ----------------
     def handle_menu_select(self):
         sel = self.menu_items[self.menu_idx]
         if sel=="Games":
-            self.reset_world()
-            self.state = State.PLAY
-            self.update_music()
+            if not self.loader.ready("game"):
+                # oyun asset'leri hâlâ yükleniyor: BOOT ekranı bitince oyunu başlatır
+                self.state, self.boot_group, self.boot_then = State.BOOT, "game", self.start_game
+                return
+            self.start_game()
         elif sel=="Scores":
             self.state = State.SCORES
             self.audio.play_music("menu")
@@ -413,9 +507,17 @@ class Game:
         elif sel=="Quit":
             self.running=False
 
+    def start_game(self):
+        self.reset_world()
+        self.state = State.PLAY
+        self.update_music()
+
     def apply_theme(self, name):
         self.theme_name = name
         self.colors = THEMES[name]
+        if self.overworld is not None:  # else the first reset_world builds the maps with the new colors
+            for m in [self.overworld] + self.warehouses.built():
+                m.apply_palette(self.colors)
         self.settings["theme"]=name
         save_json(SETTINGS_PATH, self.settings)
 
@@ -443,19 +545,16 @@ class Game:
             if self.enter_warehouse_if_needed():
                 return
 
-            # Hunters outdoor
+            # Hunters outdoor (queued searches advance first, within the frame budget)
+            self.overworld.paths.pump(PATH_BUDGET, PATH_BUDGET_MS)
             self.any_chase = False
             stealth_factor = 1.0 if self.overworld.grid[pg[1]][pg[0]]==BUSH else 0.0
-            for h in self.hunters_out:
-                h.update(dt, self.overworld.grid, self.player, stealth_factor)
+            seen = perceive(self.hunters_out, self.overworld, self.player, stealth_factor, dt)
+            for h, saw in zip(self.hunters_out, seen):
+                h.update(dt, self.overworld, self.player, stealth_factor, saw)
                 if h.state=="chase": self.any_chase=True
-                if not self._player_is_protected() and (self.player.pos - h.pos).length() < (
-                        self.player.radius + h.radius):
-                    self.audio.play_sfx("caught")
-                    self.add_score(0, self.tigers_rescued, 1)
-                    self.state = State.SCORES
-                    self.audio.play_music("menu")
-                    return
+            if self.settle_hunters(self.overworld, self.hunters_out, dt):
+                return
 
             self.cam.follow(self.player.pos)
 
@@ -466,6 +565,7 @@ class Game:
             if self.exit_warehouse_if_needed():
                 return
             self.any_chase = False
+            wmap.paths.pump(PATH_BUDGET, PATH_BUDGET_MS)
             pg = px_to_grid(self.player.pos.x, self.player.pos.y)
 
             # Stealth: CRATE (1.0), HIDE (0.4 without hiding, 1.2 when hiding)
@@ -475,16 +575,13 @@ class Game:
             if wmap.grid[pg[1]][pg[0]] == HIDE:
                 stealth_factor = 1.2 if self.player.hiding else 0.4
 
-            for h in self.hunters_in[self.indoor_idx]:
-                h.update(dt, wmap.grid, self.player, stealth_factor)
+            hunters = self.hunters_in[self.indoor_idx]
+            seen = perceive(hunters, wmap, self.player, stealth_factor, dt)
+            for h, saw in zip(hunters, seen):
+                h.update(dt, wmap, self.player, stealth_factor, saw)
                 if h.state=="chase": self.any_chase=True
-                if not self._player_is_protected() and (self.player.pos - h.pos).length() < (
-                        self.player.radius + h.radius):
-                    self.audio.play_sfx("caught")
-                    self.add_score(0, self.tigers_rescued, 1)
-                    self.state = State.SCORES
-                    self.audio.play_music("menu")
-                    return
+            if self.settle_hunters(wmap, hunters, dt):
+                return
 
             self.cam.follow(self.player.pos)
 
@@ -495,15 +592,29 @@ class Game:
             self.chase_hold_t = max(0.0, self.chase_hold_t - dt)
         self.update_music()
 
-        # Footprints interval update
-        self.fp_timer -= dt
-        if self.fp_timer <= 0:
+        # Footprints: downhill walk on the cached field, only when the player changes tile
+        if px_to_grid(self.player.pos.x, self.player.pos.y) != self.fp_tile:
             if not self.in_indoor:
                 self.update_outdoor_footprints()
-                self.fp_timer = self.fp_interval_out
             else:
                 self.update_indoor_footprints()
-                self.fp_timer = self.fp_interval_in
+
+    def settle_hunters(self, tmap, hunters, dt):
+        """Spatial index upkeep, crowd separation and the catch test for the active scene; True if caught."""
+        index = tmap.spatial
+        index.sync(hunters)
+        separate(hunters, index, tmap.grid, dt)
+        index.sync(hunters)
+        if self._player_is_protected():
+            return False
+        for h in index.query_radius(self.player.pos, self.player.radius + TILE):
+            if (self.player.pos - h.pos).length() < self.player.radius + h.radius:
+                self.audio.play_sfx("caught")
+                self.add_score(0, self.tigers_rescued, 1)
+                self.state = State.SCORES
+                self.audio.play_music("menu")
+                return True
+        return False
 
     def draw_play(self, show_pause=False):
         # --- 1) SAHNE → self.view ---
@@ -515,38 +626,40 @@ class Game:
         else:
             self.warehouses[self.indoor_idx].draw(self.view, self.cam, self.colors)
 
+        # Sprite'lar: kamera dışındakiler kuyrukta elenir, katman + y sırasıyla toplu çizilir
+        q = self.render_queue
+        q.begin(self.cam)
+
         # Ayak izleri
-        self.footprints.draw(self.view, self.cam)
+        self.footprints.enqueue(q, self.cam)
 
         # Kaplanlar (indoor)
         if self.in_indoor:
             wmap = self.warehouses[self.indoor_idx]
+            img = self.atlas.get("tiger", scale=q.scale) if "tiger" in self.atlas else q.disc(self.colors["tiger"], TILE // 2)
             for gx, gy in wmap.tiger_positions:
-                cx, cy = grid_to_px(gx, gy)
-                p = self.cam.to_screen(pygame.Vector2(cx, cy))
-                if getattr(self, "tiger_img", None):
-                    rect = self.tiger_img.get_rect(center=(int(p.x), int(p.y)))
-                    self.view.blit(self.tiger_img, rect.topleft)
-                else:
-                    pygame.draw.circle(self.view, self.colors["tiger"], (int(p.x), int(p.y)), TILE // 2)
-
-        # Avcılar
+                q.push(img, grid_to_px(gx, gy), ACTORS)
+
+        # Avcılar (only those near the view: the spatial index hands over candidates)
         if not self.in_indoor:
-            for h in self.hunters_out:
-                h.draw(self.view, self.cam, self.colors, show_fov=False)
+            tmap, hunters = self.overworld, self.hunters_out
         else:
-            for h in self.hunters_in[self.indoor_idx]:
-                h.draw(self.view, self.cam, self.colors, show_fov=False)
+            tmap, hunters = self.warehouses[self.indoor_idx], self.hunters_in[self.indoor_idx]
+        tmap.spatial.sync(hunters)  # hunters added since the last update (scene change, spawns)
+        pad = 2 * TILE  # sprite half-size margin
+        view = (self.cam.offset.x - pad, self.cam.offset.y - pad, self.view_w + 2*pad, self.view_h + 2*pad)
+        for h in tmap.spatial.query_rect(view):
+            h.enqueue(q, self.colors)
 
         # Oyuncu
-        self.player.draw(self.view, self.cam, self.colors["player"])
+        self.player.enqueue(q, self.colors["player"])
+        q.flush(self.view)
 
         # Fog (self.view üzerine)
         self.draw_fog_of_war()
 
         # --- 2) self.view → self.screen (1080p fullscreen'e ölçekle) ---
-        scaled = pygame.transform.smoothscale(self.view, (SCREEN_W, SCREEN_H))
-        self.screen.blit(scaled, (0, 0))
+        self.present_view()
 
         # --- 3) HUD / UI (ekrana net çizim) ---
         total_tigers = self.tigers_rescued + self.tigers_remaining
@@ -559,15 +672,67 @@ class Game:
             tag = self.font.render("(Hidden)", True, self.colors["hide"])
             self.screen.blit(tag, (16, 36))
 
+        # F3: performance counters
+        if self.show_debug:
+            y = 60
+            for line in self.debug_lines():
+                txt = self.font.render(line, True, self.colors["ui"])
+                self.screen.blit(txt, (16, y)); y += 24
+
         # Pause overlay
         if show_pause:
-            overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
+            sw = self.screen.get_width()
+            overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
             overlay.fill((0, 0, 0, 130))
             self.screen.blit(overlay, (0, 0))
             t = self.bigfont.render("PAUSED", True, self.colors["ui"])
-            self.screen.blit(t, (SCREEN_W // 2 - t.get_width() // 2, 160))
+            self.screen.blit(t, (sw // 2 - t.get_width() // 2, 160))
             msg = self.font.render("[Esc] Resume   [R] Restart   [M] Menu", True, self.colors["ui"])
-            self.screen.blit(msg, (SCREEN_W // 2 - msg.get_width() // 2, 220))
+            self.screen.blit(msg, (sw // 2 - msg.get_width() // 2, 220))
+
+    def set_render_scale(self, r):
+        """Render the scene at r x the view size: camera framing (world view_w x view_h) is kept, Camera.scale = r."""
+        self.px_scale = r
+        self.view = pygame.Surface((max(1, int(self.view_w * r)), max(1, int(self.view_h * r)))).convert()
+        self.cam.scale = r  # chunks, fog layer/stamp follow cam.scale on their next draw
+        self.prewarm_sprites()
+
+    def prewarm_sprites(self):
+        """Atlas variants the next frames draw at self.px_scale: both facings, paw headings at trail alpha."""
+        for name in ("hunter", "player_run", "player_idle"):
+            self.atlas.prewarm(name, self.px_scale, flips=(False, True))
+        self.atlas.prewarm("tiger", self.px_scale)
+        self.atlas.prewarm("paw", self.px_scale, angles=range(0, 360, ROT_STEP), alphas=(PAW_ALPHA,))
+
+    def present_view(self):
+        """Scale the scene onto the screen in place ("smooth"/"nearest"); "native"/"scaled" drew on it already."""
+        if self.view is self.screen:
+            return
+        if self.pipeline == "nearest":
+            pygame.transform.scale(self.view, self.screen.get_size(), self.screen)
+        else:
+            pygame.transform.smoothscale(self.view, self.screen.get_size(), self.screen)
+
+    def debug_lines(self):
+        tmap = self.warehouses[self.indoor_idx] if self.in_indoor else self.overworld
+        ps = tmap.paths.stats()
+        lines = [
+            f"FPS {self.clock.get_fps():5.1f}  sprites {self.render_queue.drawn}/{self.render_queue.pushed} drawn"
+            f"  atlas {self.atlas.variant_count()} variants {self.atlas.memory()['total'] / 2**20:.1f} MB",
+            f"paths[{tmap.paths.mode}]: queue {ps['queue_depth']}  budget {ps['budget_used']}/{PATH_BUDGET}"
+            f"  cache {ps['hits']}/{ps['hits'] + ps['misses']} hits  flow builds {tmap.flow.builds}"
+            f"  fov casts {tmap.fov_casts}",
+        ]
+        if self.res is not None:
+            lines.append(f"render {self.px_scale:.1f}x  view {self.view.get_width()}x{self.view.get_height()}"
+                         f"  work {self.res.average_ms():4.1f}/{RES_BUDGET_MS:.1f} ms  steps {self.res.steps}")
+        lines.append(f"world {self.world_seed:08x}  maps {self.maps.loads} loaded / {self.maps.builds} generated"
+                     f"  warehouses {len(self.warehouses.built())}/{len(self.warehouses)} built"
+                     f"  ({self.warehouses.on_demand} at the door)  tigers left {self.tigers_remaining}")
+        audio = self.audio.resident()
+        lines.append(f"audio {audio['total'] / 2**20:.1f} MB resident (music {audio['music'] / 2**20:.1f})"
+                     f"  {'stream' if self.audio.stream else 'preloaded'}  warm {sorted(self.audio.preloaded_music)}")
+        return lines
 
     def _player_is_protected(self) -> bool:
         """Indoor HIDE karesi üzerinde ve hiding aktifse yakalanmasın."""
@@ -582,35 +747,42 @@ class Game:
 
     # game.py  — Game sınıfı içine ekle
     def draw_fog_of_war(self):
-        import pygame
-        from config import SCREEN_W, SCREEN_H, TILE
-
-        # Lazily create darkness base once (tamamen siyah, %100 karanlık)
-        if not hasattr(self, "darkness_base"):
-            self.darkness_base = pygame.Surface((SCREEN_W, SCREEN_H), flags=pygame.SRCALPHA)
-            self.darkness_base.fill((0, 0, 0, 255))
-
-        darkness = self.darkness_base.copy()
+        if self.fog_mode == "shadow":
+            # duvarlar görüşü keser; görülmüş kareler loş kalır (fov.TileFog)
+            tmap = self.warehouses[self.indoor_idx] if self.in_indoor else self.overworld
+            tmap.fog.update(px_to_grid(self.player.pos.x, self.player.pos.y), self.cam.scale)
+            tmap.fog.draw(self.view, self.cam)
+            return
 
         # Oyuncunun ekran koordinatı (piksel)
-        px = int(self.player.pos.x - self.cam.offset.x + TILE // 2)
-        py = int(self.player.pos.y - self.cam.offset.y + TILE // 2)
-
-        # İstediğin halkalar (yarıçap karo cinsinden, karanlık oranı 0..1)
-        # 5 kareye kadar %0 (tam görünür), 6: %75, 7: %85, 8: %95,
-        # 8'den sonrası zaten base: %100 karanlık.
-        rings = [
-            (8, 0.95),
-            (7, 0.85),
-            (6, 0.75),
-            (5, 0.00),
-        ]
-
-        # Dıştan içe doğru çiz (daha içteki değerler üstüne yazar)
-        for radius_tiles, darkness_ratio in rings:
-            alpha = int(max(0.0, min(1.0, darkness_ratio)) * 255)
-            r_px = int(radius_tiles * TILE)
-            pygame.draw.circle(darkness, (0, 0, 0, alpha), (px, py), r_px)
-
-        # Katmanı en üste bas
-        self.view.blit(darkness, (0, 0))
\ No newline at end of file
+        s = self.cam.scale
+        px = int((self.player.pos.x - self.cam.offset.x + TILE // 2) * s)
+        py = int((self.player.pos.y - self.cam.offset.y + TILE // 2) * s)
+
+        # Halkalı damga (FOG_RINGS'ten, bir kez) oyuncunun üstüne; dışı tam karanlık
+        stamp = self.fog_stamp()
+        r = stamp.get_width() // 2
+        x0, y0, x1, y1 = px - r, py - r, px + r, py + r
+        w, h = self.view.get_size()
+        self.view.blit(stamp, (x0, y0))
+        black = (0, 0, 0)
+        self.view.fill(black, (0, 0, w, max(0, y0)))                  # üst
+        self.view.fill(black, (0, y1, w, max(0, h - y1)))             # alt
+        self.view.fill(black, (0, y0, max(0, x0), y1 - y0))           # sol
+        self.view.fill(black, (x1, y0, max(0, w - x1), y1 - y0))      # sağ
+
+    def fog_stamp(self):
+        """Radial darkness stamp built from FOG_RINGS; rebuilt only when the rings, view size or scale change."""
+        ts = TILE * self.cam.scale  # screen px per tile
+        key = (tuple(FOG_RINGS), self.view.get_size(), ts)
+        if self._fog_stamp_key != key:
+            r = int(max(radius for radius, _ in FOG_RINGS) * ts)
+            stamp = pygame.Surface((2 * r, 2 * r), pygame.SRCALPHA)
+            stamp.fill((0, 0, 0, 255))
+            # Dıştan içe doğru çiz (daha içteki değerler üstüne yazar)
+            for radius_tiles, darkness_ratio in sorted(FOG_RINGS, reverse=True):
+                alpha = int(max(0.0, min(1.0, darkness_ratio)) * 255)
+                pygame.draw.circle(stamp, (0, 0, 0, alpha), (r, r), int(radius_tiles * ts))
+            self._fog_stamp = stamp
+            self._fog_stamp_key = key
+        return self._fog_stamp
@@ -0,0 +1,125 @@
+# mapfile.py — generated maps on disk: compact binary format, memory-mapped load, seed corpus
+import os, mmap, struct, threading
+from collections import namedtuple
+from pathfinding import MazeTree
+from tilemap import TileMap
+
+_MAGIC = b"TRMAP1\0\0"
+# magic, kind, w, h, seed, doors, has exit, spawns, tigers, maze cw, maze ch
+_HEAD = struct.Struct("<8sBHHQHBHHHH")
+_KINDS = ("overworld", "warehouse")
+_NO_SEED = 2**64 - 1
+SEED_MASK = 2**64 - 1  # seeds are stored as uint64: names and headers use seed & SEED_MASK
+
+# what TileMap.generate() produced; TileMap(layout=...) restores it without generating
+Layout = namedtuple("Layout", "kind w h seed tiles doors exit_pos spawn_points tiger_positions maze")
+
+
+def dumps(tmap):
+    """
+    One map as bytes: _HEAD, then w*h uint8 tile ids (row-major, TileMap.tiles),
+    uint16 (x, y) pairs for doors / exit / spawns / tigers, and for mazes the
+    MazeTree parent (int32) and depth (uint16) arrays.
+    """
+    maze = tmap.maze
+    cw, ch = (maze.cw, maze.ch) if maze else (0, 0)
+    seed = _NO_SEED if tmap.seed is None else tmap.seed & SEED_MASK
+    exits = [tmap.exit_pos] if tmap.exit_pos else []
+    points = list(tmap.doors) + exits + list(tmap.spawn_points) + list(tmap.tiger_positions)
+    parts = [
+        _HEAD.pack(_MAGIC, _KINDS.index(tmap.kind), tmap.w_tiles, tmap.h_tiles, seed, len(tmap.doors),
+                   len(exits), len(tmap.spawn_points), len(tmap.tiger_positions), cw, ch),
+        bytes(tmap.tiles),
+        struct.pack(f"<{2 * len(points)}H", *(v for p in points for v in p)),
+    ]
+    if maze:
+        parts.append(struct.pack(f"<{cw * ch}i", *maze.parent))
+        parts.append(struct.pack(f"<{cw * ch}H", *maze.depth))
+    return b"".join(parts)
+
+
+def save(tmap, path):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(dumps(tmap))
+    os.replace(tmp, path)  # readers never see a half-written map
+
+
+def read(path):
+    """Layout of a map file, parsed straight out of a read-only memory map (ValueError if malformed)."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _parse(mm)
+
+
+def load(path, theme, images=None):
+    lay = read(path)
+    return TileMap(lay.w, lay.h, theme, kind=lay.kind, images=images, layout=lay)
+
+
+def _parse(buf):
+    if len(buf) < _HEAD.size:
+        raise ValueError("map file too short")
+    magic, kind, w, h, seed, n_doors, n_exit, n_spawns, n_tigers, cw, ch = _HEAD.unpack_from(buf)
+    n_pts = n_doors + n_exit + n_spawns + n_tigers
+    size = _HEAD.size + w * h + 4 * n_pts + 6 * cw * ch
+    if magic != _MAGIC or kind >= len(_KINDS) or len(buf) != size:
+        raise ValueError("not a map file (or a different version)")
+    off = _HEAD.size
+    tiles = buf[off:off + w * h]  # copied out of the map; TileMap keeps it as its own bytearray
+    off += w * h
+    flat = struct.unpack_from(f"<{2 * n_pts}H", buf, off)
+    pts = list(zip(flat[0::2], flat[1::2]))
+    off += 4 * n_pts
+    maze = None
+    if cw:
+        parent = list(struct.unpack_from(f"<{cw * ch}i", buf, off))
+        depth = list(struct.unpack_from(f"<{cw * ch}H", buf, off + 4 * cw * ch))
+        maze = MazeTree(cw, ch, parent, depth)
+    a, b = n_doors, n_doors + n_exit
+    return Layout(_KINDS[kind], w, h, None if seed == _NO_SEED else seed, tiles,
+                  pts[:a], pts[a] if n_exit else None, pts[b:b + n_spawns], pts[b + n_spawns:], maze)
+
+
+class MapCorpus:
+    """
+    Pre-generated maps under root (Game.maps, config.MAP_DIR), one file per
+    (kind, w, h, seed, tigers). Seeded generation is deterministic, so a file is the map
+    build() would make, minus the generation.
+    - get(key, build, theme, images): the stored map when there is one, else build().
+    - put(tmap, tigers): store a seeded map (bench.py corpus fills the corpus); ValueError if unseeded.
+    - worlds(): overworld seeds stored (Game.pick_world_seed restarts into these).
+    """
+
+    def __init__(self, root, enabled=True):
+        self.root = root
+        self.enabled = enabled
+        self.loads = self.builds = 0  # the warehouse worker counts too: under _lock
+        self._lock = threading.Lock()
+
+    def get(self, key, build, theme, images=None):
+        if self.enabled:
+            try:
+                tmap = load(self._file(*key), theme, images)
+                with self._lock:
+                    self.loads += 1
+                return tmap
+            except (OSError, ValueError):
+                pass
+        with self._lock:
+            self.builds += 1
+        return build()
+
+    def put(self, tmap, tigers=0):
+        if tmap.seed is None:
+            raise ValueError("only seeded maps go in the corpus (TileMap(seed=...))")
+        os.makedirs(self.root, exist_ok=True)
+        save(tmap, self._file(tmap.kind, tmap.w_tiles, tmap.h_tiles, tmap.seed, tigers))
+
+    def worlds(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(name.split("-")[2][:-4], 16) for name in os.listdir(self.root)
+                      if name.startswith("overworld-") and name.endswith(".map"))
+
+    def _file(self, kind, w, h, seed, tigers=0):
+        return os.path.join(self.root, f"{kind}-{w}x{h}-{seed & SEED_MASK:016x}" + (f"-t{tigers}" if tigers else "") + ".map")
@@ -0,0 +1,735 @@
+# pathfinding.py
+import heapq, time, weakref, atexit, multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, BrokenExecutor
+from multiprocessing import shared_memory
+from entities import a_star, a_star_iter, run_search, is_passable, manhattan, PRIO_PATROL
+from config import F_PASSABLE, PATH_MODE, PATH_WORKERS
+
+
+class PathRequest:
+    """
+    Future-like handle returned by PathService.request.
+    done() / result() mirror concurrent.futures.Future; hunters poll it each frame
+    and keep following their previous path until it resolves.
+    In the async modes _future is the worker's concurrent.futures.Future.
+    """
+    __slots__ = ("start", "goal", "priority", "waiters", "_it", "_future", "_done", "_result")
+
+    def __init__(self, start, goal, priority):
+        self.start = start
+        self.goal = goal
+        self.priority = priority
+        self.waiters = 1
+        self._it = None
+        self._future = None
+        self._done = False
+        self._result = None
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        return self._result
+
+    def _resolve(self, path):
+        self._result = path
+        self._done = True
+        self._it = None
+        self._future = None
+
+
+class PathService:
+    """
+    Per-TileMap path service shared by every hunter on that map.
+    - find(start, goal): memoized search keyed by (start cell, goal cell), LRU-evicted.
+      Cached paths are also indexed by goal: any cell on a cached path to the same goal
+      gets that path's tail (a tail of a shortest path is a shortest path), so repaths
+      on the way and hunters joining a route to a shared goal (TileMap.waypoints) hit.
+      The engine comes from tmap.path_engine (see ENGINES).
+    - request(start, goal, priority) + pump(budget): the same searches, off the frame.
+      mode "budget": queued and run under a per-frame node-expansion budget and a
+      wall-clock cap (a JPS expansion scans whole runs, so expansions alone do not bound
+      the frame), resumable across frames (ITER_ENGINES). mode "thread"/"process": handed to a worker pool
+      (see _pool) and picked up by the first pump() after they finish; answers computed
+      on an older tmap.version are thrown away and the search is resubmitted. A search
+      that raises resolves to None; a broken pool drops the service back to "budget".
+    - The cache is dropped whenever tmap.version changes (see TileMap.set_tile).
+    - hits/misses count how many searches the cache saved; queue_depth/budget_used
+      describe the last pump.
+    """
+
+    def __init__(self, tmap, capacity=512, max_expand=2500, mode=None):
+        self.tmap = tmap
+        self.mode = mode or PATH_MODE  # "budget" | "thread" | "process"
+        self.capacity = capacity
+        self.max_expand = max_expand
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._by_goal = {}    # goal -> {cell: cached path through cell} (no per-cell tuples: GC cost)
+        self._version = tmap.version
+        # scheduler
+        self._queue = []      # heap of (priority, seq, PathRequest)
+        self._pending = {}    # (start, goal) -> PathRequest still queued
+        self._seq = 0
+        self.queue_depth = 0
+        self.budget_used = 0
+        # async workers
+        self._snap = None      # (version, GridView) copy searched by "thread" jobs
+        self._shm = None       # SharedMemory mirror of tiles/flags for "process" jobs
+        self._shm_version = None
+
+    # ---------- public API ----------
+    def find(self, start, goal):
+        """Path (tuple of grid cells) from start to goal, or None if unreachable."""
+        path = self._lookup(start, goal)
+        if path is not False:
+            return path
+        p = self.engine()(self.tmap.grid, start, goal, self.max_expand)
+        return self._store(start, goal, p)
+
+    def request(self, start, goal, priority=PRIO_PATROL):
+        """Queue a search; returns a PathRequest (already done on a cache hit)."""
+        key = (start, goal)
+        req = self._pending.get(key)
+        if req is not None:
+            req.waiters += 1
+            req.priority = min(req.priority, priority)
+            return req
+        req = PathRequest(start, goal, priority)
+        path = self._lookup(start, goal)
+        if path is not False:
+            req._resolve(path)
+        elif self._iter_engine() is None:
+            # cheap exact engines (maze tree) answer on the spot
+            req._resolve(self._store(start, goal, self.engine()(self.tmap.grid, start, goal, self.max_expand)))
+        else:
+            self._pending[key] = req
+            if self.mode == "budget":
+                self._push(req)
+            else:
+                self._submit(req)
+        return req
+
+    def release(self, req):
+        """The caller no longer needs req; unstarted searches nobody waits for are skipped."""
+        if req is not None and not req._done:
+            req.waiters -= 1
+
+    def pump(self, budget, time_ms=None):
+        """
+        Advance queued searches by at most `budget` node expansions and about `time_ms`
+        milliseconds (one expansion may run past it); call once per frame.
+        In the async modes: deliver finished worker results instead; budget is unused.
+        """
+        self._check_version()
+        if self.mode != "budget":
+            return self._collect()
+        used = 0
+        make = self._iter_engine()
+        clock = time.perf_counter
+        deadline = clock() + time_ms / 1000.0 if time_ms is not None else float("inf")
+        while self._queue and used < budget and clock() < deadline:
+            prio, seq, req = self._queue[0]
+            if req._done or req.waiters <= 0:
+                heapq.heappop(self._queue)
+                self._pending.pop((req.start, req.goal), None)
+                continue
+            if prio != req.priority:  # raised by a later request(): re-queue
+                heapq.heapreplace(self._queue, (req.priority, seq, req))
+                continue
+            if req._it is None:
+                req._it = make(self.tmap.grid, req.start, req.goal, self.max_expand)
+            try:
+                while used < budget and clock() < deadline:
+                    next(req._it)
+                    used += 1
+            except StopIteration as done:
+                heapq.heappop(self._queue)
+                self._pending.pop((req.start, req.goal), None)
+                req._resolve(self._store(req.start, req.goal, done.value))
+        self.budget_used = used
+        self.queue_depth = len(self._pending)
+        return used
+
+    def engine(self):
+        """Search function for this map (a_star signature)."""
+        name = self.tmap.path_engine
+        if name == "tree" and self.tmap.maze is not None:
+            return self.tmap.maze.find
+        return ENGINES.get(name, a_star)
+
+    def invalidate(self):
+        self._cache.clear()
+        self._by_goal.clear()
+        self._version = self.tmap.version
+        for _, _, req in self._queue:
+            req._it = None  # half-done searches restart on the new grid
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "size": len(self._cache),
+            "queue_depth": self.queue_depth,
+            "budget_used": self.budget_used,
+        }
+
+    # ---------- internal ----------
+    def _collect(self):
+        version = self.tmap.version
+        for key, req in list(self._pending.items()):
+            fut = req._future
+            if req.waiters <= 0:
+                fut.cancel()  # a running search can't be stopped; its answer is just ignored
+                del self._pending[key]
+                continue
+            if not fut.done():
+                continue
+            try:
+                searched, path = fut.result()
+            except BrokenExecutor as e:
+                self._fall_back(e)
+                return 0
+            except Exception as e:
+                print(f"[WARN] path search {req.start}->{req.goal} failed: {e!r}")
+                del self._pending[key]
+                req._resolve(None)  # not cached: the next request tries again
+                continue
+            if searched != version:  # grid changed under the search: ask again
+                self._submit(req)
+                if self.mode == "budget":
+                    return 0
+                continue
+            del self._pending[key]
+            req._resolve(self._store(req.start, req.goal, path))
+        self.budget_used = 0
+        self.queue_depth = len(self._pending)
+        return 0
+
+    def _submit(self, req):
+        t = self.tmap
+        args = (t.path_engine, t.version, req.start, req.goal, self.max_expand)
+        try:
+            if self.mode == "process":
+                req._future = _pool("process").submit(
+                    _search_shared, self._shared_name(), t.w_tiles, t.h_tiles, *args)
+            else:
+                req._future = _pool("thread").submit(_search_snapshot, self._snapshot(), *args)
+        except (BrokenExecutor, RuntimeError) as e:  # RuntimeError: pool already shut down
+            self._fall_back(e)
+        self.queue_depth = len(self._pending)
+
+    def _fall_back(self, e):
+        """Worker pool unusable: search on the main thread from now on, requeueing what was in flight."""
+        print(f"[WARN] path workers ({self.mode}) unusable, falling back to budget mode: {e!r}")
+        if isinstance(e, BrokenExecutor):
+            _POOLS.pop(self.mode, None)  # maps made later get a fresh pool
+        self.mode = "budget"
+        self._queue.clear()
+        for req in self._pending.values():
+            req._future = None
+            self._push(req)
+
+    def _snapshot(self):
+        """Immutable copy of the grid for worker threads; the live bytearrays may change."""
+        t = self.tmap
+        if self._snap is None or self._snap[0] != t.version:
+            from tilemap import GridView
+            self._snap = (t.version, GridView(bytes(t.tiles), bytes(t.flags), t.w_tiles, t.h_tiles))
+        return self._snap[1]
+
+    def _shared_name(self):
+        """
+        Name of the SharedMemory block mirroring this map for worker processes:
+        8-byte version header, then tiles, then flags. The header reads -1 while
+        it is being rewritten, so a search that overlaps a rewrite reports stale.
+        """
+        t = self.tmap
+        n = t.w_tiles * t.h_tiles
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=8 + 2*n)
+            weakref.finalize(self, _release_shm, self._shm)
+        if self._shm_version != t.version:
+            buf = self._shm.buf
+            buf[:8] = (-1).to_bytes(8, "little", signed=True)
+            buf[8:8+n] = t.tiles
+            buf[8+n:8+2*n] = t.flags
+            buf[:8] = t.version.to_bytes(8, "little", signed=True)
+            self._shm_version = t.version
+        return self._shm.name
+
+    def _check_version(self):
+        if self._version != self.tmap.version:
+            self.invalidate()
+
+    def _iter_engine(self):
+        if self.tmap.path_engine == "tree" and self.tmap.maze is not None:
+            return None
+        return ITER_ENGINES.get(self.tmap.path_engine)
+
+    def _lookup(self, start, goal):
+        """Cached path/None, or False on a miss."""
+        self._check_version()
+        key = (start, goal)
+        path = self._cache.get(key, False)
+        if path is not False:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return path
+        on = self._by_goal.get(goal, {}).get(start)
+        if on is not None:
+            self.hits += 1
+            return on[on.index(start):]
+        self.misses += 1
+        return False
+
+    def _store(self, start, goal, p):
+        path = tuple(p) if p else None  # failed searches are cached too
+        self._cache[(start, goal)] = path
+        if path:
+            cells = self._by_goal.setdefault(goal, {})
+            for c in path:
+                cells.setdefault(c, path)
+        if len(self._cache) > self.capacity:
+            (_, old_goal), old = self._cache.popitem(last=False)
+            if old:
+                cells = self._by_goal[old_goal]
+                for c in old:
+                    if cells.get(c) is old:
+                        del cells[c]
+                if not cells:
+                    del self._by_goal[old_goal]
+        return path
+
+    def _push(self, req):
+        self._seq += 1
+        heapq.heappush(self._queue, (req.priority, self._seq, req))
+        self.queue_depth = len(self._pending)
+
+
+# ---------- async workers ----------
+_POOLS = {}
+
+
+def _pool(mode):
+    """Executor shared by every PathService of an async mode, created on first use."""
+    pool = _POOLS.get(mode)
+    if pool is None:
+        if mode == "process":
+            # spawn: forking a process that already runs SDL is not safe everywhere
+            pool = ProcessPoolExecutor(PATH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            pool = ThreadPoolExecutor(PATH_WORKERS, thread_name_prefix="path")
+        _POOLS[mode] = pool
+    return pool
+
+
+def shutdown_workers():
+    """Stop the worker pools (pending searches are dropped)."""
+    for pool in _POOLS.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _POOLS.clear()
+
+
+def _search_snapshot(grid, engine, version, start, goal, max_expand):
+    return version, ENGINES.get(engine, a_star)(grid, start, goal, max_expand)
+
+
+_attached = OrderedDict()  # worker process: shm name -> (SharedMemory, GridView)
+
+
+def _search_shared(name, w, h, engine, version, start, goal, max_expand):
+    hit = _attached.get(name)
+    if hit is None:
+        from tilemap import GridView
+        if not _attached:
+            atexit.register(_detach_all)
+        if len(_attached) >= 16:  # maps from finished runs
+            old = _attached.popitem(last=False)[1][0]
+            old.close()
+        shm = shared_memory.SharedMemory(name)  # spawned workers share the parent's resource tracker
+        n = w * h
+        hit = _attached[name] = (shm, GridView(shm.buf[8:8+n], shm.buf[8+n:8+2*n], w, h))
+    shm, grid = hit
+    if _shm_version(shm) != version:
+        return -1, None
+    path = ENGINES.get(engine, a_star)(grid, start, goal, max_expand)
+    if _shm_version(shm) != version:
+        return -1, None
+    return version, path
+
+
+def _detach_all():
+    # views into shm.buf must go before close(), or SharedMemory.__del__ complains at exit
+    while _attached:
+        shm = _attached.popitem()[1][0]
+        shm.close()
+
+
+def _shm_version(shm):
+    return int.from_bytes(shm.buf[:8], "little", signed=True)
+
+
+def _release_shm(shm):
+    shm.close()
+    shm.unlink()
+
+
+class DistanceField:
+    """
+    Multi-source BFS distance map rooted at a goal set.
+    - passables: tile ids to flood through (None: hunter-walkable F_PASSABLE tiles).
+      Goals are always seeded, whatever tile they sit on.
+    - next_cell(cell) / walk(start): go downhill toward the nearest goal, O(path length).
+    """
+
+    def __init__(self, tmap, goals, passables=None, max_dist=None):
+        self.tmap = tmap
+        self.goals = tuple(goals)
+        self.version = tmap.version
+        w, h = tmap.w_tiles, tmap.h_tiles
+        if passables is None:
+            buf, bit = tmap.flags, F_PASSABLE
+        else:
+            ok = bytearray(256)
+            for tid in passables:
+                ok[tid] = 1
+            buf, bit = tmap.tiles.translate(ok), 1
+        dist = [-1] * (w * h)
+        q = deque()
+        for gx, gy in self.goals:
+            if 0 <= gx < w and 0 <= gy < h and dist[gy * w + gx] < 0:
+                dist[gy * w + gx] = 0
+                q.append((gx, gy))
+        while q:
+            x, y = q.popleft()
+            nd = dist[y * w + x] + 1
+            if max_dist is not None and nd > max_dist:
+                continue
+            for nx, ny in ((x+1, y), (x-1, y), (x, y+1), (x, y-1)):
+                if 0 <= nx < w and 0 <= ny < h and buf[ny * w + nx] & bit and dist[ny * w + nx] < 0:
+                    dist[ny * w + nx] = nd
+                    q.append((nx, ny))
+        self._dist = dist
+
+    def distance(self, cell):
+        x, y = cell
+        w, h = self.tmap.w_tiles, self.tmap.h_tiles
+        if not (0 <= x < w and 0 <= y < h):
+            return -1
+        return self._dist[y * w + x]
+
+    def next_cell(self, cell):
+        """Adjacent cell with a strictly smaller distance, or None (at goal / unreached)."""
+        d = self.distance(cell)
+        if d <= 0:
+            return None
+        x, y = cell
+        best = None
+        for nx, ny in ((x+1, y), (x-1, y), (x, y+1), (x, y-1)):
+            nd = self.distance((nx, ny))
+            if 0 <= nd < d:
+                d = nd
+                best = (nx, ny)
+        return best
+
+    def walk(self, start):
+        """Cells from start down to the nearest goal ([] if no goal is reachable)."""
+        path = [start]
+        cur = start
+        if self.distance(start) < 0:
+            # start off the flooded set (e.g. standing on a non-passable tile): step in
+            x, y = start
+            near = [(self.distance(c), c) for c in ((x+1, y), (x-1, y), (x, y+1), (x, y-1))]
+            near = [dc for dc in near if dc[0] >= 0]
+            if not near:
+                return []
+            cur = min(near)[1]
+            path.append(cur)
+        nxt = self.next_cell(cur)
+        while nxt is not None:
+            path.append(nxt)
+            nxt = self.next_cell(nxt)
+        return path
+
+
+class FlowField:
+    """
+    BFS distance map outward from one goal cell (the player), shared by chasing hunters.
+    - update(goal): rebuilds only when the goal cell or tmap.version changed.
+    - next_cell(cell): neighbour one step closer to the goal (downhill), O(1).
+    max_dist bounds the flood; chase drops beyond ~6 tiles anyway.
+    """
+
+    def __init__(self, tmap, max_dist=32):
+        self.tmap = tmap
+        self.max_dist = max_dist
+        self.goal = None
+        self.builds = 0
+        self.field = None
+
+    # ---------- public API ----------
+    def update(self, goal):
+        if goal == self.goal and self.field is not None and self.field.version == self.tmap.version:
+            return
+        self.goal = goal
+        self.builds += 1
+        self.field = DistanceField(self.tmap, (goal,), max_dist=self.max_dist)
+
+    def distance(self, cell):
+        return self.field.distance(cell) if self.field else -1
+
+    def next_cell(self, cell):
+        return self.field.next_cell(cell) if self.field else None
+
+
+# ---------------- Jump Point Search (4-connected) ----------------
+# Canonical order: vertical moves branch into horizontal ones; a horizontal run only
+# turns at a forced neighbour (the tile behind it on that side is blocked). Every
+# other cell on a straight run is skipped, so open fields cost a handful of expansions.
+
+def _jump_h(flags, w, h, x, y, dx, goal):
+    i = y * w + x
+    up, down = y > 0, y < h - 1
+    while True:
+        x += dx; i += dx
+        if not (0 <= x < w and flags[i] & F_PASSABLE):
+            return None
+        if (x, y) == goal:
+            return (x, y)
+        # the cell we came from is in range, so i-dx±w is safe whenever up/down is
+        if (up and flags[i-w] & F_PASSABLE and not flags[i-w-dx] & F_PASSABLE) or \
+           (down and flags[i+w] & F_PASSABLE and not flags[i+w-dx] & F_PASSABLE):
+            return (x, y)
+
+def _jump_v(flags, w, h, x, y, dy, goal):
+    while True:
+        y += dy
+        if not (0 <= y < h and flags[y*w + x] & F_PASSABLE):
+            return None
+        if (x, y) == goal:
+            return (x, y)
+        if _jump_h(flags, w, h, x, y, 1, goal) or _jump_h(flags, w, h, x, y, -1, goal):
+            return (x, y)
+
+def _jps_dirs(grid, node, d):
+    """Pruned directions to explore from a jump point reached moving along d."""
+    if d is None:
+        return ((1, 0), (-1, 0), (0, 1), (0, -1))
+    dx, dy = d
+    x, y = node
+    if dy:
+        return ((0, dy), (1, 0), (-1, 0))
+    dirs = [(dx, 0)]
+    flags, w, h = grid.flags, grid.w, grid.h
+    bx = x - dx
+    for ny in (-1, 1):
+        yy = y + ny
+        if 0 <= yy < h and flags[yy*w + x] & F_PASSABLE and not (0 <= bx < w and flags[yy*w + bx] & F_PASSABLE):
+            dirs.append((0, ny))
+    return dirs
+
+def jps(grid, start, goal, max_expand=2500, stats=None):
+    """Drop-in for entities.a_star on 4-connected grids; same arguments and result."""
+    return run_search(jps_iter(grid, start, goal, max_expand, stats))
+
+def jps_iter(grid, start, goal, max_expand=2500, stats=None):
+    # Resumable JPS: yields once per expanded jump point (see entities.a_star_iter)
+    if start == goal:
+        if stats is not None:
+            stats["expanded"] = 0
+        return [start]
+    if not is_passable(grid, *goal):
+        if stats is not None:
+            stats["expanded"] = 0
+        return None
+    flags, w, h = grid.flags, grid.w, grid.h
+    openh = [(manhattan(start, goal), 0, start, None, None)]
+    came = {}; gscore = {start: 0}
+    expanded = 0
+    while openh and expanded < max_expand:
+        _, g, node, parent, d = heapq.heappop(openh)
+        if node in came:
+            continue
+        came[node] = parent
+        if node == goal:
+            break
+        expanded += 1
+        yield
+        x, y = node
+        for dx, dy in _jps_dirs(grid, node, d):
+            jp = _jump_h(flags, w, h, x, y, dx, goal) if dx else _jump_v(flags, w, h, x, y, dy, goal)
+            if jp is None:
+                continue
+            ng = g + manhattan(node, jp)
+            if jp not in gscore or ng < gscore[jp]:
+                gscore[jp] = ng
+                heapq.heappush(openh, (ng + manhattan(jp, goal), ng, jp, node, (dx, dy)))
+    if stats is not None:
+        stats["expanded"] = expanded
+    if goal not in came:
+        return None
+    # jump points are collinear pairs; fill in the straight runs between them
+    jumps = []; cur = goal
+    while cur is not None:
+        jumps.append(cur); cur = came[cur]
+    jumps.reverse()
+    path = [jumps[0]]
+    for (ax, ay), (bx, by) in zip(jumps, jumps[1:]):
+        sx = (bx > ax) - (bx < ax); sy = (by > ay) - (by < ay)
+        while (ax, ay) != (bx, by):
+            ax += sx; ay += sy
+            path.append((ax, ay))
+    return path
+
+
+# ---------------- Warehouse maze tree ----------------
+class MazeTree:
+    """
+    Spanning tree of a warehouse maze (3-tile cells: 2x2 floor + 1-thick walls/gates).
+    Cell (cx, cy) covers tiles (1+3cx .. 2+3cx, 1+3cy .. 2+3cy); the gate between two
+    adjacent cells is the 1x2 tile strip in the wall between them. The root cell (0,0)
+    is the open 3x3 entrance corner (its two gates + junction included).
+    - parent/depth: flat lists indexed cy*cw + cx (root has parent -1).
+    path() walks both ends up to their lowest common ancestor, so a query costs
+    O(path length) with no open-set search.
+    """
+
+    def __init__(self, cw, ch, parent, depth):
+        self.cw = cw
+        self.ch = ch
+        self.parent = parent
+        self.depth = depth
+
+    # ---------- public API ----------
+    def find(self, grid, start, goal, max_expand=2500, stats=None):
+        """Same contract as entities.a_star."""
+        if stats is not None:
+            stats["expanded"] = 0
+        if start == goal:
+            return [start]
+        if not is_passable(grid, *goal):
+            return None
+        p = self.path(grid, start, goal)
+        if p is None:
+            return a_star(grid, start, goal, max_expand, stats)
+        return p
+
+    def path(self, grid, start, goal):
+        """Shortest tile path through the tree, or None if not answerable (wall tile, edited grid)."""
+        best = None
+        for a in self.cells_of(start):
+            for b in self.cells_of(goal):
+                route = self.cell_route(a, b)
+                cost, lanes = self._route_cost(route, start, goal)
+                if best is None or cost < best[0]:
+                    best = (cost, route, lanes)
+        if best is None:
+            return None
+        _, route, lanes = best
+        return self._realize(grid, route, lanes, start, goal)
+
+    def cells_of(self, tile):
+        """Cells a tile belongs to: one for cell floor, two for a gate, none for walls."""
+        x, y = tile
+        cx, rx = divmod(x - 1, 3)
+        cy, ry = divmod(y - 1, 3)
+        if not (0 <= cx < self.cw and 0 <= cy < self.ch):
+            return ()
+        if (rx < 2 and ry < 2) or (cx, cy, rx, ry) == (0, 0, 2, 2):  # (3,3): corner junction
+            return ((cx, cy),)
+        if rx == 2 and ry < 2 and cx + 1 < self.cw:
+            return ((cx, cy), (cx + 1, cy))
+        if ry == 2 and rx < 2 and cy + 1 < self.ch:
+            return ((cx, cy), (cx, cy + 1))
+        return ()
+
+    def cell_route(self, a, b):
+        """Cells from a to b through their lowest common ancestor."""
+        cw, parent, depth = self.cw, self.parent, self.depth
+        ia = a[1] * cw + a[0]
+        ib = b[1] * cw + b[0]
+        up_a = [ia]; up_b = [ib]
+        while depth[ia] > depth[ib]:
+            ia = parent[ia]; up_a.append(ia)
+        while depth[ib] > depth[ia]:
+            ib = parent[ib]; up_b.append(ib)
+        while ia != ib:
+            ia = parent[ia]; ib = parent[ib]
+            up_a.append(ia); up_b.append(ib)
+        return [(i % cw, i // cw) for i in up_a + up_b[-2::-1]]
+
+    # ---------- internal ----------
+    @staticmethod
+    def _gate(c0, c1, lane):
+        """Gate tile between adjacent cells c0 -> c1 on lane 0/1."""
+        x0, y0 = 1 + min(c0[0], c1[0]) * 3, 1 + min(c0[1], c1[1]) * 3
+        if c0[1] == c1[1]:
+            return (x0 + 2, y0 + lane)
+        return (x0 + lane, y0 + 2)
+
+    def _route_cost(self, route, start, goal):
+        # DP over which of the two gate lanes each crossing uses; moves inside a
+        # 2x2 cell are free L-shapes, so Manhattan distance between waypoints is exact
+        costs = {None: (0, ())}
+        prev = {None: start}
+        for c0, c1 in zip(route, route[1:]):
+            nxt_costs = {}; nxt_prev = {}
+            for lane in (0, 1):
+                tile = self._gate(c0, c1, lane)
+                best = None
+                for k, (c, lanes) in costs.items():
+                    d = c + manhattan(prev[k], tile)
+                    if best is None or d < best[0]:
+                        best = (d, lanes + (lane,))
+                nxt_costs[lane] = best; nxt_prev[lane] = tile
+            costs, prev = nxt_costs, nxt_prev
+        return min((c + manhattan(prev[k], goal), lanes) for k, (c, lanes) in costs.items())
+
+    def _realize(self, grid, route, lanes, start, goal):
+        points = [start] + [self._gate(c0, c1, lane)
+                            for (c0, c1), lane in zip(zip(route, route[1:]), lanes)] + [goal]
+        path = [start]
+        for a, b in zip(points, points[1:]):
+            if a == b:
+                continue
+            seg = self._l_segment(grid, a, b)
+            if seg is None:
+                return None  # grid edited since generation; let the caller search
+            path.extend(seg)
+        return path
+
+    @staticmethod
+    def _l_segment(grid, a, b):
+        """Tiles after a up to b along one walkable L (horizontal- or vertical-first)."""
+        (ax, ay), (bx, by) = a, b
+        sx = (bx > ax) - (bx < ax); sy = (by > ay) - (by < ay)
+        for h_first in (True, False):
+            seg = []; x, y = ax, ay
+            for axis in ((0, 1) if h_first else (1, 0)):
+                if axis == 0:
+                    while x != bx:
+                        x += sx; seg.append((x, y))
+                else:
+                    while y != by:
+                        y += sy; seg.append((x, y))
+            if all(is_passable(grid, tx, ty) for tx, ty in seg):
+                return seg
+        return None
+
+
+# TileMap.path_engine -> search function with the a_star signature
+# ("tree" resolves to the map's own MazeTree.find, see PathService)
+ENGINES = {
+    "astar": a_star,
+    "jps": jps,
+}
+# resumable variants used by PathService.pump; engines missing here run synchronously
+ITER_ENGINES = {
+    "astar": a_star_iter,
+    "jps": jps_iter,
+}
@@ -0,0 +1,58 @@
+# perception.py — batched hunter vision, one pass per scene per frame
+import math
+from utils import px_to_grid
+from config import F_HIDE
+from fov import is_visible
+
+VISION_PERIOD = 0.08   # s between two looks of the same hunter
+STEALTH_CUT = 0.55     # stealth_factor 1.0 shortens sight by this fraction
+
+
+def perceive(hunters, tmap, player, stealth_factor, dt):
+    """
+    Vision for every hunter of a scene, replacing the per-hunter look in Hunter.update.
+    Ticks each vision timer; hunters that are due get the range + FOV cone test in one
+    batch, and only the survivors look up their tile in the player's shadowcast
+    visibility set (TileMap.visible_from, symmetric, one cast per player tile).
+    Returns one bool per hunter (True: saw the player this frame), same order as `hunters`.
+    """
+    seen = [False] * len(hunters)
+    due = []
+    for i, h in enumerate(hunters):
+        h.vision_tick -= dt
+        if h.vision_tick <= 0:
+            h.vision_tick = VISION_PERIOD
+            due.append(i)
+    if not due:
+        return seen
+    grid = tmap.grid
+    pgx, pgy = px_to_grid(player.pos.x, player.pos.y)
+    if 0 <= pgy < grid.h and 0 <= pgx < grid.w and grid.flags[pgy*grid.w + pgx] & F_HIDE:
+        return seen  # blind on HIDE
+    survivors = _cone([hunters[i] for i in due], player.pos, 1.0 - STEALTH_CUT*stealth_factor)
+    if survivors:
+        bits, w = tmap.visible_from((pgx, pgy)), grid.w
+        for i in survivors:
+            h = hunters[due[i]]
+            if is_visible(bits, w, *px_to_grid(h.pos.x, h.pos.y)):
+                seen[due[i]] = True
+    return seen
+
+
+def _cone(hs, ppos, view_scale):
+    """Indices into hs of hunters with the player in range and inside their FOV cone."""
+    px, py = ppos.x, ppos.y
+    out = []
+    for i, h in enumerate(hs):
+        dx = px - h.pos.x
+        dy = py - h.pos.y
+        dist = math.hypot(dx, dy)
+        if not 0 < dist < h.view_dist * view_scale:
+            continue
+        fx, fy = h.dir.x, h.dir.y
+        flen = math.hypot(fx, fy)
+        if flen == 0:
+            fx, flen = 1.0, 1.0
+        if fx*dx + fy*dy > h.cos_fov * dist * flen:
+            out.append(i)
+    return out
@@ -0,0 +1,72 @@
+# render.py — per-frame draw list: camera culling, (layer, y) order, one blit batch per layer
+from itertools import groupby
+from operator import itemgetter
+import pygame
+
+# layers, bottom to top; inside a layer sprites overlap by world y (lower on screen = in front)
+GROUND = 0   # footprints
+ACTORS = 1   # tigers, hunters, player
+
+
+class RenderQueue:
+    """
+    Sprites of one frame (Game.render_queue), drawn over the already drawn map.
+    - begin(cam): empty the list and take the camera's world rect (Camera.view_rect).
+    - push(img, pos, layer, y=None): img centred on world pos; dropped right away when it
+      misses the camera rect, so the list only ever holds visible sprites.
+    - flush(surf): stable sort by (layer, y), one Surface.fblits/blits per layer.
+    """
+
+    def __init__(self):
+        self._items = []
+        self._cam = None
+        self._view = None
+        self._discs = {}     # (color, radius px) -> fallback circle sprite
+        self.pushed = 0
+        self.drawn = 0
+
+    @property
+    def scale(self):
+        """Camera.scale of the frame being built (sprite variants are picked for it)."""
+        return self._cam.scale
+
+    def begin(self, cam):
+        self._items.clear()
+        self._cam = cam
+        self._view = cam.view_rect()
+        self.pushed = 0
+
+    def push(self, img, pos, layer, y=None):
+        self.pushed += 1
+        cam, v = self._cam, self._view
+        w, h = img.get_size()
+        x, wy = pos
+        hw, hh = w / (2 * cam.scale), h / (2 * cam.scale)  # half size in world px
+        if x + hw < v.left or x - hw > v.right or wy + hh < v.top or wy - hh > v.bottom:
+            return
+        p = cam.to_screen(pygame.Vector2(x, wy))
+        self._items.append((layer, wy if y is None else y, img, (int(p.x) - w // 2, int(p.y) - h // 2)))
+
+    def disc(self, color, radius):
+        """Cached filled circle standing in for a missing sprite (radius in world px)."""
+        r = int(radius * self._cam.scale)
+        key = (tuple(color), r)
+        img = self._discs.get(key)
+        if img is None:
+            img = self._discs[key] = pygame.Surface((2*r + 1, 2*r + 1), pygame.SRCALPHA)
+            pygame.draw.circle(img, color, (r, r), r)
+        return img
+
+    def flush(self, surf):
+        items = self._items
+        items.sort(key=itemgetter(0, 1))
+        blit_many = getattr(surf, "fblits", None)  # pygame >= 2.4
+        for _, group in groupby(items, key=itemgetter(0)):
+            seq = [(img, dest) for _, _, img, dest in group]
+            if blit_many is not None:
+                blit_many(seq)
+            else:
+                surf.blits(seq, doreturn=False)
+        self.drawn = len(items)
+        items.clear()
+        return self.drawn
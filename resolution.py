@@ -0,0 +1,46 @@
+# resolution.py — dynamic render resolution driven by a frame-time budget
+from collections import deque
+
+
+class DynamicResolution:
+    """
+    Picks the render scale of Game.view (fraction of the view size) from recent frame times.
+    - feed(ms, dt): work time of the last frame (Clock.get_rawtime, without the tick's sleep)
+      and its wall time in seconds. Returns the new scale when it changed, else None.
+    - Hysteresis: step down only when the window average is over budget*down, up only when
+      under budget*up (down > 1 > up), at least `hold` seconds apart, one step at a time;
+      the window restarts after every step so the new size is judged on its own frames.
+    """
+
+    def __init__(self, scales, budget_ms, window=30, down=1.10, up=0.70, hold=1.0):
+        self.scales = sorted(scales)
+        self.budget_ms = budget_ms
+        self.down, self.up, self.hold = down, up, hold
+        self.i = len(self.scales) - 1  # start at full size
+        self._times = deque(maxlen=window)
+        self._since = 0.0              # seconds since the last step
+        self.steps = 0
+
+    @property
+    def scale(self):
+        return self.scales[self.i]
+
+    def average_ms(self):
+        return sum(self._times) / len(self._times) if self._times else 0.0
+
+    def feed(self, ms, dt):
+        self._times.append(ms)
+        self._since += dt
+        if len(self._times) < self._times.maxlen or self._since < self.hold:
+            return None
+        avg = self.average_ms()
+        if avg > self.budget_ms * self.down and self.i > 0:
+            self.i -= 1
+        elif avg < self.budget_ms * self.up and self.i < len(self.scales) - 1:
+            self.i += 1
+        else:
+            return None
+        self._times.clear()
+        self._since = 0.0
+        self.steps += 1
+        return self.scale
@@ -0,0 +1,86 @@
+# spatial.py — uniform grid index over moving entities (hunters), one per scene
+from config import TILE
+
+
+class SpatialHash:
+    """
+    Entities bucketed by the tile their .pos is on (TileMap.spatial).
+    - sync(items): insert new items and re-bucket the ones that changed tile, O(len(items)).
+      Call after movement; items keep their bucket until the next sync.
+    - query_radius / query_rect / neighbors only scan the buckets the shape touches.
+    """
+
+    def __init__(self, cell=TILE):
+        self.cell = cell
+        self._buckets = {}  # (bx, by) -> [items]
+        self._where = {}    # item -> (bx, by)
+
+    def __len__(self):
+        return len(self._where)
+
+    def sync(self, items):
+        c = self.cell
+        buckets, where = self._buckets, self._where
+        for it in items:
+            key = (int(it.pos.x // c), int(it.pos.y // c))
+            old = where.get(it)
+            if old == key:
+                continue
+            if old is not None:
+                self._unlink(it, old)
+            buckets.setdefault(key, []).append(it)
+            where[it] = key
+
+    def remove(self, item):
+        key = self._where.pop(item, None)
+        if key is not None:
+            self._unlink(item, key)
+
+    def clear(self):
+        self._buckets.clear()
+        self._where.clear()
+
+    def query_rect(self, rect):
+        """Items whose position lies inside rect ((x, y, w, h) or pygame.Rect)."""
+        x, y, w, h = rect
+        return [it for it in self._scan(x, y, x + w, y + h)
+                if x <= it.pos.x < x + w and y <= it.pos.y < y + h]
+
+    def query_radius(self, pos, r):
+        """Items within distance r of pos."""
+        px, py = pos
+        r2 = r * r
+        out = []
+        for it in self._scan(px - r, py - r, px + r, py + r):
+            dx = it.pos.x - px
+            dy = it.pos.y - py
+            if dx*dx + dy*dy <= r2:
+                out.append(it)
+        return out
+
+    def neighbors(self, item, r):
+        """Other items within distance r of item."""
+        return [it for it in self.query_radius(item.pos, r) if it is not item]
+
+    # ---------- internal ----------
+    def _scan(self, x0, y0, x1, y1):
+        c = self.cell
+        bx0, by0, bx1, by1 = int(x0 // c), int(y0 // c), int(x1 // c), int(y1 // c)
+        buckets = self._buckets
+        if (bx1 - bx0 + 1) * (by1 - by0 + 1) > len(buckets):
+            # big box (camera view), few occupied buckets: walk those instead
+            for (bx, by), b in buckets.items():
+                if bx0 <= bx <= bx1 and by0 <= by <= by1:
+                    yield from b
+            return
+        for by in range(by0, by1 + 1):
+            for bx in range(bx0, bx1 + 1):
+                b = buckets.get((bx, by))
+                if b:
+                    yield from b
+
+    def _unlink(self, item, key):
+        b = self._buckets[key]
+        b.remove(item)
+        if not b:
+            del self._buckets[key]
@@ -0,0 +1,107 @@
+# sprites.py — one atlas for every sprite: sheets decoded/scaled once, draw variants cached
+import pygame
+
+ROT_STEP = 15  # rotation bucket in degrees (footprint headings)
+
+
+class SpriteAtlas:
+    """
+    Sprites by name (Game.atlas), shared by Player, Hunter, Footprints and the tiger draw.
+    - load_strip / load_image / add register the base frames (sized for Camera.scale 1);
+      with a cache (assetcache.AssetCache) the loaded+scaled pixels come from data/baked.
+    - get(name, frame, flip, angle, alpha, scale): the variant, built once on first use and
+      cached under (name, frame, flip, angle bucket, alpha, scale); draw paths only do the lookup.
+    - prewarm(...) builds variants ahead of time (e.g. right after a render scale change).
+    - memory(): bytes held per sprite (base frames + cached variants).
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self._base = {}      # name -> [Surface]
+        self._variants = {}  # (name, frame, flip, angle, alpha, scale) -> Surface
+
+    def __contains__(self, name):
+        return name in self._base
+
+    def count(self, name):
+        return len(self._base.get(name, ()))
+
+    def add(self, name, frames):
+        self._base[name] = list(frames)
+        self._variants = {k: v for k, v in self._variants.items() if k[0] != name}
+
+    def load_strip(self, name, path, size, cols=None, default_cols=1):
+        """One row of frames scaled to size (w, h). cols None: square frames when the width allows, else default_cols."""
+        def build():
+            img = pygame.image.load(path).convert_alpha()
+            w, h = img.get_size()
+            n = max(1, (w // h if w % h == 0 else default_cols) if cols is None else cols)
+            fw = w // n
+            # frames side by side, each scaled straight into its slot (no blending)
+            strip = pygame.Surface((n * size[0], size[1]), pygame.SRCALPHA, img)
+            for i in range(n):
+                pygame.transform.smoothscale(img.subsurface(pygame.Rect(i * fw, 0, fw, h)), size,
+                                             strip.subsurface(pygame.Rect(i * size[0], 0, *size)))
+            return strip
+        strip = self._load(path, ("strip", tuple(size), cols, default_cols), build)
+        self.add(name, [strip.subsurface(pygame.Rect(i * size[0], 0, *size)) for i in range(strip.get_width() // size[0])])
+
+    def load_image(self, name, path, size):
+        self.add(name, [self._load(path, ("image", tuple(size)),
+                                   lambda: pygame.transform.smoothscale(pygame.image.load(path).convert_alpha(), size))])
+
+    def base(self, name, frame=0):
+        frames = self._base.get(name)
+        return frames[frame] if frames else None
+
+    def get(self, name, frame=0, flip=False, angle=0, alpha=255, scale=1.0):
+        angle = (int(round(angle / ROT_STEP)) * ROT_STEP) % 360
+        key = (name, frame, flip, angle, alpha, scale)
+        img = self._variants.get(key)
+        if img is None:
+            img = self._variants[key] = self._build(name, frame, flip, angle, alpha, scale)
+        return img
+
+    def prewarm(self, name, scale=1.0, flips=(False,), angles=(0,), alphas=(255,)):
+        for frame in range(self.count(name)):
+            for flip in flips:
+                for angle in angles:
+                    for alpha in alphas:
+                        self.get(name, frame, flip, angle, alpha, scale)
+
+    def memory(self):
+        """{name: bytes} over base frames and variants, plus "total"."""
+        out = {name: sum(_bytes(s) for s in frames) for name, frames in self._base.items()}
+        for (name, _, flip, angle, alpha, scale), s in self._variants.items():
+            if (flip, angle, alpha, scale) != (False, 0, 255, 1.0):  # else: the base frame itself
+                out[name] += _bytes(s)
+        out["total"] = sum(out.values())
+        return out
+
+    def variant_count(self):
+        return len(self._variants)
+
+    # ---------- internal ----------
+    def _load(self, path, key, build):
+        return self.cache.load(path, key, build) if self.cache is not None else build()
+
+    def _build(self, name, frame, flip, angle, alpha, scale):
+        # each step starts from the cached variant one step simpler
+        if alpha != 255:
+            img = self.get(name, frame, flip, angle, 255, scale).copy()
+            img.set_alpha(alpha)
+            return img
+        if angle:
+            # saat yönü pozitif (pygame rotate CCW)
+            return pygame.transform.rotate(self.get(name, frame, flip, 0, 255, scale), -angle)
+        if flip:
+            return pygame.transform.flip(self.get(name, frame, False, 0, 255, scale), True, False)
+        img = self._base[name][frame]
+        if scale != 1.0:
+            w, h = img.get_size()
+            img = pygame.transform.smoothscale(img, (max(1, round(w * scale)), max(1, round(h * scale))))
+        return img
+
+
+def _bytes(surf):
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()  # frames may be subsurfaces of one strip
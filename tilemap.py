@@ -1,9 +1,32 @@
 import random, pygame
-from config import TILE, FLOOR, WALL, BUSH, DOOR, EXIT, TIGER_SPAWN, SPAWN, HIDE, TREE, ROCK, CRATE
+from collections import OrderedDict
+from config import TILE, FLOOR, WALL, BUSH, DOOR, EXIT, TIGER_SPAWN, SPAWN, HIDE, TREE, ROCK, CRATE, TILE_FLAGS, FOV_RADIUS
+from config import CHUNK_TILES, CHUNK_CACHE, TILE_RENDERER, WAYPOINT_STEP, F_PASSABLE, FOV_CACHE
 from utils import grid_to_px
+from pathfinding import PathService, FlowField, DistanceField, MazeTree
+from fov import shadowcast, TileFog
+from spatial import SpatialHash
+
+
+class GridView(list):
+    """
+    grid[y][x] compatibility view over TileMap.tiles: one read-only memoryview per row.
+    Hot paths skip it and index .flags[y*w + x] directly; writes go through TileMap.set_tile.
+    """
+    __slots__ = ("tiles", "flags", "w", "h")
+
+    def __init__(self, tiles, flags, w, h):
+        mv = memoryview(tiles).toreadonly()
+        super().__init__(mv[y*w:(y+1)*w] for y in range(h))
+        self.tiles = tiles
+        self.flags = flags
+        self.w = w
+        self.h = h
+
 
 class TileMap:
-    def __init__(self, w_tiles, h_tiles, theme, kind="overworld", images=None):
+    def __init__(self, w_tiles, h_tiles, theme, kind="overworld", images=None, path_engine=None,
+                 seed=None, tigers=None, layout=None):
         self.w_tiles = w_tiles
         self.h_tiles = h_tiles
         self.theme = theme
@@ -16,7 +39,114 @@ class TileMap:
         self.exit_pos = None      # overworld exit
         self.tiger_positions = [] # indoor: tiger positions (grid)
         self.spawn_points = []    # hunter spawns (both worlds)
-        self.generate()
+        self.maze = None          # indoor: MazeTree of the carved maze
+        self.version = 0          # bumped on every tile change (path caches key off this)
+        # always its own generator (never the shared module one, which other threads also draw
+        # from): seeded, the same map wherever it is built; unseeded, a fresh OS-seeded one
+        self.seed = seed
+        self.rng = random.Random(seed) if seed is not None else random.Random()
+        self.tigers = tigers      # warehouse: exact tiger count (None: 1-2 at random)
+        if layout is None:
+            self.generate()
+            self._pack()
+        else:
+            # mapfile.load: restore what generate() made, without generating
+            self.seed = layout.seed
+            self.doors = list(layout.doors)
+            self.exit_pos = layout.exit_pos
+            self.spawn_points = list(layout.spawn_points)
+            self.tiger_positions = list(layout.tiger_positions)
+            self.maze = layout.maze
+            self._pack(layout.tiles)
+        # pathfinding.ENGINES key; JPS pays off on the open overworld, mazes use their tree
+        self.path_engine = path_engine or ("tree" if self.maze else "jps")
+        self.paths = PathService(self)
+        self.flow = FlowField(self)
+        self._goal_fields = OrderedDict()  # (goals, passables) -> DistanceField
+        self._fov = OrderedDict()          # origin cell -> visible_from bitset (LRU, this version)
+        self._fov_version = -1
+        self._waypoints = (-1, None)       # (version, cells) of waypoints()
+        self.fov_casts = 0
+        self.fog = TileFog(self)           # "shadow" fog mode: explored memory + alpha layer
+        self.spatial = SpatialHash()       # hunters of this scene (Game syncs it every frame)
+        # drawing: "chunks" keeps (cx, cy) -> pre-rendered Surface (LRU),
+        # "indexed" one palette pixel per tile scaled up each frame
+        self.renderer = TILE_RENDERER       # "chunks" | "indexed"
+        self._draw_colors = None
+        self._chunks = OrderedDict()
+        self._indexed = None                # 8-bit surface over self.tiles ("indexed")
+        self._scaled = None                 # reused upscale target for it
+        self._draw_scale = 1.0              # cam.scale the cached chunks were scaled to
+        self._sprite_scaled = {}            # scale -> {TREE: img, ROCK: img} ("indexed" at scale != 1)
+        overhang = max([img.get_width() for img in (self.tree_img, self.rock_img) if img] + [TILE])
+        self._chunk_ring = -(-(overhang - TILE) // (2 * TILE))  # tiles a sprite reaches past its own
+        self.chunk_renders = 0
+        # "flow": follow self.flow downhill, "path": per-hunter cached search (tree indoors)
+        self.chase_mode = "path" if self.maze else "flow"
+
+    def set_tile(self, gx, gy, tid):
+        """Change one tile after generation; invalidates everything derived from the grid."""
+        i = gy * self.w_tiles + gx
+        if self.tiles[i] == tid:
+            return
+        self.tiles[i] = tid
+        self.flags[i] = TILE_FLAGS[tid]
+        self.version += 1
+        self.invalidate_chunks(gx, gy)
+
+    def goal_field(self, goals, passables=None):
+        """Cached DistanceField for a goal set; rebuilt only when the goals or the grid change."""
+        key = (frozenset(goals), tuple(sorted(passables)) if passables is not None else None)
+        field = self._goal_fields.get(key)
+        if field is None or field.version != self.version:
+            field = DistanceField(self, sorted(key[0]), passables)
+            self._goal_fields[key] = field
+            if len(self._goal_fields) > 4:
+                self._goal_fields.popitem(last=False)
+        else:
+            self._goal_fields.move_to_end(key)
+        return field
+
+    def waypoints(self):
+        """Shared patrol goals: in each WAYPOINT_STEP block, the hunter-walkable cell nearest its centre."""
+        version, cells = self._waypoints
+        if version != self.version:
+            w, h, n = self.w_tiles, self.h_tiles, WAYPOINT_STEP
+            cells = []
+            for by in range(0, h, n):
+                for bx in range(0, w, n):
+                    cx, cy = bx + n // 2, by + n // 2
+                    best = min(((abs(x - cx) + abs(y - cy), (x, y))
+                                for y in range(by, min(by + n, h)) for x in range(bx, min(bx + n, w))
+                                if self.flags[y * w + x] & F_PASSABLE), default=None)
+                    if best:
+                        cells.append(best[1])
+            self._waypoints = (self.version, cells)
+        return cells
+
+    def visible_from(self, cell):
+        """
+        fov.shadowcast bitset from cell (the player's tile). The last FOV_CACHE cells are kept,
+        so walking back over a tile costs nothing; all are dropped when the grid changes.
+        """
+        if self._fov_version != self.version:
+            self._fov.clear()
+            self._fov_version = self.version
+        bits = self._fov.get(cell)
+        if bits is None:
+            bits = self._fov[cell] = shadowcast(self.flags, self.w_tiles, self.h_tiles, cell, FOV_RADIUS)
+            self.fov_casts += 1
+            if len(self._fov) > FOV_CACHE:
+                self._fov.popitem(last=False)
+        else:
+            self._fov.move_to_end(cell)
+        return bits
+
+    def _pack(self, tiles=None):
+        # generators write a list of lists; store it as one uint8 buffer + flag bytes
+        self.tiles = bytearray(t for row in self.grid for t in row) if tiles is None else bytearray(tiles)
+        self.flags = bytearray(self.tiles.translate(TILE_FLAGS))
+        self.grid = GridView(self.tiles, self.flags, self.w_tiles, self.h_tiles)
 
     def generate(self):
         if self.kind == "overworld":
@@ -36,12 +166,12 @@ class TileMap:
                     self.grid[y][x] = FLOOR
 
         # --- Doors (warehouses) ---
-        door_count = random.randint(2, 3)
+        door_count = self.rng.randint(2, 3)
         self.doors = []
         placed = 0
         while placed < door_count:
-            x = random.randint(3, self.w_tiles - 4)
-            y = random.randint(3, self.h_tiles - 4)
+            x = self.rng.randint(3, self.w_tiles - 4)
+            y = self.rng.randint(3, self.h_tiles - 4)
             if self.grid[y][x] == FLOOR:
                 self.grid[y][x] = DOOR
                 self.doors.append((x, y))
@@ -49,8 +179,8 @@ class TileMap:
 
         # --- Exit ---
         for _ in range(1000):
-            ex = random.randint(2, self.w_tiles - 3);
-            ey = random.randint(2, self.h_tiles - 3)
+            ex = self.rng.randint(2, self.w_tiles - 3);
+            ey = self.rng.randint(2, self.h_tiles - 3)
             if self.grid[ey][ex] == FLOOR:
                 self.grid[ey][ex] = EXIT
                 self.exit_pos = (ex, ey)
@@ -59,8 +189,8 @@ class TileMap:
         # --- Spawns ---
         self.spawn_points = []
         for _ in range(10):
-            sx = random.randint(2, self.w_tiles - 3);
-            sy = random.randint(2, self.h_tiles - 3)
+            sx = self.rng.randint(2, self.w_tiles - 3);
+            sy = self.rng.randint(2, self.h_tiles - 3)
             if self.grid[sy][sx] == FLOOR:
                 self.grid[sy][sx] = SPAWN
                 self.spawn_points.append((sx, sy))
@@ -75,7 +205,7 @@ class TileMap:
                 if t in (WALL, DOOR, EXIT, SPAWN):
                     continue
                 if t == FLOOR:
-                    r = random.random()
+                    r = self.rng.random()
                     if r < p_tree:
                         self.grid[y][x] = TREE
                     elif r < p_tree + p_rock:
@@ -94,6 +224,7 @@ class TileMap:
         """
         Perfect maze on a cell grid, each cell carved as 2x2 FLOOR (corridors = 2 tiles wide).
         Adds small 1x1 HIDE tiles that do NOT block corridors.
+        The DFS spanning tree is kept in self.maze for O(path length) queries.
         """
         W, H = self.w_tiles, self.h_tiles
         self.grid = [[WALL for _ in range(W)] for __ in range(H)]
@@ -120,14 +251,26 @@ class TileMap:
 
         # DFS on cell graph, open 2x1 / 1x2 gates
         dirs = [(1,0),(-1,0),(0,1),(0,-1)]
-        stack = [(0,0)]
-        visited = {(0,0)}
+        parent = [-1] * (cw * ch)  # tree links, indexed cy*cw + cx
+        depth  = [0] * (cw * ch)
+        # The entrance corner opened below joins cell (0,0) with both of its neighbours
+        # and exposes the (3,3) junction to the gates under/right of it. Make both
+        # corner links tree links and keep those two gates shut so the maze stays a tree.
+        first = [(1,0), (0,1)]
+        self.rng.shuffle(first)
+        for c in first:
+            parent[c[1]*cw + c[0]] = 0
+            depth[c[1]*cw + c[0]] = 1
+        closed = {((1,0),(1,1)), ((1,1),(1,0)), ((0,1),(1,1)), ((1,1),(0,1))} if cw > 2 and ch > 2 else set()
+        stack = [(0,0)] + first
+        visited = {(0,0)} | set(first)
         while stack:
             cx, cy = stack[-1]
             nbrs = [(cx+dx, cy+dy, dx, dy)
                     for dx,dy in dirs
-                    if 0 <= cx+dx < cw and 0 <= cy+dy < ch and (cx+dx,cy+dy) not in visited]
-            random.shuffle(nbrs)
+                    if 0 <= cx+dx < cw and 0 <= cy+dy < ch and (cx+dx,cy+dy) not in visited
+                    and ((cx,cy), (cx+dx,cy+dy)) not in closed]
+            self.rng.shuffle(nbrs)
             if not nbrs:
                 stack.pop()
                 continue
@@ -156,11 +299,14 @@ class TileMap:
                     if 0 <= x < W and 0 <= y < H: self.grid[y][x] = FLOOR
             visited.add((nx,ny))
             stack.append((nx,ny))
+            parent[ny*cw + nx] = cy*cw + cx
+            depth[ny*cw + nx]  = depth[cy*cw + cx] + 1
 
         # Keep indoor entrance corner open (around (1,1))
         for yy in range(1, min(H, 4)):
             for xx in range(1, min(W, 4)):
                 self.grid[yy][xx] = FLOOR
+        self.maze = MazeTree(cw, ch, parent, depth)
 
         # ---- Place HIDE tiles (single-tile shelters) ----
         # Rules: on FLOOR, not near (1,1), do not cluster, keep corridor flow.
@@ -170,8 +316,8 @@ class TileMap:
         tries = 0
         while placed < target_hides and tries < 4000:
             tries += 1
-            x = random.randint(3, W-4)
-            y = random.randint(3, H-4)
+            x = self.rng.randint(3, W-4)
+            y = self.rng.randint(3, H-4)
             if self.grid[y][x] != FLOOR:
                 continue
             # Not too close to indoor entry
@@ -196,15 +342,21 @@ class TileMap:
 
         # Tigers (1–2) on floor
         self.tiger_positions = []
-        t_goal = random.randint(1,2)
+        t_goal = self.tigers if self.tigers is not None else self.rng.randint(1,2)
         tries = 0
         while len(self.tiger_positions) < t_goal and tries < 3000:
             tries += 1
-            x = random.randint(2, W-3)
-            y = random.randint(2, H-3)
+            x = self.rng.randint(2, W-3)
+            y = self.rng.randint(2, H-3)
             if self.grid[y][x] == FLOOR:
                 self.grid[y][x] = TIGER_SPAWN
                 self.tiger_positions.append((x,y))
+        if len(self.tiger_positions) < t_goal:
+            # unlucky draws: any floor tile will do, the count was promised (Warehouses.tigers)
+            floor = [(x, y) for y in range(2, H-2) for x in range(2, W-2) if self.grid[y][x] == FLOOR]
+            for x, y in self.rng.sample(floor, min(len(floor), t_goal - len(self.tiger_positions))):
+                self.grid[y][x] = TIGER_SPAWN
+                self.tiger_positions.append((x,y))
 
         # Hunter spawns (6) on floor
         self.spawn_points = []
@@ -212,43 +364,158 @@ class TileMap:
         tries = 0
         while len(self.spawn_points) < s_goal and tries < 4000:
             tries += 1
-            x = random.randint(2, W-3)
-            y = random.randint(2, H-3)
+            x = self.rng.randint(2, W-3)
+            y = self.rng.randint(2, H-3)
             if self.grid[y][x] == FLOOR:
                 self.grid[y][x] = SPAWN
                 self.spawn_points.append((x,y))
 
     # ------------------ DRAW ------------------
     def draw(self, surf, cam, colors):
-        from config import SCREEN_W, SCREEN_H
-        left = int(cam.offset.x//TILE)-2
-        top  = int(cam.offset.y//TILE)-2
-        right= left + SCREEN_W//TILE + 4
-        bottom=top + SCREEN_H//TILE + 4
-
-        for gy in range(max(0,top), min(self.h_tiles,bottom)):
-            for gx in range(max(0,left), min(self.w_tiles,right)):
-                tid = self.grid[gy][gx]
-                rr = pygame.Rect(gx*TILE, gy*TILE, TILE, TILE).move(-cam.offset.x, -cam.offset.y)
-                if   tid==FLOOR: pygame.draw.rect(surf, colors["floor"], rr)
-                elif tid==WALL:  pygame.draw.rect(surf, colors["wall"], rr)
-                elif tid==BUSH:  pygame.draw.rect(surf, colors["bush"], rr)
-                elif tid==DOOR:  pygame.draw.rect(surf, colors["door"], rr)
-                elif tid==EXIT:  pygame.draw.rect(surf, colors["exit"], rr)
-                elif tid==HIDE:  pygame.draw.rect(surf, colors.get("hide", colors["floor"]), rr)
-                elif tid in (TIGER_SPAWN, SPAWN):
-                    pygame.draw.rect(surf, colors["floor"], rr)
-                elif tid == TREE:
-                    if self.tree_img:
-                        img = self.tree_img
-                        rect = img.get_rect(center=rr.center)  # rr = tile rect
-                        surf.blit(img, rect.topleft)
-                    else:
-                        pygame.draw.rect(surf, self.theme.get("tree", (70, 110, 70)), rr)
-                elif tid == ROCK:
-                    if self.rock_img:
-                        img = self.rock_img
-                        rect = img.get_rect(center=rr.center)
-                        surf.blit(img, rect.topleft)
-                    else:
-                        pygame.draw.rect(surf, self.theme.get("rock", (50, 80, 60)), rr)
\ No newline at end of file
+        """Draw the tiles under the camera view with self.renderer ("chunks" or "indexed")."""
+        if colors is not self._draw_colors:  # Game.apply_theme swapped the palette
+            self.apply_palette(colors)
+        if self.renderer == "indexed":
+            self._draw_indexed(surf, cam)
+            return
+        # pre-rendered chunks (CHUNK_TILES x CHUNK_TILES tiles) that intersect the view;
+        # at cam.scale != 1 ("native" pipeline) they are cached already scaled
+        s = cam.scale
+        if s != self._draw_scale:
+            self._draw_scale = s
+            self._chunks.clear()
+        span = CHUNK_TILES * TILE
+        ox, oy = int(cam.offset.x), int(cam.offset.y)
+        sox, soy = cam.screen_offset()
+        cx1 = min((self.w_tiles - 1) // CHUNK_TILES, (ox + cam.view_w) // span)
+        cy1 = min((self.h_tiles - 1) // CHUNK_TILES, (oy + cam.view_h) // span)
+        for cy in range(max(0, oy // span), cy1 + 1):
+            for cx in range(max(0, ox // span), cx1 + 1):
+                surf.blit(self._chunk(cx, cy, colors), (int(cx*span*s) - sox, int(cy*span*s) - soy))
+
+    def apply_palette(self, colors):
+        """New theme colours: chunks are re-rendered on demand, the indexed layer only swaps its palette."""
+        self._draw_colors = colors
+        self.invalidate_chunks()
+        if self._indexed is not None:
+            pal = self._palette(colors)
+            self._indexed.set_palette(pal)
+            if self._scaled is not None:
+                self._scaled.set_palette(pal)
+
+    def invalidate_chunks(self, gx=None, gy=None):
+        """Drop cached chunks: all of them, or those that show tile (gx, gy) (sprites overhang by a ring)."""
+        if gx is None:
+            self._chunks.clear()
+            return
+        r = self._chunk_ring
+        for cy in {(gy - r) // CHUNK_TILES, (gy + r) // CHUNK_TILES}:
+            for cx in {(gx - r) // CHUNK_TILES, (gx + r) // CHUNK_TILES}:
+                self._chunks.pop((cx, cy), None)
+
+    def _chunk(self, cx, cy, colors):
+        chunk = self._chunks.get((cx, cy))
+        if chunk is None:
+            chunk = self._render_chunk(cx, cy, colors)
+            s = self._draw_scale
+            if s != 1.0:
+                # integer edges from the scaled world position, so neighbours never gap or overlap
+                span = CHUNK_TILES * TILE
+                size = (int((cx + 1)*span*s) - int(cx*span*s), int((cy + 1)*span*s) - int(cy*span*s))
+                chunk = pygame.transform.smoothscale(chunk, size)
+            self._chunks[(cx, cy)] = chunk
+            self.chunk_renders += 1
+            if len(self._chunks) > CHUNK_CACHE:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end((cx, cy))
+        return chunk
+
+    def _render_chunk(self, cx, cy, colors):
+        n, w = CHUNK_TILES, self.w_tiles
+        x0, y0 = cx * n, cy * n
+        x1, y1 = min(x0 + n, w), min(y0 + n, self.h_tiles)
+        chunk = pygame.Surface((n * TILE, n * TILE))
+        if pygame.display.get_surface() is not None:
+            chunk = chunk.convert()
+        chunk.fill(colors["bg"])
+        fills = self._tile_fills(colors)
+        tiles = self.tiles
+        for gy in range(y0, y1):
+            row = gy * w
+            for gx in range(x0, x1):
+                c = fills[tiles[row + gx]]
+                if c is not None:
+                    chunk.fill(c, ((gx - x0) * TILE, (gy - y0) * TILE, TILE, TILE))
+        # tree/rock sprites go over the flat tiles; they overhang their tile, so the ring
+        # around the chunk is drawn too (clipped) and neighbouring chunks line up
+        sprites = {TREE: self.tree_img, ROCK: self.rock_img}
+        r = self._chunk_ring
+        for gy in range(max(0, y0 - r), min(self.h_tiles, y1 + r)):
+            row = gy * w
+            for gx in range(max(0, x0 - r), min(w, x1 + r)):
+                img = sprites.get(tiles[row + gx])
+                if img is not None:
+                    center = ((gx - x0) * TILE + TILE // 2, (gy - y0) * TILE + TILE // 2)
+                    chunk.blit(img, img.get_rect(center=center))
+        return chunk
+
+    def _draw_indexed(self, surf, cam):
+        # one 8-bit pixel per tile (palette index = tile id), nearest-neighbour scaled to the view
+        if self._indexed is None:
+            # shares memory with self.tiles: set_tile's byte write is the pixel write
+            self._indexed = pygame.image.frombuffer(self.tiles, (self.w_tiles, self.h_tiles), "P")
+            self._indexed.set_palette(self._palette(self._draw_colors))
+        ox, oy = int(cam.offset.x), int(cam.offset.y)
+        sox, soy = cam.screen_offset()
+        s = cam.scale
+        tx0, ty0 = max(0, ox // TILE), max(0, oy // TILE)
+        tx1 = min(self.w_tiles, (ox + cam.view_w) // TILE + 1)
+        ty1 = min(self.h_tiles, (oy + cam.view_h) // TILE + 1)
+        if tx1 <= tx0 or ty1 <= ty0:
+            return
+        size = (int(tx1*TILE*s) - int(tx0*TILE*s), int(ty1*TILE*s) - int(ty0*TILE*s))
+        if self._scaled is None or self._scaled.get_size() != size:
+            self._scaled = pygame.Surface(size, depth=8)
+            self._scaled.set_palette(self._indexed.get_palette())
+        pygame.transform.scale(self._indexed.subsurface((tx0, ty0, tx1 - tx0, ty1 - ty0)), size, self._scaled)
+        surf.blit(self._scaled, (int(tx0*TILE*s) - sox, int(ty0*TILE*s) - soy))
+        # sprites on top, including the ring just outside the view that overhangs into it
+        sprites = self._sprites(s)
+        r, w, tiles = self._chunk_ring, self.w_tiles, self.tiles
+        x0, x1 = max(0, tx0 - r), min(w, tx1 + r)
+        for gy in range(max(0, ty0 - r), min(self.h_tiles, ty1 + r)):
+            row = gy * w
+            for gx in range(x0, x1):
+                img = sprites.get(tiles[row + gx])
+                if img is not None:
+                    center = (int((gx*TILE + TILE//2)*s) - sox, int((gy*TILE + TILE//2)*s) - soy)
+                    surf.blit(img, img.get_rect(center=center))
+
+    def _sprites(self, scale):
+        """Tree/rock sprites pre-scaled for cam.scale (the originals at 1)."""
+        if scale == 1.0:
+            return {TREE: self.tree_img, ROCK: self.rock_img}
+        sprites = self._sprite_scaled.get(scale)
+        if sprites is None:
+            sprites = self._sprite_scaled[scale] = {
+                tid: img and pygame.transform.smoothscale(img, (round(img.get_width()*scale), round(img.get_height()*scale)))
+                for tid, img in ((TREE, self.tree_img), (ROCK, self.rock_img))}
+        return sprites
+
+    def _palette(self, colors):
+        bg = colors["bg"]
+        return [c if c is not None else bg for c in self._tile_fills(colors)]
+
+    def _tile_fills(self, colors):
+        """tile id -> flat colour (None: nothing under it, background shows)."""
+        fills = [None] * 256
+        for tid, key in ((FLOOR, "floor"), (WALL, "wall"), (BUSH, "bush"), (DOOR, "door"), (EXIT, "exit"),
+                         (TIGER_SPAWN, "floor"), (SPAWN, "floor")):
+            fills[tid] = colors[key]
+        fills[HIDE] = colors.get("hide", colors["floor"])
+        if not self.tree_img:
+            fills[TREE] = self.theme.get("tree", (70, 110, 70))
+        if not self.rock_img:
+            fills[ROCK] = self.theme.get("rock", (50, 80, 60))
+        return fills
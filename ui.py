@@ -1,5 +1,4 @@
 import pygame
-from config import SCREEN_W, SCREEN_H
 
 def draw_menu(surf, bigfont, font, colors, items, idx, clear_bg=True):
     import pygame
@@ -22,21 +21,23 @@ def draw_menu(surf, bigfont, font, colors, items, idx, clear_bg=True):
         surf.blit(txt, (surf.get_width()//2 - 120, y))
         y += 36
 def draw_themes(screen, bigfont, font, colors, theme_name):
+    sw = screen.get_width()  # "scaled" render pipeline: ekran = view boyutu
     screen.fill(colors["bg"])
     t = bigfont.render("Themes", True, colors["ui"])
-    screen.blit(t, (SCREEN_W//2 - t.get_width()//2, 100))
+    screen.blit(t, (sw//2 - t.get_width()//2, 100))
     n = bigfont.render(theme_name, True, colors["tiger"])
-    screen.blit(n, (SCREEN_W//2 - n.get_width()//2, 200))
+    screen.blit(n, (sw//2 - n.get_width()//2, 200))
     hint = font.render("← → to change theme, Enter/Esc to return", True, colors["ui"])
-    screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, 280))
+    screen.blit(hint, (sw//2 - hint.get_width()//2, 280))
 
 def draw_scores(screen, bigfont, font, colors, scores):
+    sw, sh = screen.get_size()
     screen.fill(colors["bg"])
     t = bigfont.render("Scores", True, colors["ui"])
-    screen.blit(t, (SCREEN_W//2 - t.get_width()//2, 90))
+    screen.blit(t, (sw//2 - t.get_width()//2, 90))
     if not scores:
         msg = font.render("No scores yet. Play a game!", True, colors["ui"])
-        screen.blit(msg, (SCREEN_W//2 - msg.get_width()//2, 180))
+        screen.blit(msg, (sw//2 - msg.get_width()//2, 180))
     else:
         y = 170
         headers = font.render("TimeLeft  Rescued  Caughts  Difficulty  Date", True, colors["ui"])
@@ -47,6 +48,20 @@ def draw_scores(screen, bigfont, font, colors, scores):
             line = f"{s['time_left']:>7}     {s['rescued']:>3}       {s.get('caughts',0):>3}      {s.get('difficulty','Default'):<10}  {dt}"
             txt = font.render(line, True, colors["ui"])
             screen.blit(txt, (120, y)); y+=26
-            if y>SCREEN_H-80: break
+            if y>sh-80: break
     hint = font.render("Press Esc/Enter to return to Menu", True, colors["ui"])
-    screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H-60))
+    screen.blit(hint, (sw//2 - hint.get_width()//2, sh-60))
+
+def draw_boot(screen, font, colors, done, total, current):
+    """Loading screen (State.BOOT): progress bar, plus the running step once a font is loaded."""
+    sw, sh = screen.get_size()
+    screen.fill(colors["bg"])
+    w, h = sw // 2, 18
+    x, y = sw//2 - w//2, sh//2 - h//2
+    pygame.draw.rect(screen, colors["ui"], (x, y, w, h), 2)
+    if total:
+        pygame.draw.rect(screen, colors["ui"], (x + 4, y + 4, int((w - 8) * done / total), h - 8))
+    if font:
+        label = f"Loading {current}…" if current else "Loading…"
+        t = font.render(label, True, colors["ui"])
+        screen.blit(t, (sw//2 - t.get_width()//2, y + h + 16))
@@ -1,5 +1,5 @@
-import json, pygame, math
-from config import TILE, FLOOR, WALL, CRATE
+import json, pygame
+from config import TILE, FLOOR, F_BLOCKS_LOS
 
 def load_json(path, default):
     try:
@@ -22,13 +22,14 @@ def rect_from_grid(gx, gy): return pygame.Rect(gx*TILE, gy*TILE, TILE, TILE)
 def heuristic(a,b): return abs(a[0]-b[0])+abs(a[1]-b[1])
 
 def line_of_sight(grid, start, end):
-    # Bresenham over tiles; blocks on WALL/CRATE
+    # Bresenham over tiles; blocks on WALL/CRATE (grid: tilemap.GridView)
+    flags, w = grid.flags, grid.w
     x0, y0 = px_to_grid(*start); x1, y1 = px_to_grid(*end)
     dx = abs(x1-x0); dy = -abs(y1-y0)
     sx = 1 if x0<x1 else -1; sy = 1 if y0<y1 else -1
     err = dx+dy
     while True:
-        if grid[y0][x0] in (WALL, CRATE):
+        if flags[y0*w + x0] & F_BLOCKS_LOS:
             return False
         if x0==x1 and y0==y1: break
         e2 = 2*err
@@ -0,0 +1,62 @@
+# warehouses.py — the maps behind the overworld doors: built on first use or by a background worker
+import random, threading
+
+
+class Warehouses:
+    """
+    Warehouse TileMaps by door index (Game.warehouses), parallel to overworld.doors.
+    - Each door's seed and tiger count are drawn at reset, so a map comes out the same whether
+      the worker or the door builds it, and tigers(i) is exact before it is built.
+    - w[i]: the map, built on the spot if the worker has not reached it yet.
+    - tigers(i): tigers still inside; built() / peek(i): maps that exist, without building.
+    - pregenerate(): build the rest on a daemon thread; stop(): abandon it (world reset).
+    - build(seed, tigers) -> TileMap is Game.make_warehouse.
+    """
+
+    def __init__(self, doors, build, rng=None):
+        rng = rng or random.Random()
+        self.seeds = [rng.getrandbits(32) for _ in doors]
+        self.tiger_goals = [rng.randint(1, 2) for _ in doors]
+        self._build = build
+        self._maps = [None] * len(doors)
+        self._lock = threading.Lock()
+        self._stop = False
+        self.on_demand = 0   # maps the door had to build itself (worker too late / off)
+
+    def __len__(self):
+        return len(self._maps)
+
+    def __getitem__(self, i):
+        m = self._maps[i]
+        return m if m is not None else self._get(i, on_demand=True)
+
+    def tigers(self, i):
+        m = self._maps[i]
+        return len(m.tiger_positions) if m is not None else self.tiger_goals[i]
+
+    def built(self):
+        return [m for m in self._maps if m is not None]
+
+    def peek(self, i):
+        """The map if it is built, else None (never builds)."""
+        return self._maps[i]
+
+    def pregenerate(self):
+        threading.Thread(target=self._run, name="warehouses", daemon=True).start()
+
+    def stop(self):
+        self._stop = True
+
+    # ---------- internal ----------
+    def _get(self, i, on_demand=False):
+        with self._lock:  # the worker may be building this one right now
+            if self._maps[i] is None:
+                self._maps[i] = self._build(self.seeds[i], self.tiger_goals[i])
+                self.on_demand += on_demand
+            return self._maps[i]
+
+    def _run(self):
+        for i in range(len(self._maps)):
+            if self._stop:
+                return
+            self._get(i)